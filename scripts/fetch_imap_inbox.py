@@ -7,6 +7,17 @@ The script requires an IMAP application password saved in the system keyring
 under the service name ``virgin-imap``.  Store it once with::
     python -m keyring set example-imap your_username@example.com
 
+Each run only downloads the messages that arrived since the previous run. The per-folder sync
+state is kept in ``data/imap_sync_state.json``; delete it to force a full download.
+
+Set ``skip_attachments = True`` to download only the headers and text parts of each message.
+Attachments are then saved as empty placeholders that still record their type and size.
+
+Set ``save_packed = True`` to append each folder's messages to a packed store in
+``data/raw/<label>_personal`` instead of writing one .eml file per message.
+
+Connections are compressed with COMPRESS=DEFLATE whenever the server supports it.
+
 Also before running ensure you have correctly installed the dev dependencies group with poetry.
 
 !!!!!!!!!!!!!!!!!!!!!!!!!!!!! WARNING !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -15,10 +26,34 @@ Currently this has only been tested for the Virgin Media email client.
 
 from __future__ import annotations
 
+import asyncio
+
 from email_spam_filter.common import logger
-from email_spam_filter.data.collection.personal import fetch_and_save_emails
+from email_spam_filter.data.collection.personal import (
+    async_fetch_and_save_emails,
+    fetch_and_save_emails,
+)
 
 if __name__ == "__main__":
     logger()
     number_of_emails_to_fetch = 10
-    fetch_and_save_emails(number_of_emails_to_fetch)
+    number_of_connections = 4
+    use_asyncio = False
+    skip_attachments = False
+    save_packed = False
+    if use_asyncio:
+        asyncio.run(
+            async_fetch_and_save_emails(
+                number_of_emails_to_fetch,
+                connections=number_of_connections,
+                partial=skip_attachments,
+                packed=save_packed,
+            )
+        )
+    else:
+        fetch_and_save_emails(
+            number_of_emails_to_fetch,
+            connections=number_of_connections,
+            partial=skip_attachments,
+            packed=save_packed,
+        )
@@ -9,25 +9,39 @@ Before running:
        `data/raw_external/spamassassin`
        with subfolders whose names include “ham” and “spam”.
 
+    Alternatively, leave the downloaded .tgz / .tar.bz2 archives unextracted in those folders.
+    Their members are then streamed straight into the raw folders without unpacking them first.
+
     3. Install dev dependencies via Poetry (if not already done):
        > poetry install --with dev
 
 Usage:
     > python organise_datasets.py
 
-This will create (if missing) the following folders and move the .eml files into them:
+This will create (if missing) the following folders and place the .eml files into them:
     - `data/raw/trec_ham`
     - `data/raw/trec_spam`
     - `data/raw/spamassassin_ham`
     - `data/raw/spamassassin_spam`
+
+Set `pack_raw_emails = True` to write each folder as a packed store of compressed segment files
+with an offset index, instead of one .eml file per email.
+
+Otherwise `placement` decides how each file is placed: HARDLINK (the default here), REFLINK or
+SYMLINK only add directory entries, so organising takes no extra disk space, while COPY
+duplicates every file. Modes the filesystem does not support fall back to COPY.
 """
 
 from __future__ import annotations
 
 from email_spam_filter.common import logger
+from email_spam_filter.data.io import PlacementMode
 from email_spam_filter.data.organise import DATASET_MODULES
 
 if __name__ == "__main__":
     logger()
+    pack_raw_emails = False
+    placement = PlacementMode.HARDLINK
+
     for organise_dataset in DATASET_MODULES.values():
-        organise_dataset()
+        organise_dataset(packed=pack_raw_emails, placement=placement)
@@ -14,19 +14,54 @@ Usage:
 
 This will serialize parsed EmailData to Parquet files in:
     - data/processed/{dataset_name}_processed
+
+By default only new or changed .eml files are parsed, using a manifest stored next to each
+Parquet file. Set `incremental = False` to force a full re-parse. Raw folders organised as packed
+stores are streamed straight from their segment files and always fully re-parsed.
+
+If a dataset was never organised but its tar archives are in its `data/raw_external` folder
+(e.g. `data/raw_external/trec/trec07p.tgz`), the emails are parsed straight out of the archives
+without extracting them to disk.
+
+Afterwards exact and near-duplicate emails are clustered across all processed datasets and each
+email's cluster id is written into its Parquet file, so training can keep one email per cluster.
+Set `deduplicate = False` to skip this.
+
+Finally every processed dataset is combined into `data/processed/corpus`, partitioned by source
+and tag, which `load_corpus` reads and samples from. Set `build_corpus = False` to skip this.
 """
 
 from __future__ import annotations
 
+import itertools
+
 from email_spam_filter.common import logger, paths
-from email_spam_filter.data.io.functions import create_email_data, serialize_email_data
+from email_spam_filter.data.corpus import write_corpus
+from email_spam_filter.data.dedup import deduplicate_processed_datasets
+from email_spam_filter.data.io.containers import RawEmailStore
+from email_spam_filter.data.io.functions import (
+    find_tar_archives,
+    iter_email_directory,
+    iter_email_store,
+    parse_raw_messages,
+    serialize_email_data,
+    update_processed_dataset,
+)
+from email_spam_filter.data.organise import ARCHIVE_READERS
 
 if __name__ == "__main__":
     logger()
+    number_of_workers = None  # None uses every available CPU core.
+    incremental = True  # Only re-parse new or changed files, set False to force a full re-parse.
+    deduplicate = True  # Cluster duplicate emails across datasets and store their cluster ids.
+    # Combine the processed datasets into a corpus partitioned by source and tag.
+    build_corpus = True
 
     for dataset_name, dataset_paths in paths.DATASET_PATHS.items():
         print(f"\nProcessing dataset: {dataset_name}")
 
+        eml_paths = []
+        stores = []
         for field_name, raw_folder in dataset_paths.model_dump().items():
             if not field_name.startswith("raw_") or not raw_folder:
                 continue
@@ -36,16 +71,52 @@ if __name__ == "__main__":
                 print(f"  [!] Skipped: {field_name} Folder not found.")
                 continue
 
-            eml_paths = sorted(raw_folder.glob("*.eml"))
-            if not eml_paths:
-                print(f"  [!] Skipped: {field_name} No .eml files found.")
+            if RawEmailStore.is_store(raw_folder):
+                stores.append(RawEmailStore(raw_folder))
                 continue
 
-            print(f"  Parsing {len(eml_paths)} email(s)...")
-            email_data = [create_email_data(path) for path in eml_paths]
+            folder_paths = sorted(raw_folder.glob("*.eml"))
+            if not folder_paths:
+                print(f"  [!] Skipped: {field_name} No .eml files found.")
+                continue
+            eml_paths.extend(folder_paths)
 
-            if dataset_paths.processed:
-                print(f"  Serializing to: {dataset_paths.processed}")
+        if not eml_paths and not stores:
+            archives = []
+            if dataset_name in ARCHIVE_READERS and dataset_paths.external:
+                archives = find_tar_archives(dataset_paths.external)
+            if archives and dataset_paths.processed:
+                print(f"  Parsing {len(archives)} archive(s) into: {dataset_paths.processed}")
+                messages = ARCHIVE_READERS[dataset_name](archives)
+                email_data = parse_raw_messages(messages, workers=number_of_workers)
                 serialize_email_data(email_data, path=dataset_paths.processed)
+            continue
+
+        if incremental and dataset_paths.processed and not stores:
+            print(f"  Updating {dataset_paths.processed} from {len(eml_paths)} email(s)...")
+            update_processed_dataset(eml_paths, dataset_paths.processed, workers=number_of_workers)
+            continue
+
+        if dataset_paths.processed:
+            n_emails = len(eml_paths) + sum(len(store) for store in stores)
+            print(f"  Parsing {n_emails} email(s) into: {dataset_paths.processed}")
+            email_data = itertools.chain(
+                iter_email_directory(eml_paths, workers=number_of_workers),
+                *(iter_email_store(store, workers=number_of_workers) for store in stores),
+            )
+            serialize_email_data(email_data, path=dataset_paths.processed)
+
+    processed_paths = [
+        dataset_paths.processed
+        for dataset_paths in paths.DATASET_PATHS.values()
+        if dataset_paths.processed and dataset_paths.processed.exists()
+    ]
+    if deduplicate and processed_paths:
+        print(f"\nClustering duplicate emails across {len(processed_paths)} dataset(s)...")
+        n_clusters = deduplicate_processed_datasets(processed_paths)
+        print(f"  Found {n_clusters} distinct email(s).")
+    if build_corpus and processed_paths:
+        print(f"\nWriting the partitioned corpus to: {paths.CORPUS_DIR}")
+        write_corpus(processed_paths)
 
     print("\nEmail parsing and serialization complete.")
@@ -0,0 +1,81 @@
+"""Script to score the most recent personal emails without writing any intermediate files.
+
+Before running:
+    1. Ensure personal email data has already been parsed and serialised to:
+       - data/processed/personal_processed.parquet
+
+    2. Configure IMAP access as described in `fetch_imap_inbox.py`.
+
+    3. Install dependencies via Poetry (if not already done):
+       > poetry install
+
+Usage:
+    > python score_new_emails.py
+
+This script will:
+    - Train a logistic regression model on the labelled personal emails
+    - Stream the most recent emails of every configured IMAP folder straight from the server
+      through the parser into the model, in small batches
+    - Print the emails most likely to be spam
+
+Set `save_raw` or `save_processed` to also keep the fetched emails on disk as a side effect.
+
+Set `move_spam = True` to also move every email scored above `spam_threshold` into
+`spam_folder` on the server. Keep `dry_run = True` to only print what would be moved.
+
+Set `deduplicate = False` to train on every labelled email, including duplicates.
+
+Set `watch_for_new_emails = True` to instead keep running and score every new email within
+moments of its arrival, using IMAP IDLE on every configured folder. Stop it with Ctrl+C.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from email_spam_filter.common import logger, paths
+from email_spam_filter.data.collection.personal.functions import connect_imap, get_imap_password
+from email_spam_filter.data.io.functions import load_email_batch
+from email_spam_filter.ml.common import TRAINING_COLUMNS, split_labelled_and_inbox
+from email_spam_filter.ml.models import MachineLearningModel
+from email_spam_filter.scoring import move_predicted_spam, run_scoring_daemon, score_folders
+
+if __name__ == "__main__":
+    logger()
+    number_of_emails_to_score = 50
+    save_raw = False
+    save_processed = False
+    watch_for_new_emails = False
+    move_spam = False
+    spam_folder = "Spam"
+    spam_threshold = 0.9
+    dry_run = True
+    deduplicate = True  # Train on one email per duplicate cluster, weighted by cluster size.
+
+    if paths.PERSONAL_PATHS.processed:
+        emails = load_email_batch(paths.PERSONAL_PATHS.processed, columns=TRAINING_COLUMNS)
+    labelled, _ = split_labelled_and_inbox(emails)
+    model = MachineLearningModel.LOGISTIC_REGRESSION.pipeline()
+    model.train(labelled, deduplicate=deduplicate)
+
+    if watch_for_new_emails:
+        asyncio.run(run_scoring_daemon(model))
+    else:
+        results = score_folders(
+            model,
+            limit=number_of_emails_to_score,
+            raw_path=paths.RAW_DIR if save_raw else None,
+            processed_path=paths.PROCESSED_DIR / "scored.parquet" if save_processed else None,
+        )
+        ranked_results = results.sort_values(by=["probability", "id"], ascending=[False, True])
+        print("\nMost likely spam:")
+        print(ranked_results.head(10).to_string(index=False))
+
+        if move_spam:
+            imap = connect_imap(get_imap_password())
+            try:
+                move_predicted_spam(
+                    imap, results, spam_folder, threshold=spam_threshold, dry_run=dry_run
+                )
+            finally:
+                imap.logout()
@@ -11,9 +11,10 @@ Usage:
     > python test_ml_model.py
 
 This script will:
-    - Load the processed personal email dataset
+    - Load the columns the model needs from the processed personal email dataset
     - Split it into labelled (spam/ham) and unlabelled (inbox) subsets
-    - Train a logistic regression model on the labelled data
+    - Train a logistic regression model on the labelled data, keeping one email per duplicate
+      cluster weighted by the cluster size (set `deduplicate = False` to keep every email)
     - Predict spam probabilities for each inbox email
     - Print the top 5 most spam- and ham-indicative features (raw weights)
     - Print the most confidently predicted spam and ham emails with a preview
@@ -29,19 +30,22 @@ from email_spam_filter.analysis import (
     show_email_features,
 )
 from email_spam_filter.common import email_by_id, logger, paths
-from email_spam_filter.data.io.functions import deserialize_email_data
-from email_spam_filter.ml.common import split_labelled_and_inbox
+from email_spam_filter.data.io.functions import deserialize_email_data, load_email_batch
+from email_spam_filter.ml.common import TRAINING_COLUMNS, split_labelled_and_inbox
 from email_spam_filter.ml.models import MachineLearningModel
 
 if __name__ == "__main__":
     logger()
+    deduplicate = True  # Train on one email per duplicate cluster, weighted by cluster size.
 
-    if paths.PERSONAL_PATHS.processed:
-        emails = deserialize_email_data(paths.PERSONAL_PATHS.processed)
+    if not paths.PERSONAL_PATHS.processed:
+        error_message = "The processed personal email dataset path is not configured."
+        raise RuntimeError(error_message)
+    emails = load_email_batch(paths.PERSONAL_PATHS.processed, columns=TRAINING_COLUMNS)
     labelled, inbox = split_labelled_and_inbox(emails)
 
     model = MachineLearningModel.LOGISTIC_REGRESSION.pipeline()
-    model.train(labelled)
+    model.train(labelled, deduplicate=deduplicate)
 
     model_features = get_model_features(model)
     print("\nTop 5 spam-indicative features:")
@@ -55,10 +59,14 @@ if __name__ == "__main__":
     ranked_results = results.sort_values(by=["probability", "id"], ascending=[False, True])
 
     most_likely_spam_row = ranked_results.iloc[0]
-    most_likely_spam_email = email_by_id(int(ranked_results.iloc[0]["id"]), inbox)
-
     most_likely_ham_row = ranked_results.iloc[-1]
-    most_likely_ham_email = email_by_id(int(ranked_results.iloc[-1]["id"]), inbox)
+    # Only the two emails shown are loaded with every column.
+    shown_ids = [int(most_likely_spam_row["id"]), int(most_likely_ham_row["id"])]
+    shown_emails = deserialize_email_data(
+        paths.PERSONAL_PATHS.processed, filters=[("tag", "==", "inbox"), ("id", "in", shown_ids)]
+    )
+    most_likely_spam_email = email_by_id(shown_ids[0], shown_emails)
+    most_likely_ham_email = email_by_id(shown_ids[1], shown_emails)
 
     print("\nMost likely SPAM:")
     print(predicted_email_summary(most_likely_spam_email, most_likely_spam_row["probability"]))
@@ -5,6 +5,7 @@ Modules:
     common: Common utilities and shared data structures for the email-spam-filter project.
     data: Data ingestion, pre-processing, and labelling utilities for the email-spam-filter project.
     ml: Machine learning components for the email-spam-filter project.
+    scoring: Streaming classification of freshly fetched emails with a trained model.
 """
 
 from __future__ import annotations
@@ -14,6 +15,7 @@ __all__ = (
     "common",
     "data",
     "ml",
+    "scoring",
 )
 
 from email_spam_filter import (
@@ -21,4 +23,5 @@ from email_spam_filter import (
     common,
     data,
     ml,
+    scoring,
 )
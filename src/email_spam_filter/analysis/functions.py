@@ -7,7 +7,6 @@ import typing
 
 import eli5
 import matplotlib.pyplot as plt
-import scipy
 import scipy.special
 import shap
 
@@ -15,7 +14,7 @@ from email_spam_filter.common import clean_html
 from email_spam_filter.ml.common import to_features
 
 if typing.TYPE_CHECKING:
-    from email_spam_filter.common.containers import EmailData
+    from email_spam_filter.common.containers import EmailBatch, EmailData
     from email_spam_filter.ml.common import ModelPipeline
 
 
@@ -66,7 +65,7 @@ def predicted_email_summary(email: EmailData, probability: float, *, max_chars:
 def show_email_features(
     model: ModelPipeline,
     email: EmailData,
-    training_emails: list[EmailData],
+    training_emails: list[EmailData] | EmailBatch,
     *,
     max_display: int = 20,
 ) -> None:
@@ -75,7 +74,7 @@ def show_email_features(
     Args:
         model: A trained ModelPipeline instance.
         email: An EmailData instance.
-        training_emails: Full EmailData training set. (labelled)
+        training_emails: Full EmailData training set (labelled), as a list or an EmailBatch.
         max_display: How many of the top features to display
     """
     training_feature_df, _ = to_features(training_emails)
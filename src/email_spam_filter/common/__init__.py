@@ -15,7 +15,11 @@ __all__ = (
     "KEYRING_SERVICE",
     "USER_EMAIL",
     "AttributeData",
+    "EmailBatch",
     "EmailData",
+    "EmailHeaderData",
+    "EmailView",
+    "HtmlAnalysis",
     "TagData",
     "ValueData",
     "clean_html",
@@ -23,6 +27,7 @@ __all__ = (
     "logger",
     "paths",
     "simple_logger",
+    "soup_to_text",
 )
 
 from email_spam_filter.common import paths
@@ -34,7 +39,11 @@ from email_spam_filter.common.constants import (
 )
 from email_spam_filter.common.containers import (
     AttributeData,
+    EmailBatch,
     EmailData,
+    EmailHeaderData,
+    EmailView,
+    HtmlAnalysis,
     TagData,
     ValueData,
 )
@@ -43,4 +52,5 @@ from email_spam_filter.common.functions import (
     email_by_id,
     logger,
     simple_logger,
+    soup_to_text,
 )
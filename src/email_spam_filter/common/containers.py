@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import itertools
 import typing
 
+import pyarrow as pa
 import pydantic
 import pydantic_settings
 
 if typing.TYPE_CHECKING:
+    import collections.abc
     from pathlib import Path
 
+    import pyarrow.compute as pc
+
 
 class UserConfig(pydantic_settings.BaseSettings):
     """Configuration loaded from the environment or a .env file.
@@ -98,6 +103,48 @@ class TagData(FrozenBaseModel):
     attributes: tuple[AttributeData, ...]
 
 
+class HtmlAnalysis(FrozenBaseModel):
+    """Everything extracted from a single parse of an email's HTML body.
+
+    Attributes:
+        unique_html_tags: TagData for each unique HTML tag in the body.
+        link_urls: The href of every anchor tag, in document order.
+        link_contexts: The HTML snippet of every anchor tag, in document order.
+        text: Cleaned plain-text of the body. Empty unless requested.
+    """
+
+    unique_html_tags: tuple[TagData, ...] = ()
+    link_urls: tuple[str, ...] = ()
+    link_contexts: tuple[str, ...] = ()
+    text: str = ""
+
+
+class EmailHeaderData(FrozenBaseModel):
+    """Lightweight record of the header fields of an email, parsed without reading its body.
+
+    Attributes:
+        id: Unique identifier of the email.
+        tag: Type of email (e.g. spam, ham, inbox).
+        source: Source of the email. (e.g. Personal, TREC, SpamAssassin).
+        subject: Subject header of the email.
+        from_addr: Sender email address.
+        from_name: Sender display name.
+        n_rcpts: Number of recipients.
+        auth_fail: True if authentication headers indicate failure.
+        message_id: Message-ID header of the email, empty if missing.
+    """
+
+    id: int
+    tag: str
+    source: str
+    subject: str
+    from_addr: str
+    from_name: str
+    n_rcpts: int
+    auth_fail: bool
+    message_id: str = ""
+
+
 class EmailData(FrozenBaseModel):
     """Container for parsed email information used for AI training.
 
@@ -117,6 +164,12 @@ class EmailData(FrozenBaseModel):
         n_rcpts: Number of recipients.
         has_attach: True if the email has attachments.
         auth_fail: True if authentication headers indicate failure.
+        n_attach: Number of attachment parts.
+        attach_size: Total encoded (e.g. base64) size in characters of the attachment payloads.
+        attach_types: MIME type of each attachment part, in message order.
+        cluster_id: Id of the cluster of exact and near-duplicate emails this email belongs to,
+            shared by every email of the cluster. None if deduplication has not been run.
+        html_text: Plain-text extracted from the HTML body, empty if the email has none.
     """
 
     id: int
@@ -134,3 +187,434 @@ class EmailData(FrozenBaseModel):
     n_rcpts: int
     has_attach: bool
     auth_fail: bool
+    n_attach: int = 0
+    attach_size: int = 0
+    attach_types: tuple[str, ...] = ()
+    cluster_id: int | None = None
+    html_text: str = ""
+
+
+SCHEMA_VERSION_KEY: typing.Final[bytes] = b"email_spam_filter.schema_version"
+"""Parquet metadata key under which the EmailData schema version is stored."""
+
+SCHEMA_VERSION: typing.Final[int] = 5
+"""Current EmailData schema version, bumped whenever columns are added.
+
+Version 2 introduced the native nested layout, version 3 the `n_attach`, `attach_size` and
+`attach_types` columns, version 4 `cluster_id` and version 5 `html_text`. Files without a
+version use the legacy JSON-string layout.
+"""
+
+_VALUE_TYPE = pa.struct([("value", pa.string()), ("count", pa.int64())])
+_ATTRIBUTE_TYPE = pa.struct(
+    [("attribute", pa.string()), ("count", pa.int64()), ("values", pa.list_(_VALUE_TYPE))]
+)
+_TAG_TYPE = pa.struct(
+    [("tag", pa.string()), ("count", pa.int64()), ("attributes", pa.list_(_ATTRIBUTE_TYPE))]
+)
+
+EMAIL_DATA_SCHEMA: typing.Final[pa.Schema] = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("tag", pa.string()),
+        ("source", pa.string()),
+        ("subject", pa.string()),
+        ("body", pa.string()),
+        ("unique_html_tags", pa.list_(_TAG_TYPE)),
+        ("from_addr", pa.string()),
+        ("from_name", pa.string()),
+        ("n_links", pa.int64()),
+        ("n_dupe_links", pa.int64()),
+        ("link_domains", pa.list_(pa.string())),
+        ("link_contexts", pa.list_(pa.string())),
+        ("n_rcpts", pa.int64()),
+        ("has_attach", pa.bool_()),
+        ("auth_fail", pa.bool_()),
+        ("n_attach", pa.int64()),
+        ("attach_size", pa.int64()),
+        ("attach_types", pa.list_(pa.string())),
+        ("cluster_id", pa.int64()),
+        ("html_text", pa.string()),
+    ],
+    metadata={SCHEMA_VERSION_KEY: str(SCHEMA_VERSION).encode()},
+)
+"""Native nested Arrow schema of a processed EmailData Parquet file."""
+
+
+def _construct[ModelT: pydantic.BaseModel](
+    model: type[ModelT], fields: dict[str, typing.Any]
+) -> ModelT:
+    """Create a pydantic model instance from trusted, already complete field values.
+
+    This is a leaner equivalent of `model.model_construct()` for models without defaults,
+    aliases, extras or private attributes, skipping both validation and default handling.
+
+    Args:
+        model: The pydantic model class to instantiate.
+        fields: A value for every field of the model.
+
+    Returns:
+        The constructed model instance.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _list_from_arrow(column: pa.ChunkedArray | pa.ListArray) -> list[tuple[typing.Any, ...]]:
+    """Convert an Arrow list column to a list of tuples using its flat values and offsets.
+
+    Args:
+        column: An Arrow list column.
+
+    Returns:
+        One tuple per row holding that row's list items.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    return _split_by_offsets(column.flatten().to_pylist(), column.offsets.to_pylist())
+
+
+def _split_by_offsets(items: list[typing.Any], offsets: list[int]) -> list[tuple[typing.Any, ...]]:
+    """Split a flat list of items into tuples delimited by Arrow list offsets.
+
+    Args:
+        items: The flattened list values.
+        offsets: The Arrow list offsets, possibly not starting at zero for sliced arrays.
+
+    Returns:
+        One tuple per list slot.
+    """
+    base = offsets[0] if offsets else 0
+    return [tuple(items[start - base : end - base]) for start, end in itertools.pairwise(offsets)]
+
+
+def _tag_data_from_arrow(column: pa.ChunkedArray | pa.ListArray) -> list[tuple[TagData, ...]]:
+    """Build TagData without validation from the nested `unique_html_tags` Arrow column.
+
+    Each level of nesting is converted as a whole flat array and reassembled bottom-up through
+    the list offsets, so no per-row Arrow conversion happens.
+
+    Args:
+        column: The `unique_html_tags` column of a processed Parquet table.
+
+    Returns:
+        One tuple of TagData per row.
+    """
+    tags = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    tag_names, tag_counts, attributes = tags.flatten().flatten()
+    attribute_names, attribute_counts, values = attributes.flatten().flatten()
+    value_strings, value_counts = values.flatten().flatten()
+
+    # ValueData is immutable, so repeated (value, count) pairs share a single instance.
+    value_cache: dict[tuple[str, int], ValueData] = {}
+    value_data = [
+        value_cache.get((v, c))
+        or value_cache.setdefault((v, c), _construct(ValueData, {"value": v, "count": c}))
+        for v, c in zip(value_strings.to_pylist(), value_counts.to_pylist(), strict=True)
+    ]
+    attribute_data = [
+        _construct(AttributeData, {"attribute": a, "count": c, "values": vals})
+        for a, c, vals in zip(
+            attribute_names.to_pylist(),
+            attribute_counts.to_pylist(),
+            _split_by_offsets(value_data, values.offsets.to_pylist()),
+            strict=True,
+        )
+    ]
+    tag_data = [
+        _construct(TagData, {"tag": t, "count": c, "attributes": attrs})
+        for t, c, attrs in zip(
+            tag_names.to_pylist(),
+            tag_counts.to_pylist(),
+            _split_by_offsets(attribute_data, attributes.offsets.to_pylist()),
+            strict=True,
+        )
+    ]
+    return _split_by_offsets(tag_data, tags.offsets.to_pylist())
+
+
+class EmailView:
+    """Lightweight read-only view of one row of an EmailBatch that quacks like EmailData.
+
+    Field values are read from the batch's Arrow columns on access, so creating a view is cheap
+    and holds no copy of the data.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: EmailBatch, index: int) -> None:
+        """Initialize an EmailView instance.
+
+        Args:
+            batch: The EmailBatch holding the data.
+            index: Row index of the email within the batch.
+        """
+        self._batch = batch
+        self._index = index
+
+    def __repr__(self) -> str:
+        """Return a short representation of the view."""
+        return f"EmailView(index={self._index}, id={self.id}, tag={self.tag!r})"
+
+    def _value(self, name: str) -> typing.Any:  # noqa: ANN401
+        return self._batch.value(name, self._index)
+
+    @property
+    def id(self) -> int:
+        """Unique identifier of the email."""
+        return typing.cast("int", self._value("id"))
+
+    @property
+    def tag(self) -> str:
+        """Type of email (e.g. spam, ham, inbox)."""
+        return typing.cast("str", self._value("tag"))
+
+    @property
+    def source(self) -> str:
+        """Source of the email. (e.g. Personal, TREC, SpamAssassin)."""
+        return typing.cast("str", self._value("source"))
+
+    @property
+    def subject(self) -> str:
+        """Subject header of the email."""
+        return typing.cast("str", self._value("subject"))
+
+    @property
+    def body(self) -> str:
+        """Plain-text body of the email."""
+        return typing.cast("str", self._value("body"))
+
+    @property
+    def unique_html_tags(self) -> tuple[TagData, ...]:
+        """TagData for each unique HTML tag in the message."""
+        return typing.cast("tuple[TagData, ...]", self._value("unique_html_tags"))
+
+    @property
+    def from_addr(self) -> str:
+        """Sender email address."""
+        return typing.cast("str", self._value("from_addr"))
+
+    @property
+    def from_name(self) -> str:
+        """Sender display name."""
+        return typing.cast("str", self._value("from_name"))
+
+    @property
+    def n_links(self) -> int:
+        """Total number of links found."""
+        return typing.cast("int", self._value("n_links"))
+
+    @property
+    def n_dupe_links(self) -> int:
+        """Number of duplicate links."""
+        return typing.cast("int", self._value("n_dupe_links"))
+
+    @property
+    def link_domains(self) -> tuple[str, ...]:
+        """Set of unique link domains."""
+        return typing.cast("tuple[str, ...]", self._value("link_domains"))
+
+    @property
+    def link_contexts(self) -> tuple[str, ...]:
+        """Tuple of HTML anchor snippets or URL context strings."""
+        return typing.cast("tuple[str, ...]", self._value("link_contexts"))
+
+    @property
+    def n_rcpts(self) -> int:
+        """Number of recipients."""
+        return typing.cast("int", self._value("n_rcpts"))
+
+    @property
+    def has_attach(self) -> bool:
+        """True if the email has attachments."""
+        return typing.cast("bool", self._value("has_attach"))
+
+    @property
+    def auth_fail(self) -> bool:
+        """True if authentication headers indicate failure."""
+        return typing.cast("bool", self._value("auth_fail"))
+
+    @property
+    def n_attach(self) -> int:
+        """Number of attachment parts."""
+        return typing.cast("int", self._value("n_attach"))
+
+    @property
+    def attach_size(self) -> int:
+        """Total encoded size in characters of the attachment payloads."""
+        return typing.cast("int", self._value("attach_size"))
+
+    @property
+    def attach_types(self) -> tuple[str, ...]:
+        """MIME type of each attachment part, in message order."""
+        return typing.cast("tuple[str, ...]", self._value("attach_types"))
+
+    @property
+    def cluster_id(self) -> int | None:
+        """Id of the cluster of exact and near-duplicate emails this email belongs to."""
+        return typing.cast("int | None", self._value("cluster_id"))
+
+    @property
+    def html_text(self) -> str:
+        """Plain-text extracted from the HTML body."""
+        return typing.cast("str", self._value("html_text"))
+
+    def to_email_data(self) -> EmailData:
+        """Materialise the viewed row as a validated EmailData instance."""
+        return EmailData.model_validate(
+            {name: self._value(name) for name in EmailData.model_fields}
+        )
+
+
+class EmailBatch:
+    """Columnar, Arrow-backed collection of emails.
+
+    Holds the same fields as EmailData in an Arrow table using `EMAIL_DATA_SCHEMA`, with strings
+    stored in Arrow buffers and the nested tag data as flat child arrays plus list offsets.
+    This costs a fraction of the memory of one pydantic object tree per email. Iterating or
+    indexing yields EmailView rows that quack like EmailData.
+
+    A batch may hold only a subset of the columns, e.g. when loaded with column projection, in
+    which case accessing a missing field raises an AttributeError. Missing fields that have a
+    default on EmailData, such as columns added after a file was written, read as that default.
+    """
+
+    def __init__(self, table: pa.Table) -> None:
+        """Initialize an EmailBatch instance.
+
+        Args:
+            table: Arrow table whose columns follow `EMAIL_DATA_SCHEMA`.
+        """
+        unknown = set(table.column_names) - set(EMAIL_DATA_SCHEMA.names)
+        if unknown:
+            error_message = f"Unknown EmailBatch column(s): {', '.join(sorted(unknown))}."
+            raise ValueError(error_message)
+        self.table = table
+        self._columns: dict[str, pa.ChunkedArray] = {}
+
+    @classmethod
+    def from_emails(cls, emails: collections.abc.Iterable[EmailData]) -> EmailBatch:
+        """Build an EmailBatch from EmailData instances.
+
+        Args:
+            emails: The EmailData instances to convert.
+
+        Returns:
+            A new EmailBatch holding the same data.
+        """
+        records = [email.model_dump() for email in emails]
+        return cls(pa.Table.from_pylist(records, schema=EMAIL_DATA_SCHEMA))
+
+    def __len__(self) -> int:
+        """Return the number of emails in the batch."""
+        return int(self.table.num_rows)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> EmailView: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> EmailBatch: ...
+
+    def __getitem__(self, index: int | slice) -> EmailView | EmailBatch:
+        """Return a view of one row, or a zero-copy sub-batch for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                error_message = "EmailBatch slices do not support a step."
+                raise ValueError(error_message)
+            return EmailBatch(self.table.slice(start, stop - start))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            error_message = f"EmailBatch index {index} out of range."
+            raise IndexError(error_message)
+        return EmailView(self, index)
+
+    def __iter__(self) -> collections.abc.Iterator[EmailView]:
+        """Iterate over a view of every row."""
+        return (EmailView(self, index) for index in range(len(self)))
+
+    def value(self, name: str, index: int) -> typing.Any:  # noqa: ANN401
+        """Return the Python value of one field of one row.
+
+        Args:
+            name: The EmailData field name.
+            index: Row index within the batch.
+
+        Returns:
+            The value, converted like the matching EmailData field.
+        """
+        if name not in self.table.column_names:
+            return self._missing_default(name)
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns.setdefault(name, self.table.column(name).combine_chunks())
+        if name == "unique_html_tags":
+            return _tag_data_from_arrow(column.slice(index, 1))[0]
+        value = column[index].as_py()
+        return tuple(value) if isinstance(value, list) else value
+
+    def column(self, name: str) -> list[typing.Any]:
+        """Convert a whole column to Python values, converted like the matching EmailData field.
+
+        Args:
+            name: The EmailData field name.
+
+        Returns:
+            One value per row.
+        """
+        if name not in self.table.column_names:
+            return [self._missing_default(name)] * len(self)
+        if name == "unique_html_tags":
+            return _tag_data_from_arrow(self.table.column(name))
+        if pa.types.is_list(self.table.schema.field(name).type):
+            return _list_from_arrow(self.table.column(name))
+        return list(self.table.column(name).to_pylist())
+
+    def _missing_default(self, name: str) -> typing.Any:  # noqa: ANN401
+        """Return the EmailData default for a column absent from the table.
+
+        Args:
+            name: The EmailData field name.
+
+        Returns:
+            The field's default value.
+
+        Raises:
+            AttributeError: If the field has no default.
+        """
+        field = EmailData.model_fields.get(name)
+        if field is None or field.is_required():
+            error_message = f"EmailBatch has no column {name!r}."
+            raise AttributeError(error_message)
+        return field.get_default()
+
+    def filter(self, mask: pc.Expression | pa.BooleanArray) -> EmailBatch:
+        """Return the rows matching a boolean mask or pyarrow compute expression.
+
+        Args:
+            mask: Boolean array with one entry per row, or an expression over the columns.
+
+        Returns:
+            A new EmailBatch holding the matching rows.
+        """
+        return EmailBatch(self.table.filter(mask))
+
+    def to_emails(self) -> list[EmailData]:
+        """Materialise every row as EmailData through the trusted construction path.
+
+        The batch must hold every column.
+
+        Returns:
+            One EmailData per row, in batch order.
+        """
+        columns = {name: self.column(name) for name in EmailData.model_fields}
+        names = list(columns)
+        return [
+            _construct(EmailData, dict(zip(names, values, strict=True)))
+            for values in zip(*columns.values(), strict=True)
+        ]
@@ -68,22 +68,31 @@ def clean_html(html: str) -> str:
     logger = logging.getLogger(__name__)
     try:
         html = quopri.decodestring(html.encode("utf-8")).decode("utf-8", errors="ignore")
-        soup = BeautifulSoup(html, "lxml")
-        text = soup.get_text(separator="\n")
-        lines = text.splitlines()
-        cleaned = []
-        for line in lines:
-            cleaned_line = re.sub(r"[\u200b\u200c\u200d\u2060\uFEFF]", "", line)
-            cleaned_line = cleaned_line.strip()
-            if cleaned_line:
-                cleaned.append(cleaned_line)
-        return " ".join(cleaned)
+        return soup_to_text(BeautifulSoup(html, "lxml"))
     except (TypeError, UnicodeDecodeError) as error:
         logger.warning("Encountered error trying to clean HTML content, see DEBUG for details.")
         logger.debug(error)
         return html
 
 
+def soup_to_text(soup: BeautifulSoup) -> str:
+    """Extract meaningful plain-text from an already parsed HTML tree.
+
+    Args:
+        soup: Parsed HTML tree.
+
+    Returns:
+        A cleaned, whitespace-normalized plain-text string.
+    """
+    cleaned = []
+    for line in soup.get_text(separator="\n").splitlines():
+        cleaned_line = re.sub(r"[\u200b\u200c\u200d\u2060\uFEFF]", "", line)
+        cleaned_line = cleaned_line.strip()
+        if cleaned_line:
+            cleaned.append(cleaned_line)
+    return " ".join(cleaned)
+
+
 def email_by_id(email_id: int, emails: list[EmailData]) -> EmailData:
     """Return the EmailData object that matches the given id.
 
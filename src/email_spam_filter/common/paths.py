@@ -22,9 +22,15 @@ LABELS_DIR = DATA_DIR / "labels"
 PROCESSED_DIR = DATA_DIR / "processed"
 """Path to the processed data folder."""
 
+CORPUS_DIR = PROCESSED_DIR / "corpus"
+"""Path to the corpus of every processed dataset, partitioned by source and tag."""
+
 RAW_DIR = DATA_DIR / "raw"
 """Path to the raw data folder."""
 
+IMAP_SYNC_STATE_PATH = DATA_DIR / "imap_sync_state.json"
+"""Path to the per-folder IMAP sync state (UIDVALIDITY and highest fetched UID), next to RAW_DIR."""
+
 RAW_EXTERNAL_DIR = DATA_DIR / "raw_external"
 """Path to the raw external data folder. (e.g. TREC, SpamAssassin etc.)"""
 
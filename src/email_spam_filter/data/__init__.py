@@ -2,6 +2,8 @@
 
 Modules:
     collection: Source-specific data collection utilities for acquiring external datasets.
+    corpus: Partitioned on-disk corpus combining every processed dataset.
+    dedup: Exact and near-duplicate detection for parsed emails.
     io: Input/output utilities for reading, writing, and processing email data.
     labelling: Manual labelling utilities for supervised learning workflows.
     organise: Source-specific pre-processing utilities for external datasets.
@@ -11,6 +13,8 @@ from __future__ import annotations
 
 __all__ = (
     "collection",
+    "corpus",
+    "dedup",
     "io",
     "labelling",
     "organise",
@@ -18,6 +22,8 @@ __all__ = (
 
 from email_spam_filter.data import (
     collection,
+    corpus,
+    dedup,
     io,
     labelling,
     organise,
@@ -1,13 +1,40 @@
 """Scripts and utilities for collecting personal email data.
 
 Modules:
+    containers: Data containers and shared resources for personal email collection.
     functions: Functions for connecting to email client, retrieving messages, and saving raw data.
 """
 
 from __future__ import annotations
 
-__all__ = ("fetch_and_save_emails",)
+__all__ = (
+    "AsyncIMAPClient",
+    "AsyncIMAPConnectionPool",
+    "CompressedIMAP4",
+    "CompressedIMAP4SSL",
+    "FolderSyncState",
+    "IMAPConnectionPool",
+    "MessagePart",
+    "RawEmailWriter",
+    "async_download_folders",
+    "async_fetch_and_save_emails",
+    "download_folders",
+    "fetch_and_save_emails",
+)
 
+from email_spam_filter.data.collection.personal.containers import (
+    AsyncIMAPClient,
+    AsyncIMAPConnectionPool,
+    CompressedIMAP4,
+    CompressedIMAP4SSL,
+    FolderSyncState,
+    IMAPConnectionPool,
+    MessagePart,
+    RawEmailWriter,
+)
 from email_spam_filter.data.collection.personal.functions import (
+    async_download_folders,
+    async_fetch_and_save_emails,
+    download_folders,
     fetch_and_save_emails,
 )
@@ -0,0 +1,681 @@
+"""Data containers and shared resources for personal email collection."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import imaplib
+import itertools
+import logging
+import re
+import threading
+import typing
+import zlib
+
+from email_spam_filter.common.containers import FrozenBaseModel
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import io
+    import ssl
+    import types
+
+logger = logging.getLogger(__name__)
+
+_LITERAL_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(rb"\{(\d+)\}\r?\n?$")
+_UIDVALIDITY_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(rb"\[UIDVALIDITY (\d+)\]")
+_MAX_LINE: typing.Final[int] = 1_000_000
+"""Longest response line accepted from the server, as in imaplib."""
+
+type IMAPResponseData = list[bytes | tuple[bytes, bytes]]
+"""Untagged response data in imaplib's layout: literals as (header, literal) tuples."""
+
+
+class FolderSyncState(FrozenBaseModel):
+    """Incremental sync position of a single IMAP folder.
+
+    UIDs are only meaningful while the folder's UIDVALIDITY is unchanged, so both are stored
+    together and a new UIDVALIDITY invalidates `last_uid`.
+
+    Attributes:
+        uidvalidity: UIDVALIDITY of the folder when it was last synced.
+        last_uid: Highest UID fetched and saved from the folder.
+    """
+
+    uidvalidity: int
+    last_uid: int = 0
+
+
+class MessagePart(FrozenBaseModel):
+    """A single non-multipart part of a message, as described by its IMAP BODYSTRUCTURE.
+
+    Attributes:
+        section: IMAP section number of the part (e.g. 1.2), usable in `BODY.PEEK[<section>]`.
+        content_type: Lower-case MIME type (e.g. text/plain).
+        params: Content-Type parameters such as the charset, as (lower-case name, value).
+        encoding: Lower-case Content-Transfer-Encoding of the part.
+        size: Size of the encoded part body in octets, or zero for an attached message.
+        disposition: Lower-case Content-Disposition type, or None if the part has none.
+    """
+
+    section: str
+    content_type: str
+    params: tuple[tuple[str, str], ...] = ()
+    encoding: str = "7bit"
+    size: int = 0
+    disposition: str | None = None
+
+
+class CompressedIMAP4(imaplib.IMAP4):
+    """IMAP4 client that can compress its connection with COMPRESS=DEFLATE (RFC 4978).
+
+    Until `compress` succeeds the client behaves exactly like `imaplib.IMAP4`. Afterwards every
+    byte sent is raw DEFLATE data, flushed at the end of each command, and every byte received
+    is inflated before imaplib parses it. Raw RFC822 text typically shrinks several-fold, which
+    matters most for full-mailbox downloads.
+
+    Example:
+        >>> imap = CompressedIMAP4SSL(host)
+        >>> imap.login(user, password)
+        >>> imap.compress()
+    """
+
+    _compressor: zlib._Compress | None = None
+    _decompressor: zlib._Decompress | None = None
+    _inflated: bytearray
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the connection is compressed."""
+        return self._compressor is not None
+
+    def compress(self, level: int = 6) -> bool:
+        """Switch the connection to COMPRESS=DEFLATE if the server advertises it.
+
+        Servers often only advertise the extension once logged in, so the capabilities are
+        requested again rather than taken from the greeting.
+
+        Args:
+            level: zlib compression level of the data sent, from 0 to 9.
+
+        Returns:
+            True if the connection is now compressed, False if it was left uncompressed.
+        """
+        if self.compressed:
+            return True
+        _, data = self.capability()
+        capabilities = b" ".join(item for item in data if isinstance(item, bytes)).upper()
+        if b"COMPRESS=DEFLATE" not in capabilities.split():
+            logger.info("IMAP server does not support COMPRESS=DEFLATE.")
+            return False
+        status, _ = self.xatom("COMPRESS", "DEFLATE")
+        if status != "OK":
+            logger.warning("IMAP server refused COMPRESS=DEFLATE with status %s.", status)
+            return False
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._inflated = bytearray()
+        return True
+
+    def send(self, data: collections.abc.Buffer) -> None:
+        """Send data to the server, compressing it once compression is enabled."""
+        if self._compressor is not None:
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        super().send(data)
+
+    def read(self, size: int) -> bytes:
+        """Read `size` bytes from the server, inflating them once compression is enabled."""
+        if self._decompressor is None:
+            return super().read(size)
+        while len(self._inflated) < size:
+            self._inflate(self._decompressor)
+        data = bytes(self._inflated[:size])
+        del self._inflated[:size]
+        return data
+
+    def readline(self) -> bytes:
+        """Read a line from the server, inflating it once compression is enabled."""
+        if self._decompressor is None:
+            return super().readline()
+        while (end := self._inflated.find(b"\n")) < 0:
+            if len(self._inflated) > _MAX_LINE:
+                error_message = f"got more than {_MAX_LINE} bytes"
+                raise self.error(error_message)
+            self._inflate(self._decompressor)
+        line = bytes(self._inflated[: end + 1])
+        del self._inflated[: end + 1]
+        return line
+
+    def _inflate(self, decompressor: zlib._Decompress) -> None:
+        """Read the next chunk of compressed data from the server and inflate it."""
+        chunk = typing.cast("io.BufferedReader", self.file).read1(64 * 1024)
+        if not chunk:
+            error_message = "socket error: EOF"
+            raise self.abort(error_message)
+        self._inflated += decompressor.decompress(chunk)
+
+
+class CompressedIMAP4SSL(CompressedIMAP4, imaplib.IMAP4_SSL):
+    """IMAP4_SSL client that can compress its connection with COMPRESS=DEFLATE.
+
+    See `CompressedIMAP4`. Compression is applied inside TLS.
+    """
+
+
+class IMAPConnectionPool:
+    """Thread-safe pool of logged-in IMAP connections.
+
+    Connections are opened lazily, one login each, up to `size`. A thread borrows a connection
+    for the duration of a `with pool.connection()` block, so no connection is ever used by two
+    threads at once. Connections that fail with a socket or protocol abort are discarded, which
+    wakes a thread waiting for a connection so that it opens a replacement.
+
+    Example:
+        >>> with IMAPConnectionPool(connect, size=4) as pool, pool.connection() as imap:
+        ...     imap.select("INBOX", readonly=True)
+    """
+
+    def __init__(
+        self, connect: collections.abc.Callable[[], imaplib.IMAP4], *, size: int = 4
+    ) -> None:
+        """Initialize an IMAPConnectionPool instance.
+
+        Args:
+            connect: Callable returning a new, logged-in IMAP connection.
+            size: Maximum number of open connections.
+        """
+        if size < 1:
+            error_message = f"size must be positive, got {size}."
+            raise ValueError(error_message)
+        self.size = size
+        self._connect = connect
+        self._idle: list[imaplib.IMAP4] = []
+        self._open: list[imaplib.IMAP4] = []
+        self._n_reserved = 0
+        self._available = threading.Condition()
+
+    def __enter__(self) -> IMAPConnectionPool:
+        """Return the pool itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        """Log out of every open connection."""
+        self.close()
+
+    @contextlib.contextmanager
+    def connection(self) -> collections.abc.Iterator[imaplib.IMAP4]:
+        """Borrow a connection, opening a new one if none is idle and the pool is not full.
+
+        Yields:
+            A logged-in IMAP connection, returned to the pool when the block exits.
+        """
+        imap = self._acquire()
+        broken = False
+        try:
+            yield imap
+        except (imaplib.IMAP4.abort, OSError):
+            broken = True
+            raise
+        finally:
+            if broken:
+                self._discard(imap)
+            else:
+                self._release(imap)
+
+    def _acquire(self) -> imaplib.IMAP4:
+        """Return an idle connection, open a new one, or wait for a slot to become available."""
+        with self._available:
+            while not self._idle and self._n_reserved >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._n_reserved += 1
+        try:
+            imap = self._connect()
+        except BaseException:
+            with self._available:
+                self._n_reserved -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._open.append(imap)
+        return imap
+
+    def _release(self, imap: imaplib.IMAP4) -> None:
+        """Return a healthy connection to the pool and wake one waiting thread."""
+        with self._available:
+            self._idle.append(imap)
+            self._available.notify()
+
+    def _discard(self, imap: imaplib.IMAP4) -> None:
+        """Drop a broken connection and wake one waiting thread to open a replacement."""
+        logger.warning("Discarding broken IMAP connection.")
+        with self._available:
+            self._open.remove(imap)
+            self._n_reserved -= 1
+            self._available.notify()
+        with contextlib.suppress(OSError):
+            imap.shutdown()
+
+    def close(self) -> None:
+        """Log out of every open connection."""
+        with self._available:
+            connections, self._open = self._open, []
+            self._idle.clear()
+            self._n_reserved = 0
+            self._available.notify_all()
+        for imap in connections:
+            with contextlib.suppress(imaplib.IMAP4.error, OSError):
+                imap.logout()
+
+
+class RawEmailWriter:
+    """Thread-safe sink shared by download workers that saves raw emails and counts progress.
+
+    Saves are serialised behind a lock, so any `save` callable can be shared by many threads,
+    and an aggregate progress count is logged every `log_every` emails.
+    """
+
+    def __init__(
+        self,
+        save: collections.abc.Callable[[str, bytes, str], None],
+        *,
+        log_every: int = 500,
+    ) -> None:
+        """Initialize a RawEmailWriter instance.
+
+        Args:
+            save: Callable persisting a single raw email given (uid, raw_bytes, label).
+            log_every: Number of saved emails between progress log messages.
+        """
+        self._save = save
+        self.log_every = log_every
+        self.total = 0
+        self.n_written = 0
+        self._lock = threading.Lock()
+
+    def add_total(self, n_emails: int) -> None:
+        """Add to the number of emails expected across all workers.
+
+        Args:
+            n_emails: Number of emails a worker is about to download.
+        """
+        with self._lock:
+            self.total += n_emails
+
+    def write(self, uid: str, raw_bytes: bytes, label: str) -> None:
+        """Save a single raw email and update the progress count.
+
+        Args:
+            uid: The message UID identifier.
+            raw_bytes: The raw RFC822 message contents.
+            label: The folder label.
+        """
+        with self._lock:
+            self._save(uid, raw_bytes, label)
+            self.n_written += 1
+            if self.n_written % self.log_every == 0:
+                logger.info("Saved %d/%d emails.", self.n_written, self.total)
+
+
+class AsyncIMAPClient:
+    """Minimal asyncio IMAP4rev1 client over a single connection.
+
+    Supports the read-only subset needed for collection: LOGIN, EXAMINE, UID SEARCH, UID FETCH,
+    IDLE, COMPRESS=DEFLATE and LOGOUT. Responses are returned in the same layout as imaplib so
+    that response parsing is shared with the blocking client. One command is in flight per
+    connection at a time; concurrency comes from using several clients.
+
+    Example:
+        >>> async with await AsyncIMAPClient.connect(host, ssl_context=ctx) as client:
+        ...     await client.login(user, password)
+        ...     await client.compress()
+        ...     await client.select("INBOX")
+    """
+
+    _compressor: zlib._Compress | None = None
+    _decompressor: zlib._Decompress | None = None
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Initialize an AsyncIMAPClient instance over an open, greeted connection.
+
+        Args:
+            reader: Stream reader of the connection.
+            writer: Stream writer of the connection.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._tags = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._inflated = bytearray()
+
+    @classmethod
+    async def connect(
+        cls, host: str, port: int = 993, *, ssl_context: ssl.SSLContext | None = None
+    ) -> AsyncIMAPClient:
+        """Open a connection to an IMAP server and read its greeting.
+
+        Args:
+            host: IMAP server host.
+            port: IMAP server port.
+            ssl_context: TLS context to use, or None for a plain connection.
+
+        Returns:
+            A connected, not yet logged-in client.
+        """
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        client = cls(reader, writer)
+        greeting = await reader.readline()
+        if not greeting.startswith(b"* OK"):
+            await client.close()
+            error_message = f"Unexpected IMAP greeting: {greeting!r}"
+            raise imaplib.IMAP4.error(error_message)
+        return client
+
+    async def __aenter__(self) -> AsyncIMAPClient:
+        """Return the client itself."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        """Log out and close the connection."""
+        await self.logout()
+
+    async def command(self, name: str, *args: str) -> tuple[str, IMAPResponseData]:
+        """Send a command and collect its untagged responses until the tagged completion.
+
+        Args:
+            name: The IMAP command, e.g. `UID FETCH`.
+            *args: Already quoted command arguments.
+
+        Returns:
+            The completion status (`OK`, `NO` or `BAD`) and the untagged response data.
+        """
+        async with self._lock:
+            tag = b"A%04d" % next(self._tags)
+            await self._send(b" ".join([tag, name.encode(), *(a.encode() for a in args)]) + b"\r\n")
+            data: IMAPResponseData = []
+            while True:
+                line = await self._readline()
+                if line.startswith(tag + b" "):
+                    status = line[len(tag) + 1 :].split(b" ", 1)[0]
+                    return status.decode(), data
+                await self._read_untagged(line.removeprefix(b"* "), data)
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the connection is compressed."""
+        return self._compressor is not None
+
+    async def compress(self, level: int = 6) -> bool:
+        """Switch the connection to COMPRESS=DEFLATE if the server advertises it.
+
+        The asyncio equivalent of `CompressedIMAP4.compress`.
+
+        Args:
+            level: zlib compression level of the data sent, from 0 to 9.
+
+        Returns:
+            True if the connection is now compressed, False if it was left uncompressed.
+        """
+        if self.compressed:
+            return True
+        _, data = await self.command("CAPABILITY")
+        capabilities = b" ".join(item for item in data if isinstance(item, bytes)).upper()
+        if b"COMPRESS=DEFLATE" not in capabilities.split():
+            logger.info("IMAP server does not support COMPRESS=DEFLATE.")
+            return False
+        status, _ = await self.command("COMPRESS", "DEFLATE")
+        if status != "OK":
+            logger.warning("IMAP server refused COMPRESS=DEFLATE with status %s.", status)
+            return False
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return True
+
+    async def _send(self, data: bytes) -> None:
+        """Send data to the server, compressing it once compression is enabled."""
+        if self._compressor is not None:
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def _readline(self) -> bytes:
+        """Read one response line, raising an abort if the server closed the connection."""
+        if self._decompressor is None:
+            line = await self._reader.readline()
+            if not line:
+                error_message = "socket error: EOF"
+                raise imaplib.IMAP4.abort(error_message)
+            return line
+        while (end := self._inflated.find(b"\n")) < 0:
+            if len(self._inflated) > _MAX_LINE:
+                error_message = f"got more than {_MAX_LINE} bytes"
+                raise imaplib.IMAP4.error(error_message)
+            await self._inflate(self._decompressor)
+        line = bytes(self._inflated[: end + 1])
+        del self._inflated[: end + 1]
+        return line
+
+    async def _readexactly(self, size: int) -> bytes:
+        """Read `size` bytes from the server, inflating them once compression is enabled."""
+        if self._decompressor is None:
+            return await self._reader.readexactly(size)
+        while len(self._inflated) < size:
+            await self._inflate(self._decompressor)
+        data = bytes(self._inflated[:size])
+        del self._inflated[:size]
+        return data
+
+    async def _inflate(self, decompressor: zlib._Decompress) -> None:
+        """Read the next chunk of compressed data from the server and inflate it."""
+        chunk = await self._reader.read(64 * 1024)
+        if not chunk:
+            error_message = "socket error: EOF"
+            raise imaplib.IMAP4.abort(error_message)
+        self._inflated += decompressor.decompress(chunk)
+
+    async def _read_untagged(self, line: bytes, data: IMAPResponseData) -> None:
+        """Read the rest of an untagged response, including any literals, into `data`."""
+        while (match := _LITERAL_REGEX.search(line)) is not None:
+            literal = await self._readexactly(int(match.group(1)))
+            data.append((line.rstrip(b"\r\n"), literal))
+            line = await self._readline()
+        data.append(line.rstrip(b"\r\n"))
+
+    async def login(self, user: str, password: str) -> None:
+        """Authenticate with a user name and password.
+
+        Args:
+            user: The user name.
+            password: The password.
+        """
+        status, _ = await self.command("LOGIN", _quote(user), _quote(password))
+        if status != "OK":
+            error_message = f"LOGIN failed with status {status}."
+            raise imaplib.IMAP4.error(error_message)
+
+    async def select(self, folder: str) -> int | None:
+        """Select a folder read-only.
+
+        Args:
+            folder: The name of the IMAP folder to select (e.g., 'INBOX').
+
+        Returns:
+            The folder's UIDVALIDITY, 0 if the server did not report it, or None if the folder
+            could not be selected.
+        """
+        status, data = await self.command("EXAMINE", _quote(folder))
+        if status != "OK":
+            return None
+        for item in data:
+            match = _UIDVALIDITY_REGEX.search(item if isinstance(item, bytes) else item[0])
+            if match is not None:
+                return int(match.group(1))
+        return 0
+
+    async def uid(self, name: str, *args: str) -> tuple[str, IMAPResponseData]:
+        """Run a UID command, returning data shaped like `imaplib.IMAP4.uid`.
+
+        Args:
+            name: The UID command, `SEARCH` or `FETCH`.
+            *args: Already quoted command arguments.
+
+        Returns:
+            The completion status and the response data. SEARCH data is a single item holding
+            the space separated UIDs.
+        """
+        status, data = await self.command(f"UID {name}", *args)
+        if name.upper() == "SEARCH":
+            hits = [
+                item.removeprefix(b"SEARCH").strip()
+                for item in data
+                if isinstance(item, bytes) and item.startswith(b"SEARCH")
+            ]
+            return status, [b" ".join(hits)]
+        return status, data
+
+    async def idle(self, max_wait: float) -> list[bytes]:
+        """Wait in IDLE (RFC 2177) until the server reports a change to the selected folder.
+
+        IDLE is ended with DONE after the first untagged update, e.g. `5 EXISTS` for a new
+        message, or once `max_wait` seconds have passed without one. Servers may drop an idle
+        connection after 30 minutes, so callers should re-issue IDLE well within that.
+
+        Args:
+            max_wait: Maximum number of seconds to wait for an update.
+
+        Returns:
+            The untagged updates received while idling, without their `* ` prefix. Empty if
+            `max_wait` passed without one.
+
+        Raises:
+            imaplib.IMAP4.error: If the server does not accept IDLE.
+        """
+        async with self._lock:
+            tag = b"A%04d" % next(self._tags)
+            await self._send(tag + b" IDLE\r\n")
+            updates: list[bytes] = []
+            while not (line := await self._readline()).startswith(b"+"):
+                if line.startswith(tag + b" "):
+                    error_message = f"IDLE rejected: {line.decode(errors='replace').strip()}"
+                    raise imaplib.IMAP4.error(error_message)
+                updates.append(line.removeprefix(b"* ").rstrip(b"\r\n"))
+            if not updates:
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(max_wait):
+                        line = await self._readline()
+                        updates.append(line.removeprefix(b"* ").rstrip(b"\r\n"))
+            await self._send(b"DONE\r\n")
+            while not (line := await self._readline()).startswith(tag + b" "):
+                updates.append(line.removeprefix(b"* ").rstrip(b"\r\n"))
+            return updates
+
+    async def logout(self) -> None:
+        """Log out, if the connection is still usable, and close it."""
+        with contextlib.suppress(imaplib.IMAP4.error, OSError, asyncio.IncompleteReadError):
+            async with asyncio.timeout(5):
+                await self.command("LOGOUT")
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the connection without logging out."""
+        self._writer.close()
+        with contextlib.suppress(OSError):
+            await self._writer.wait_closed()
+
+
+class AsyncIMAPConnectionPool:
+    """Pool of logged-in AsyncIMAPClient connections shared between asyncio tasks.
+
+    The asyncio counterpart of IMAPConnectionPool. Connections are opened lazily up to `size`
+    and each is lent to one task at a time. A connection is discarded, and replaced on the next
+    request, when the borrowing task fails with anything other than a plain IMAP error,
+    including cancellation, since its response stream may be left half read.
+    """
+
+    def __init__(
+        self,
+        connect: collections.abc.Callable[[], collections.abc.Awaitable[AsyncIMAPClient]],
+        *,
+        size: int = 4,
+    ) -> None:
+        """Initialize an AsyncIMAPConnectionPool instance.
+
+        Args:
+            connect: Coroutine function returning a new, logged-in AsyncIMAPClient.
+            size: Maximum number of open connections.
+        """
+        if size < 1:
+            error_message = f"size must be positive, got {size}."
+            raise ValueError(error_message)
+        self.size = size
+        self._connect = connect
+        self._slots: asyncio.Queue[AsyncIMAPClient | None] = asyncio.Queue()
+        for _ in range(size):
+            self._slots.put_nowait(None)
+        self._open: set[AsyncIMAPClient] = set()
+
+    async def __aenter__(self) -> AsyncIMAPConnectionPool:
+        """Return the pool itself."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        """Log out of every open connection."""
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> collections.abc.AsyncIterator[AsyncIMAPClient]:
+        """Borrow a connection, opening a new one if the borrowed slot has none.
+
+        Yields:
+            A logged-in AsyncIMAPClient, returned to the pool when the block exits.
+        """
+        client = await self._slots.get()
+        try:
+            if client is None:
+                client = await self._connect()
+                self._open.add(client)
+            yield client
+        except BaseException as error:
+            broken = not isinstance(error, imaplib.IMAP4.error) or isinstance(
+                error, imaplib.IMAP4.abort
+            )
+            if broken and client is not None:
+                self._open.discard(client)
+                await client.close()
+                client = None
+            raise
+        finally:
+            # A connection logged out by `close` while borrowed leaves an empty slot behind.
+            self._slots.put_nowait(client if client in self._open else None)
+
+    async def close(self) -> None:
+        """Log out of every open connection and empty their slots, so the pool can reconnect."""
+        connections, self._open = self._open, set()
+        n_idle = self._slots.qsize()
+        while not self._slots.empty():
+            self._slots.get_nowait()
+        for _ in range(n_idle):
+            self._slots.put_nowait(None)
+        await asyncio.gather(*(client.logout() for client in connections))
+
+
+def _quote(argument: str) -> str:
+    """Quote a string argument of an IMAP command."""
+    escaped = argument.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
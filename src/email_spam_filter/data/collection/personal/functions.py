@@ -2,8 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
 import imaplib
+import itertools
+import json
 import logging
+import re
 import ssl
 import typing
 
@@ -16,13 +25,41 @@ from email_spam_filter.common.constants import (
     KEYRING_SERVICE,
     USER_EMAIL,
 )
+from email_spam_filter.data.collection.personal.containers import (
+    AsyncIMAPClient,
+    AsyncIMAPConnectionPool,
+    CompressedIMAP4SSL,
+    FolderSyncState,
+    IMAPConnectionPool,
+    MessagePart,
+    RawEmailWriter,
+)
+from email_spam_filter.data.io.containers import RawEmailStore
+from email_spam_filter.data.io.functions import PLACEHOLDER_SIZE_HEADER
 
 if typing.TYPE_CHECKING:
-    import collections.abc
     import pathlib
 
 logger = logging.getLogger(__name__)
 
+_FETCH_UID_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(rb"\bUID (\d+)")
+_UIDVALIDITY_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(rb"UIDVALIDITY (\d+)")
+_FETCH_TOKEN_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(
+    rb'\s*(?:([()])|"((?:[^"\\]|\\.)*)"|([^\s()"\[\]]+(?:\[[^\]]*\])?(?:<\d+>)?))'
+)
+_LITERAL_MARKER_REGEX: typing.Final[re.Pattern[bytes]] = re.compile(rb"\{\d+\}$")
+_PARTIAL_FETCH_ITEMS: typing.Final[str] = "(UID BODYSTRUCTURE BODY.PEEK[HEADER])"
+_MIME_HEADERS: typing.Final[frozenset[bytes]] = frozenset(
+    {b"content-type", b"content-transfer-encoding", b"mime-version"}
+)
+
+type FetchValue = str | bytes | list[FetchValue] | None
+"""A parsed FETCH data item: atoms as str, strings and literals as bytes, NIL as None."""
+type FetchPlan = collections.abc.Generator[
+    tuple[str, str], tuple[str, list[typing.Any]], dict[bytes, bytes]
+]
+"""The UID FETCH commands downloading a batch of messages, without I/O, see `_fetch_batch_plan`."""
+
 
 def get_imap_password() -> str:
     """Retrieve the IMAP password for the configured user from the system keyring.
@@ -50,49 +87,698 @@ def get_imap_password() -> str:
     return password
 
 
-def fetch_folder(
-    imap: imaplib.IMAP4_SSL,
+def select_folder(imap: imaplib.IMAP4, folder: str, *, readonly: bool = True) -> int | None:
+    """Select an IMAP folder and return its UIDVALIDITY.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
+        folder: The name of the IMAP folder to select (e.g., 'INBOX').
+        readonly: If True, select the folder read-only so that no flags are changed. Set it to
+            False to modify the folder, e.g. with `move_messages`.
+
+    Returns:
+        The folder's UIDVALIDITY, or None if the folder could not be selected.
+    """
+    try:
+        status, _ = imap.select(folder, readonly=readonly)
+    except imaplib.IMAP4.error:
+        status = "NO"
+    if status != "OK":
+        logger.warning("Failed to find folder '%s'. Skipping.", folder)
+        return None
+    _, data = imap.response("UIDVALIDITY")
+    for item in data:
+        if isinstance(item, bytes) and item.strip().isdigit():
+            return int(item)
+    # Some servers only report UIDVALIDITY through STATUS.
+    _, data = imap.status(folder, "(UIDVALIDITY)")
+    match = _UIDVALIDITY_REGEX.search(data[0] or b"") if data else None
+    return int(match.group(1)) if match else 0
+
+
+def search_folder_uids(imap: imaplib.IMAP4, since_uid: int = 0) -> list[bytes]:
+    """Return the UIDs of the selected folder greater than `since_uid`, in ascending order.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client with a folder selected.
+        since_uid: Only UIDs strictly greater than this are returned.
+
+    Returns:
+        The matching UIDs as ASCII bytes.
+    """
+    status, data = imap.uid("SEARCH", f"UID {since_uid + 1}:*")
+    return _new_uids(status, data, since_uid)
+
+
+def _new_uids(status: str, data: list[typing.Any], since_uid: int) -> list[bytes]:
+    """Extract the UIDs above `since_uid` from a `UID SEARCH UID n:*` response.
+
+    Args:
+        status: The completion status of the search.
+        data: The search response data.
+        since_uid: Only UIDs strictly greater than this are returned.
+
+    Returns:
+        The matching UIDs as ASCII bytes, in ascending order.
+    """
+    if status != "OK" or not data or not data[0]:
+        return []
+    # `n:*` always matches the highest UID, even when it is below n.
+    return sorted((uid for uid in data[0].split() if int(uid) > since_uid), key=int)
+
+
+def fetch_messages(  # noqa: PLR0913
+    imap: imaplib.IMAP4,
+    uids: collections.abc.Sequence[bytes],
+    label: str,
+    *,
+    batch_size: int = 500,
+    partial: bool = False,
+    missing: list[bytes] | None = None,
+) -> collections.abc.Iterator[tuple[str, bytes, str]]:
+    """Yield raw messages of the selected folder by UID as (uid, raw_bytes, label).
+
+    Messages are requested `batch_size` at a time with a single UID FETCH over a message-set
+    range (e.g. `1:500`), so a folder costs one round trip per batch instead of one per message,
+    and at most one batch of raw messages is held in memory.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client with a folder selected.
+        uids: The UIDs to fetch, as returned by `search_folder_uids`.
+        label: A short label to attach to each message (e.g., 'inbox', 'spam').
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, only the headers and text parts are downloaded and attachments are
+            replaced by empty placeholders, see `_fetch_batch_plan`.
+        missing: If given, the UIDs missing from the FETCH responses are appended to it, so
+            that a sync does not advance past them.
+
+    Yields:
+        Tuples of (uid, raw_bytes, label), in the order of `uids`.
+    """
+    for batch in _fetch_batches(uids, batch_size):
+        plan = _fetch_batch_plan(batch, partial=partial)
+        try:
+            command = next(plan)
+            while True:
+                command = plan.send(imap.uid("FETCH", *command))
+        except StopIteration as stop:
+            fetched: dict[bytes, bytes] = stop.value
+        messages, batch_missing = _fetched_messages(batch, fetched, label)
+        if missing is not None:
+            missing.extend(batch_missing)
+        yield from messages
+
+
+def _fetch_batches(
+    uids: collections.abc.Sequence[bytes], batch_size: int
+) -> collections.abc.Iterator[tuple[bytes, ...]]:
+    """Split UIDs into batches of at most `batch_size`, each downloaded by one FETCH plan.
+
+    Raises:
+        ValueError: If `batch_size` is not positive.
+    """
+    if batch_size < 1:
+        error_message = f"batch_size must be positive, got {batch_size}."
+        raise ValueError(error_message)
+    return itertools.batched(uids, batch_size)
+
+
+def _fetch_batch_plan(uids: collections.abc.Sequence[bytes], *, partial: bool) -> FetchPlan:
+    """Plan the UID FETCH commands downloading a batch of messages, without doing any I/O.
+
+    The plan yields the (message set, data items) of every command and is sent back each
+    command's (status, data) response, so the blocking and asyncio clients share it and only
+    carry out the I/O. Without `partial`, one `RFC822` fetch downloads the whole batch.
+
+    With `partial`, the BODYSTRUCTURE and header of every message are fetched first. Then only
+    the first inline text/plain and text/html sections, which are all `parse_email_message`
+    decodes, are fetched with `BODY.PEEK[<section>]`, using one command per group of messages
+    that share the same section numbers. See `_assemble_partial_message` for the rebuilt
+    message.
+
+    Args:
+        uids: The UIDs to fetch.
+        partial: If True, skip attachment payloads.
+
+    Returns:
+        Mapping of UID to the raw, or rebuilt, message. Messages that failed to fetch are
+        missing.
+    """
+    if not partial:
+        status, msg_data = yield _message_set(uids), "(RFC822)"
+        return dict(_parse_fetch_response(msg_data)) if status == "OK" else {}
+    status, msg_data = yield _message_set(uids), _PARTIAL_FETCH_ITEMS
+    if status != "OK":
+        return {}
+    structures, groups = _plan_partial_fetch(msg_data)
+    sections: dict[bytes, dict[str, FetchValue]] = {}
+    for wanted, group in groups.items():
+        status, msg_data = yield _message_set(group), _section_fetch_items(wanted)
+        if status == "OK":
+            sections.update(_parse_fetch_items(msg_data))
+    return _assemble_partial_messages(structures, sections)
+
+
+def _fetched_messages(
+    uids: collections.abc.Sequence[bytes], fetched: dict[bytes, bytes], label: str
+) -> tuple[list[tuple[str, bytes, str]], list[bytes]]:
+    """Order the fetched messages of a batch by UID, warning about the missing ones.
+
+    Args:
+        uids: The UIDs that were requested.
+        fetched: Mapping of UID to raw message, as returned by a FETCH plan.
+        label: A short label to attach to each message.
+
+    Returns:
+        The (uid, raw_bytes, label) of every fetched message and the UIDs that are missing,
+        both in the order of `uids`.
+    """
+    messages, missing = [], []
+    for uid in uids:
+        raw = fetched.get(uid)
+        if raw is None:
+            logger.warning("Failed to fetch message UID %s.", uid.decode())
+            missing.append(uid)
+            continue
+        messages.append((uid.decode(), raw, label))
+    return messages, missing
+
+
+def fetch_folder(  # noqa: PLR0913
+    imap: imaplib.IMAP4,
     folder: str,
     label: str,
     limit: int | None = None,
+    *,
+    batch_size: int = 500,
+    partial: bool = False,
 ) -> collections.abc.Iterator[tuple[str, bytes, str]]:
     """Yield raw messages from an IMAP folder as (uid, raw_bytes, label).
 
     Args:
-        imap: An authenticated IMAP4_SSL client.
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
         folder: The name of the IMAP folder to select (e.g., 'INBOX').
         label: A short label to attach to each message (e.g., 'inbox', 'spam').
         limit: Maximum number of messages to fetch (most recent). If None, fetch all.
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
 
     Yields:
         Tuples of (uid, raw_bytes, label).
     """
     logger.info("Selecting folder: '%s' (label: %s)...", folder, label)
-
-    imap.select(folder, readonly=True)
-    try:
-        status, data = imap.search(None, "ALL")
-    except imaplib.IMAP4.error:
-        logger.warning("Failed to find folder '%s'. Skipping.", folder)
+    if select_folder(imap, folder) is None:
         return
 
-    uids = data[0].split()
+    uids = _limit_uids(folder, search_folder_uids(imap), limit, oldest=False)
+    yield from fetch_messages(imap, uids, label, batch_size=batch_size, partial=partial)
+
+
+def _limit_uids(folder: str, uids: list[bytes], limit: int | None, *, oldest: bool) -> list[bytes]:
+    """Keep at most `limit` UIDs of a folder and log how many are to be fetched.
+
+    Args:
+        folder: The name of the IMAP folder.
+        uids: The folder's UIDs, in ascending order.
+        limit: Maximum number of UIDs to keep. If None, keep all.
+        oldest: If True, keep the lowest UIDs so that a sync can resume after them. Otherwise
+            keep the highest, i.e. the most recent messages.
+
+    Returns:
+        The kept UIDs, in ascending order.
+    """
     if limit is not None:
-        uids = uids[-limit:]
+        uids = uids[:limit] if oldest else uids[-limit:]
+    logger.info("Found %d messages to fetch in folder: '%s'.", len(uids), folder)
+    return uids
 
-    logger.info("Found %d messages in folder: '%s'.", len(uids), folder)
 
-    for uid in uids:
-        status, msg_data = imap.fetch(uid, "(RFC822)")
-        if status != "OK" or not msg_data or not msg_data[0]:
-            logger.warning("Failed to fetch message UID %s in folder '%s'.", uid.decode(), folder)
+def move_messages(
+    imap: imaplib.IMAP4,
+    uids: collections.abc.Iterable[bytes | int],
+    destination: str,
+    *,
+    batch_size: int = 500,
+) -> list[int]:
+    """Move messages of the selected folder to another folder, a batch of UIDs per command.
+
+    Each batch is sent as one compact message set (e.g. `3:9,12`). `UID MOVE` (RFC 6851) is used
+    when the server supports it. Otherwise each batch is copied, flagged as deleted and then
+    expunged. The expunge is limited to the batch with `UID EXPUNGE` when the server supports
+    UIDPLUS; without it, a plain EXPUNGE also removes any other message already flagged as
+    deleted in the folder.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client with a folder selected read-write.
+        uids: The UIDs of the messages to move.
+        destination: The name of the IMAP folder to move the messages to (e.g., 'Spam').
+        batch_size: Maximum number of UIDs per command.
+
+    Returns:
+        The UIDs that were moved, in ascending order.
+    """
+    if batch_size < 1:
+        error_message = f"batch_size must be positive, got {batch_size}."
+        raise ValueError(error_message)
+    capabilities = _capabilities(imap)
+    moved: list[int] = []
+    for batch in itertools.batched(sorted({int(uid) for uid in uids}), batch_size):
+        message_set = _message_set(batch)
+        if "MOVE" in capabilities:
+            status, _ = imap.uid("MOVE", message_set, destination)
+        else:
+            status = _copy_and_expunge(
+                imap, message_set, destination, uidplus="UIDPLUS" in capabilities
+            )
+        if status != "OK":
+            logger.warning("Failed to move messages %s to '%s'.", message_set, destination)
+            continue
+        moved.extend(batch)
+    logger.info("Moved %d messages to '%s'.", len(moved), destination)
+    return moved
+
+
+def _copy_and_expunge(
+    imap: imaplib.IMAP4, message_set: str, destination: str, *, uidplus: bool
+) -> str:
+    """Move messages without the MOVE extension, by COPY, flagging as deleted and EXPUNGE.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client with a folder selected read-write.
+        message_set: The UIDs of the messages to move, as an IMAP message set.
+        destination: The name of the IMAP folder to move the messages to.
+        uidplus: If True, expunge only the moved messages with `UID EXPUNGE` (RFC 4315).
+
+    Returns:
+        The status of the first command that failed, or `OK`.
+    """
+    status, _ = imap.uid("COPY", message_set, destination)
+    if status == "OK":
+        status, _ = imap.uid("STORE", message_set, "+FLAGS.SILENT", r"(\Deleted)")
+    if status == "OK":
+        status, _ = imap.uid("EXPUNGE", message_set) if uidplus else imap.expunge()
+    return status
+
+
+def _capabilities(imap: imaplib.IMAP4) -> set[str]:
+    """Return the server's current capabilities, which may change after logging in.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
+
+    Returns:
+        The upper-case capability names.
+    """
+    status, data = imap.capability()
+    if status != "OK":
+        return {capability.upper() for capability in imap.capabilities}
+    return {
+        capability.decode().upper()
+        for item in data
+        if isinstance(item, bytes)
+        for capability in item.split()
+    }
+
+
+def _message_set(ids: collections.abc.Iterable[bytes | int]) -> str:
+    """Compress message numbers into an IMAP message set of ranges, e.g. `1:3,7,9:12`.
+
+    Args:
+        ids: Message sequence numbers or UIDs, as integers or ASCII bytes.
+
+    Returns:
+        The message set, with consecutive numbers collapsed into ranges.
+    """
+    numbers = sorted({int(number) for number in ids})
+    ranges = []
+    for _, run in itertools.groupby(enumerate(numbers), key=lambda pair: pair[1] - pair[0]):
+        run_numbers = [number for _, number in run]
+        first, last = run_numbers[0], run_numbers[-1]
+        ranges.append(str(first) if first == last else f"{first}:{last}")
+    return ",".join(ranges)
+
+
+def _parse_fetch_response(
+    msg_data: list[typing.Any],
+) -> collections.abc.Iterator[tuple[bytes, bytes]]:
+    """Split a multi-message UID FETCH response into its messages.
+
+    imaplib returns each message literal as a `(b"<n> (UID <uid> RFC822 {<size>}", raw_bytes)`
+    tuple, followed by a bytes item closing the response. Servers may also send the UID after
+    the literal, in which case it is found in that closing item. Items without a literal, such
+    as unsolicited FLAGS updates, are skipped.
+
+    Args:
+        msg_data: The data returned by `imaplib.IMAP4.uid("FETCH", ...)`.
+
+    Yields:
+        Tuples of (uid, raw_bytes).
+    """
+    pending: bytes | None = None
+    for item in msg_data:
+        if isinstance(item, tuple):
+            header, pending = item
+            match = _FETCH_UID_REGEX.search(header)
+            if match is not None:
+                yield match.group(1), pending
+                pending = None
+        elif isinstance(item, bytes) and pending is not None:
+            match = _FETCH_UID_REGEX.search(item)
+            if match is not None:
+                yield match.group(1), pending
+            pending = None
+
+
+def _plan_partial_fetch(
+    msg_data: list[typing.Any],
+) -> tuple[dict[bytes, tuple[bytes, list[MessagePart]]], dict[tuple[str, ...], list[bytes]]]:
+    """Work out which text sections to fetch from a BODYSTRUCTURE and header response.
+
+    Args:
+        msg_data: The data returned by a UID FETCH of `_PARTIAL_FETCH_ITEMS`.
+
+    Returns:
+        Mapping of UID to the message's (header, parts), and mapping of each distinct tuple of
+        wanted text sections to the UIDs sharing it. Messages without text parts need no
+        second fetch and are left out of the groups.
+    """
+    structures: dict[bytes, tuple[bytes, list[MessagePart]]] = {}
+    groups: dict[tuple[str, ...], list[bytes]] = collections.defaultdict(list)
+    for uid, items in _parse_fetch_items(msg_data).items():
+        header = items.get("BODY[HEADER]")
+        if not isinstance(header, bytes):
+            continue
+        parts = _message_parts(items.get("BODYSTRUCTURE"))
+        structures[uid] = header, parts
+        if wanted := tuple(part.section for part in _text_parts(parts)):
+            groups[wanted].append(uid)
+    return structures, groups
+
+
+def _section_fetch_items(sections: collections.abc.Iterable[str]) -> str:
+    """Return the FETCH items peeking at the given body sections, e.g. `(UID BODY.PEEK[1])`."""
+    return "(UID " + " ".join(f"BODY.PEEK[{section}]" for section in sections) + ")"
+
+
+def _parse_fetch_items(msg_data: list[typing.Any]) -> dict[bytes, dict[str, FetchValue]]:
+    """Parse the data of a multi-message UID FETCH response into each message's data items.
+
+    Unlike `_parse_fetch_response`, any number of data items and literals per message are
+    supported, as well as the nested lists of a BODYSTRUCTURE.
+
+    Args:
+        msg_data: The data returned by `imaplib.IMAP4.uid("FETCH", ...)`.
+
+    Returns:
+        Mapping of UID to the message's data items, keyed by upper-case item name as sent by
+        the server (e.g. `BODY[1]`, `BODYSTRUCTURE`).
+    """
+    tokens = _tokenize_fetch_data(msg_data)
+    messages: dict[bytes, dict[str, FetchValue]] = {}
+    position = 0
+    while position < len(tokens):
+        # Each response is `<seq> (<name> <value> ...)`, so skip to the opening parenthesis.
+        if tokens[position] != "(":
+            position += 1
             continue
-        raw = typing.cast("tuple[bytes, bytes]", msg_data[0])[1]
-        yield uid.decode(), raw, label
+        value, position = _parse_fetch_value(tokens, position)
+        if not isinstance(value, list):
+            continue
+        items = {
+            str(name).upper(): item for name, item in zip(value[::2], value[1::2], strict=False)
+        }
+        uid = items.get("UID")
+        if isinstance(uid, str):
+            messages[uid.encode()] = items
+    return messages
+
+
+def _tokenize_fetch_data(msg_data: list[typing.Any]) -> list[str | bytes]:
+    """Split FETCH response data into tokens, with each literal kept as one bytes token.
+
+    Args:
+        msg_data: FETCH response data in imaplib's layout, with literals as (header, literal)
+            tuples whose header ends in the `{<size>}` marker.
+
+    Returns:
+        Parentheses and atoms as str, quoted strings and literals as bytes.
+    """
+    tokens: list[str | bytes] = []
+    for item in msg_data:
+        text, literal = item if isinstance(item, tuple) else (item, None)
+        if not isinstance(text, bytes):
+            continue
+        if literal is not None:
+            text = _LITERAL_MARKER_REGEX.sub(b"", text.rstrip())
+        for match in _FETCH_TOKEN_REGEX.finditer(text):
+            paren, quoted, atom = match.groups()
+            if quoted is not None:
+                tokens.append(re.sub(rb"\\(.)", rb"\1", quoted))
+            else:
+                tokens.append((paren or atom).decode(errors="replace"))
+        if literal is not None:
+            tokens.append(literal)
+    return tokens
+
+
+def _parse_fetch_value(tokens: list[str | bytes], position: int) -> tuple[FetchValue, int]:
+    """Parse one value, recursing into parenthesized lists.
+
+    Args:
+        tokens: Tokens from `_tokenize_fetch_data`.
+        position: Index of the value's first token.
+
+    Returns:
+        The parsed value and the index of the token following it.
+    """
+    current = tokens[position]
+    if current == "(":
+        values: list[FetchValue] = []
+        position += 1
+        while position < len(tokens) and tokens[position] != ")":
+            value, position = _parse_fetch_value(tokens, position)
+            values.append(value)
+        return values, position + 1
+    if isinstance(current, str) and current.upper() == "NIL":
+        return None, position + 1
+    return current, position + 1
+
+
+def _message_parts(structure: FetchValue, section: str = "") -> list[MessagePart]:
+    """Flatten a parsed BODYSTRUCTURE into its non-multipart parts.
+
+    An inline message (message/rfc822) is followed by the parts of the message it holds, in
+    the order `parse_email_message` visits them. Attached messages are kept as single parts,
+    as the parser does not descend into attachments.
+
+    Args:
+        structure: The parsed BODYSTRUCTURE value, or a nested part of it.
+        section: IMAP section number of `structure`. Empty for the whole message.
+
+    Returns:
+        The parts in order of appearance.
+    """
+    if not isinstance(structure, list) or not structure:
+        return []
+    if isinstance(structure[0], list):
+        children = itertools.takewhile(lambda value: isinstance(value, list), structure)
+        return [
+            part
+            for number, child in enumerate(children, start=1)
+            for part in _message_parts(child, f"{section}.{number}" if section else str(number))
+        ]
+    if len(structure) < 7:  # noqa: PLR2004
+        return []
+
+    part = _message_part(structure, section or "1")
+    if (
+        part.content_type != "message/rfc822"
+        or part.disposition == "attachment"
+        or len(structure) < 9  # noqa: PLR2004
+    ):
+        return [part]
+    # The parts of a multipart attached message are numbered below the message's own section,
+    # and the body of a single-part one is its section followed by `.1`.
+    body = structure[8]
+    is_multipart = isinstance(body, list) and bool(body) and isinstance(body[0], list)
+    return [part, *_message_parts(body, part.section if is_multipart else f"{part.section}.1")]
+
+
+def _message_part(structure: list[FetchValue], section: str) -> MessagePart:
+    """Describe one non-multipart part of a parsed BODYSTRUCTURE.
+
+    Args:
+        structure: The parsed BODYSTRUCTURE of the part, with at least its seven basic fields.
+        section: IMAP section number of the part.
+
+    Returns:
+        The part. Attached messages report a size of zero, as `parse_email_message` does.
+    """
+    content_type = f"{_fetch_text(structure[0])}/{_fetch_text(structure[1])}".lower()
+    # Extension data follows the type-specific fields: lines for text, and envelope, body and
+    # lines for attached messages.
+    disposition_index = 9 if content_type.startswith("text/") else 8
+    if content_type == "message/rfc822":
+        disposition_index = 11
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    params = structure[2] if isinstance(structure[2], list) else []
+    size = _fetch_text(structure[6])
+    return MessagePart(
+        section=section,
+        content_type=content_type,
+        params=tuple(
+            (_fetch_text(name).lower(), _fetch_text(value))
+            for name, value in zip(params[::2], params[1::2], strict=False)
+        ),
+        encoding=_fetch_text(structure[5]).lower() or "7bit",
+        size=int(size) if size.isdigit() and content_type != "message/rfc822" else 0,
+        disposition=(
+            _fetch_text(disposition[0]).lower()
+            if isinstance(disposition, list) and disposition
+            else None
+        ),
+    )
+
+
+def _fetch_text(value: FetchValue) -> str:
+    """Return a parsed atom or string as str, and an empty string for NIL or a list."""
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    return value if isinstance(value, str) else ""
+
+
+def _text_parts(parts: list[MessagePart]) -> list[MessagePart]:
+    """Return the first inline text/plain and text/html parts, the ones the parser decodes.
+
+    Args:
+        parts: The message parts from `_message_parts`.
+
+    Returns:
+        Up to two parts, in order of appearance.
+    """
+    chosen: dict[str, MessagePart] = {}
+    for part in parts:
+        if part.disposition != "attachment" and part.content_type in {"text/plain", "text/html"}:
+            chosen.setdefault(part.content_type, part)
+    return [part for part in parts if part in chosen.values()]
+
+
+def _assemble_partial_messages(
+    structures: dict[bytes, tuple[bytes, list[MessagePart]]],
+    sections: dict[bytes, dict[str, FetchValue]],
+) -> dict[bytes, bytes]:
+    """Rebuild every message whose wanted text sections were all fetched.
+
+    Args:
+        structures: Mapping of UID to (header, parts), from `_plan_partial_fetch`.
+        sections: Mapping of UID to the data items of its section fetch.
+
+    Returns:
+        Mapping of UID to the rebuilt raw message.
+    """
+    messages: dict[bytes, bytes] = {}
+    for uid, (header, parts) in structures.items():
+        items = sections.get(uid, {})
+        bodies = {}
+        for part in _text_parts(parts):
+            key = f"BODY[{part.section}]"
+            if key not in items:
+                break
+            body = items[key]
+            bodies[part.section] = body if isinstance(body, bytes) else b""
+        else:
+            messages[uid] = _assemble_partial_message(header, parts, bodies)
+    return messages
+
+
+def _assemble_partial_message(
+    header: bytes, parts: list[MessagePart], bodies: dict[str, bytes]
+) -> bytes:
+    """Rebuild a message from its header, its text sections and its attachments' structure.
+
+    The result is a multipart/mixed message with the original headers, apart from the MIME
+    ones. It holds the fetched text parts with their original transfer encoding, followed by
+    an empty placeholder part for each attachment whose `PLACEHOLDER_SIZE_HEADER` records the
+    attachment's encoded size, so `parse_email_message` reports the same attachment fields.
+    The parts of inline messages are flattened into the same multipart/mixed message.
+
+    Args:
+        header: The message header block, as returned for `BODY[HEADER]`.
+        parts: The message parts from `_message_parts`.
+        bodies: Mapping of section number to encoded body of each text part to include.
+
+    Returns:
+        The rebuilt raw message.
+    """
+    digest = hashlib.sha256(header + b"".join(bodies.values())).hexdigest()[:32]
+    boundary = f"=_partial_{digest}".encode()
+    lines = [
+        *_strip_mime_headers(header),
+        b"MIME-Version: 1.0",
+        b'Content-Type: multipart/mixed; boundary="' + boundary + b'"',
+        b"",
+    ]
+    for part in parts:
+        if part.section in bodies:
+            lines += [
+                b"--" + boundary,
+                _content_type_header(part),
+                b"Content-Transfer-Encoding: " + part.encoding.encode(),
+                b"",
+                bodies[part.section],
+            ]
+        elif part.disposition == "attachment":
+            lines += [
+                b"--" + boundary,
+                _content_type_header(part),
+                b"Content-Disposition: attachment",
+                f"{PLACEHOLDER_SIZE_HEADER}: {part.size}".encode(),
+                b"",
+            ]
+    lines.append(b"--" + boundary + b"--")
+    return b"\r\n".join(lines) + b"\r\n"
+
+
+def _strip_mime_headers(header: bytes) -> list[bytes]:
+    """Split a header block into its fields, dropping the MIME ones replaced on reassembly.
+
+    Args:
+        header: The raw header block, optionally ending in a blank line.
+
+    Returns:
+        The remaining header fields, with folded continuation lines kept.
+    """
+    fields: list[list[bytes]] = []
+    for line in header.splitlines():
+        if not line.strip():
+            break
+        if line[:1] in {b" ", b"\t"} and fields:
+            fields[-1].append(line)
+        else:
+            fields.append([line])
+    return [
+        b"\r\n".join(field)
+        for field in fields
+        if field[0].partition(b":")[0].strip().lower() not in _MIME_HEADERS
+    ]
+
+
+def _content_type_header(part: MessagePart) -> bytes:
+    """Return the Content-Type header line of a message part, with its parameters."""
+    params = "".join(
+        '; {}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in part.params
+    )
+    return f"Content-Type: {part.content_type}{params}".encode()
 
 
 def save_raw_email(
-    uid: str, raw_bytes: bytes, label: str, path: pathlib.Path = paths.RAW_DIR
+    uid: str,
+    raw_bytes: bytes,
+    label: str,
+    path: pathlib.Path = paths.RAW_DIR,
+    *,
+    store: RawEmailStore | None = None,
 ) -> None:
     """Save raw email bytes to disk under the appropriate label subdirectory.
 
@@ -101,18 +787,432 @@ def save_raw_email(
         raw_bytes: The raw RFC822 message contents.
         label: The folder label, used both in the filename and subdirectory.
         path: Path to the directory where raw emails will be saved.
+        store: If given, the email is appended to this packed store under key `{uid}_{label}`
+            instead of being written as an .eml file, and `path` is ignored.
     """
+    if store is not None:
+        store.put(f"{uid}_{label}", raw_bytes)
+        return
     target_dir = path / f"{label}_personal"
     target_dir.mkdir(parents=True, exist_ok=True)
     (target_dir / f"{uid}_{label}.eml").write_bytes(raw_bytes)
 
 
-def fetch_and_save_emails(limit: int | None = None, *, path: pathlib.Path = paths.RAW_DIR) -> None:
-    """Fetch and save messages from all folders defined in the user-defined FOLDER_MAP.
+def load_sync_state(path: pathlib.Path = paths.IMAP_SYNC_STATE_PATH) -> dict[str, FolderSyncState]:
+    """Load the per-folder IMAP sync state.
 
     Args:
-        limit: Maximum number of messages to fetch (most recent). If None, fetch all.
+        path: Path to the sync state JSON file.
+
+    Returns:
+        Mapping of IMAP folder name to its FolderSyncState. Empty if the file does not exist.
+    """
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {folder: FolderSyncState.model_validate(state) for folder, state in data.items()}
+
+
+def save_sync_state(
+    state: dict[str, FolderSyncState], path: pathlib.Path = paths.IMAP_SYNC_STATE_PATH
+) -> None:
+    """Atomically write the per-folder IMAP sync state.
+
+    Args:
+        state: Mapping of IMAP folder name to its FolderSyncState.
+        path: Path to the sync state JSON file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    data = {folder: folder_state.model_dump() for folder, folder_state in state.items()}
+    tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def sync_folder(  # noqa: PLR0913
+    imap: imaplib.IMAP4,
+    folder: str,
+    label: str,
+    state: FolderSyncState | None,
+    *,
+    limit: int | None = None,
+    path: pathlib.Path = paths.RAW_DIR,
+    batch_size: int = 500,
+    partial: bool = False,
+    store: RawEmailStore | None = None,
+) -> FolderSyncState | None:
+    """Save the messages of an IMAP folder that arrived since its last sync.
+
+    If the folder's UIDVALIDITY differs from the stored state, the previously saved files of the
+    folder are removed and the folder is fully resynced. Without a stored state the folder is
+    fully synced but existing files are kept, see `_validate_folder_state`.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
+        folder: The name of the IMAP folder to sync (e.g., 'INBOX').
+        label: A short label for the folder (e.g., 'inbox', 'spam').
+        state: The folder's state after its previous sync, or None if it was never synced.
+        limit: Maximum number of new messages to fetch (oldest first). The remaining new
+            messages are fetched by the following syncs. If None, fetch all.
+        path: Path to the directory where raw emails will be saved.
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        store: If given, messages are appended to this packed store of the folder's raw
+            emails instead of being written as .eml files, see `save_raw_email`.
+
+    Returns:
+        The folder's new state, or None if the folder could not be selected. It stops just
+        below the first message missing from the FETCH responses, so that it is retried.
+    """
+    plan = _plan_folder_sync(imap, folder, label, state, limit=limit, path=path, store=store)
+    if plan is None:
+        return None
+
+    missing: list[bytes] = []
+    for uid, raw, lbl in fetch_messages(
+        imap, plan[1], label, batch_size=batch_size, partial=partial, missing=missing
+    ):
+        save_raw_email(uid, raw, lbl, path, store=store)
+    failed = {folder: [int(missing[0])]} if missing else {}
+    return _next_sync_states({folder: plan}, failed)[folder]
+
+
+def _plan_folder_sync(  # noqa: PLR0913
+    imap: imaplib.IMAP4,
+    folder: str,
+    label: str,
+    state: FolderSyncState | None,
+    *,
+    limit: int | None,
+    path: pathlib.Path,
+    store: RawEmailStore | None = None,
+) -> tuple[FolderSyncState, list[bytes]] | None:
+    """Select a folder, reset it if its UIDVALIDITY changed, and list the UIDs to download.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
+        folder: The name of the IMAP folder to sync (e.g., 'INBOX').
+        label: A short label for the folder (e.g., 'inbox', 'spam').
+        state: The folder's state after its previous sync, or None if it was never synced.
+        limit: Maximum number of new messages to fetch (oldest first). If None, fetch all.
+        path: Path to the directory where raw emails are saved.
+        store: The packed store of the folder's raw emails, if they are saved to one.
+
+    Returns:
+        The folder's state to sync from and the new UIDs in ascending order, or None if the
+        folder could not be selected.
+    """
+    logger.info("Selecting folder: '%s' (label: %s)...", folder, label)
+    uidvalidity = select_folder(imap, folder)
+    if uidvalidity is None:
+        return None
+
+    state = _validate_folder_state(folder, label, state, uidvalidity, path, store=store)
+    return state, _limit_uids(folder, search_folder_uids(imap, state.last_uid), limit, oldest=True)
+
+
+def _validate_folder_state(  # noqa: PLR0913
+    folder: str,
+    label: str,
+    state: FolderSyncState | None,
+    uidvalidity: int,
+    path: pathlib.Path,
+    *,
+    store: RawEmailStore | None = None,
+) -> FolderSyncState:
+    """Return the state to sync a folder from, resetting it if its UIDVALIDITY changed.
+
+    On a reset the folder's previously saved files are removed, as their UIDs are stale. A folder
+    without a stored state is fully synced but its existing files are kept: they may have been
+    saved by an older version under message sequence numbers, which a UID sync must not delete.
+
+    Args:
+        folder: The name of the IMAP folder.
+        label: A short label for the folder (e.g., 'inbox', 'spam').
+        state: The folder's state after its previous sync, or None if it was never synced.
+        uidvalidity: The folder's current UIDVALIDITY.
+        path: Path to the directory where raw emails are saved.
+        store: The packed store of the folder's raw emails, if they are saved to one. It is
+            cleared on a reset.
+
+    Returns:
+        The stored state if still valid, otherwise an empty state for the new UIDVALIDITY.
+    """
+    if state is None:
+        logger.info("Full sync of folder '%s' (UIDVALIDITY %d).", folder, uidvalidity)
+        if any((path / f"{label}_personal").glob(f"*_{label}.eml")) or (
+            store is not None and len(store)
+        ):
+            logger.warning(
+                "Keeping the existing '%s' emails, which have no sync state. They may be keyed by "
+                "message sequence number rather than UID, so their labels may need re-keying.",
+                label,
+            )
+        return FolderSyncState(uidvalidity=uidvalidity)
+    if state.uidvalidity == uidvalidity:
+        return state
+    logger.info("Full resync of folder '%s' (UIDVALIDITY %d).", folder, uidvalidity)
+    for stale in (path / f"{label}_personal").glob(f"*_{label}.eml"):
+        stale.unlink()
+    if store is not None:
+        store.clear()
+    return FolderSyncState(uidvalidity=uidvalidity)
+
+
+def download_folders(  # noqa: PLR0913
+    pool: IMAPConnectionPool,
+    folders: collections.abc.Mapping[str, str],
+    sync_state: collections.abc.Mapping[str, FolderSyncState],
+    *,
+    limit: int | None = None,
+    path: pathlib.Path = paths.RAW_DIR,
+    batch_size: int = 500,
+    partial: bool = False,
+    stores: collections.abc.Mapping[str, RawEmailStore] | None = None,
+) -> dict[str, FolderSyncState]:
+    """Download the new messages of several IMAP folders in parallel over a connection pool.
+
+    Every folder is planned on its own pooled connection, and each folder's new UIDs are split
+    into ranges of `batch_size` that are downloaded concurrently, so a large folder is spread
+    over all connections and a small one does not wait for it. All workers save through one
+    shared RawEmailWriter which keeps an aggregate progress count.
+
+    If a range fails to download, or a message of it is missing from the FETCH responses, the
+    folder's new state stops just below it so that it is retried on the next sync.
+
+    Args:
+        pool: Pool of logged-in IMAP connections. Its size sets the number of worker threads.
+        folders: Mapping of IMAP folder name to short local label.
+        sync_state: Each folder's state after its previous sync. Missing folders are fully
+            synced.
+        limit: Maximum number of new messages to fetch per folder (oldest first). The remaining
+            new messages are fetched by the following syncs. If None, fetch all.
+        path: Path to the directory where raw emails will be saved.
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        stores: Mapping of folder label to the packed store its messages are appended to, see
+            `sync_folder`. Folders without a store are saved as .eml files.
+
+    Returns:
+        The new state of every folder that could be selected.
+    """
+    stores = stores or {}
+    writer = RawEmailWriter(functools.partial(_save_to_folder, path=path, stores=stores))
+
+    def plan(folder: str) -> tuple[FolderSyncState, list[bytes]] | None:
+        label = folders[folder]
+        try:
+            with pool.connection() as imap:
+                return _plan_folder_sync(
+                    imap,
+                    folder,
+                    label,
+                    sync_state.get(folder),
+                    limit=limit,
+                    path=path,
+                    store=stores.get(label),
+                )
+        except (imaplib.IMAP4.error, OSError) as error:
+            logger.warning("Failed to plan sync of folder '%s': %s", folder, error)
+            return None
+
+    def download(folder: str, uidvalidity: int, uids: tuple[bytes, ...]) -> list[bytes]:
+        missing: list[bytes] = []
+        with pool.connection() as imap:
+            _check_uidvalidity(folder, uidvalidity, select_folder(imap, folder))
+            for uid, raw, label in fetch_messages(
+                imap, uids, folders[folder], batch_size=len(uids), partial=partial, missing=missing
+            ):
+                writer.write(uid, raw, label)
+        return missing
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=pool.size) as executor:
+        planned = {folder: executor.submit(plan, folder) for folder in folders}
+        plans = {
+            folder: folder_plan
+            for folder, future in planned.items()
+            if (folder_plan := future.result()) is not None
+        }
+        ranges = _download_ranges(plans, batch_size)
+        writer.add_total(sum(len(batch) for _, _, batch in ranges))
+        downloads = {
+            executor.submit(download, folder, uidvalidity, batch): (folder, batch)
+            for folder, uidvalidity, batch in ranges
+        }
+        failed = _collect_failed_downloads(downloads)
+
+    logger.info("Saved %d/%d emails.", writer.n_written, writer.total)
+    return _next_sync_states(plans, failed)
+
+
+def _save_to_folder(
+    uid: str,
+    raw_bytes: bytes,
+    label: str,
+    *,
+    path: pathlib.Path,
+    stores: collections.abc.Mapping[str, RawEmailStore],
+) -> None:
+    """Save a raw email to its label's packed store if it has one, else as an .eml file."""
+    save_raw_email(uid, raw_bytes, label, path, store=stores.get(label))
+
+
+def _open_raw_email_stores(
+    stack: contextlib.ExitStack, labels: collections.abc.Iterable[str], path: pathlib.Path
+) -> dict[str, RawEmailStore]:
+    """Open the packed store of every label's raw folder, to be closed by `stack`.
+
+    Args:
+        stack: ExitStack that closes the stores.
+        labels: The folder labels.
+        path: Path to the directory where raw emails are saved.
+
+    Returns:
+        Mapping of label to the RawEmailStore at `<path>/<label>_personal`.
+    """
+    return {
+        label: stack.enter_context(RawEmailStore(path / f"{label}_personal")) for label in labels
+    }
+
+
+def _download_ranges(
+    plans: dict[str, tuple[FolderSyncState, list[bytes]]], batch_size: int
+) -> list[tuple[str, int, tuple[bytes, ...]]]:
+    """Split the new UIDs of every planned folder into ranges downloaded concurrently.
+
+    Args:
+        plans: Mapping of folder name to its (state, new UIDs), from `_plan_folder_sync`.
+        batch_size: Maximum number of UIDs per range.
+
+    Returns:
+        The (folder, UIDVALIDITY, UIDs) of every range.
+    """
+    return [
+        (folder, state.uidvalidity, batch)
+        for folder, (state, uids) in plans.items()
+        for batch in _fetch_batches(uids, batch_size)
+    ]
+
+
+def _check_uidvalidity(folder: str, expected: int, uidvalidity: int | None) -> None:
+    """Raise if a folder's UIDVALIDITY changed since its download was planned.
+
+    Args:
+        folder: The name of the IMAP folder.
+        expected: The folder's UIDVALIDITY when its download was planned.
+        uidvalidity: The folder's UIDVALIDITY on selecting it again, or None if it is gone.
+
+    Raises:
+        imaplib.IMAP4.error: If the UIDVALIDITY differs.
+    """
+    if uidvalidity != expected:
+        error_message = f"UIDVALIDITY of folder '{folder}' changed during download."
+        raise imaplib.IMAP4.error(error_message)
+
+
+def _collect_failed_downloads(
+    downloads: dict[concurrent.futures.Future[list[bytes]], tuple[str, tuple[bytes, ...]]],
+) -> dict[str, list[int]]:
+    """Wait for every UID range download and record the ranges that failed.
+
+    Args:
+        downloads: Mapping of each download future, which returns the UIDs missing from its
+            FETCH responses, to its (folder, uids).
+
+    Returns:
+        Mapping of folder name to the first UID of each of its failed ranges, or to the first
+        missing UID of a range that downloaded with gaps.
+    """
+    failed: dict[str, list[int]] = collections.defaultdict(list)
+    for future in concurrent.futures.as_completed(downloads):
+        folder, uids = downloads[future]
+        try:
+            missing = future.result()
+        except (imaplib.IMAP4.error, OSError) as error:
+            logger.warning(
+                "Failed to download %d messages from folder '%s': %s", len(uids), folder, error
+            )
+            failed[folder].append(int(uids[0]))
+        else:
+            if missing:
+                failed[folder].append(int(missing[0]))
+    return failed
+
+
+def _next_sync_states(
+    plans: dict[str, tuple[FolderSyncState, list[bytes]]],
+    failed: collections.abc.Mapping[str, list[int]],
+) -> dict[str, FolderSyncState]:
+    """Advance every planned folder's sync state past the UIDs downloaded without a gap.
+
+    Args:
+        plans: Mapping of folder name to the (state, UIDs) its download started from.
+        failed: Mapping of folder name to the first UID of each of its failed ranges or
+            missing messages.
+
+    Returns:
+        The new state of every planned folder.
+    """
+    states = {}
+    for folder, (state, uids) in plans.items():
+        if failed_starts := failed.get(folder):
+            last_uid = min(failed_starts) - 1
+        else:
+            last_uid = int(uids[-1]) if uids else state.last_uid
+        states[folder] = FolderSyncState(
+            uidvalidity=state.uidvalidity, last_uid=max(last_uid, state.last_uid)
+        )
+    return states
+
+
+def connect_imap(password: str, *, compress: bool = True) -> CompressedIMAP4SSL:
+    """Open a TLS connection to the configured IMAP server and log in.
+
+    Args:
+        password: The IMAP password of the configured user.
+        compress: If True, compress the connection with COMPRESS=DEFLATE when the server
+            supports it, see `CompressedIMAP4`.
+
+    Returns:
+        A logged-in IMAP4_SSL client.
+    """
+    imap = CompressedIMAP4SSL(IMAP_HOST, ssl_context=ssl.create_default_context())
+    logger.info("Logging in to IMAP server '%s' as '%s'.", IMAP_HOST, USER_EMAIL)
+    imap.login(USER_EMAIL, password)
+    if compress:
+        imap.compress()
+    return imap
+
+
+def fetch_and_save_emails(  # noqa: PLR0913
+    limit: int | None = None,
+    *,
+    path: pathlib.Path = paths.RAW_DIR,
+    batch_size: int = 500,
+    partial: bool = False,
+    state_path: pathlib.Path = paths.IMAP_SYNC_STATE_PATH,
+    connections: int = 4,
+    compress: bool = True,
+    packed: bool = False,
+) -> None:
+    """Fetch and save new messages from all folders defined in the user-defined FOLDER_MAP.
+
+    Only messages that arrived since the previous run are transferred, based on the per-folder
+    sync state stored at `state_path`. Folders, and UID ranges within large folders, are
+    downloaded in parallel over a pool of IMAP connections.
+
+    Args:
+        limit: Maximum number of new messages to fetch per folder (oldest first). The remaining
+            new messages are fetched by the following syncs. If None, fetch all.
         path: Path to the directory where raw emails will be saved. (Default: `paths.RAW_DIR`)
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        state_path: Path to the sync state JSON file. (Default: `paths.IMAP_SYNC_STATE_PATH`)
+        connections: Number of IMAP connections, and download threads, to use.
+        compress: If True, compress each connection with COMPRESS=DEFLATE when the server
+            supports it.
+        packed: If True, each folder's messages are appended to a packed RawEmailStore at
+            `<path>/<label>_personal` instead of being written as .eml files.
     """
     logger.info("Starting email download process.")
     if USER_EMAIL == "your_username@example.com":
@@ -120,15 +1220,382 @@ def fetch_and_save_emails(limit: int | None = None, *, path: pathlib.Path = path
         raise RuntimeError(error_message)
 
     password = get_imap_password()
-    ssl_ctx = ssl.create_default_context()
-
-    with imaplib.IMAP4_SSL(IMAP_HOST, ssl_context=ssl_ctx) as imap:
-        logger.info("Logging in to IMAP server '%s' as '%s'.", IMAP_HOST, USER_EMAIL)
-        imap.login(USER_EMAIL, password)
+    sync_state = load_sync_state(state_path)
 
-        for folder, label in FOLDER_MAP.items():
-            for uid, raw, lbl in fetch_folder(imap, folder, label, limit):
-                save_raw_email(uid, raw, lbl, path)
+    connect = functools.partial(connect_imap, password, compress=compress)
+    with contextlib.ExitStack() as stack:
+        stores = _open_raw_email_stores(stack, FOLDER_MAP.values(), path) if packed else {}
+        pool = stack.enter_context(IMAPConnectionPool(connect, size=connections))
+        new_state = download_folders(
+            pool,
+            FOLDER_MAP,
+            sync_state,
+            limit=limit,
+            path=path,
+            batch_size=batch_size,
+            partial=partial,
+            stores=stores,
+        )
         logger.info("Logging out from IMAP server.")
-        imap.logout()
+    save_sync_state({**sync_state, **new_state}, state_path)
+    logger.info("Email download process completed.")
+
+
+async def async_search_folder_uids(client: AsyncIMAPClient, since_uid: int = 0) -> list[bytes]:
+    """Return the UIDs of the selected folder greater than `since_uid`, in ascending order.
+
+    The asyncio equivalent of `search_folder_uids`.
+
+    Args:
+        client: A logged-in AsyncIMAPClient with a folder selected.
+        since_uid: Only UIDs strictly greater than this are returned.
+
+    Returns:
+        The matching UIDs as ASCII bytes.
+    """
+    status, data = await client.uid("SEARCH", f"UID {since_uid + 1}:*")
+    return _new_uids(status, data, since_uid)
+
+
+async def async_fetch_messages(  # noqa: PLR0913
+    client: AsyncIMAPClient,
+    uids: collections.abc.Sequence[bytes],
+    label: str,
+    *,
+    batch_size: int = 500,
+    partial: bool = False,
+    missing: list[bytes] | None = None,
+) -> collections.abc.AsyncIterator[tuple[str, bytes, str]]:
+    """Asynchronously yield raw messages of the selected folder by UID as (uid, raw_bytes, label).
+
+    The asyncio equivalent of `fetch_messages`.
+
+    Args:
+        client: A logged-in AsyncIMAPClient with a folder selected.
+        uids: The UIDs to fetch, in ascending order.
+        label: A short label to attach to each message (e.g., 'inbox', 'spam').
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        missing: If given, the UIDs missing from the FETCH responses are appended to it.
+
+    Yields:
+        Tuples of (uid, raw_bytes, label), in the order of `uids`.
+    """
+    for batch in _fetch_batches(uids, batch_size):
+        plan = _fetch_batch_plan(batch, partial=partial)
+        try:
+            command = next(plan)
+            while True:
+                command = plan.send(await client.uid("FETCH", *command))
+        except StopIteration as stop:
+            fetched: dict[bytes, bytes] = stop.value
+        messages, batch_missing = _fetched_messages(batch, fetched, label)
+        if missing is not None:
+            missing.extend(batch_missing)
+        for message in messages:
+            yield message
+
+
+async def async_fetch_folder(  # noqa: PLR0913
+    client: AsyncIMAPClient,
+    folder: str,
+    label: str,
+    limit: int | None = None,
+    *,
+    batch_size: int = 500,
+    partial: bool = False,
+) -> collections.abc.AsyncIterator[tuple[str, bytes, str]]:
+    """Asynchronously yield raw messages from an IMAP folder as (uid, raw_bytes, label).
+
+    The asyncio equivalent of `fetch_folder`.
+
+    Args:
+        client: A logged-in AsyncIMAPClient.
+        folder: The name of the IMAP folder to select (e.g., 'INBOX').
+        label: A short label to attach to each message (e.g., 'inbox', 'spam').
+        limit: Maximum number of messages to fetch (most recent). If None, fetch all.
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+
+    Yields:
+        Tuples of (uid, raw_bytes, label).
+    """
+    logger.info("Selecting folder: '%s' (label: %s)...", folder, label)
+    if await client.select(folder) is None:
+        logger.warning("Failed to find folder '%s'. Skipping.", folder)
+        return
+
+    uids = _limit_uids(folder, await async_search_folder_uids(client), limit, oldest=False)
+    async for message in async_fetch_messages(
+        client, uids, label, batch_size=batch_size, partial=partial
+    ):
+        yield message
+
+
+async def async_download_folders(  # noqa: PLR0913
+    pool: AsyncIMAPConnectionPool,
+    folders: collections.abc.Mapping[str, str],
+    sync_state: collections.abc.Mapping[str, FolderSyncState],
+    *,
+    limit: int | None = None,
+    path: pathlib.Path = paths.RAW_DIR,
+    batch_size: int = 500,
+    partial: bool = False,
+    queue_size: int = 1000,
+    stores: collections.abc.Mapping[str, RawEmailStore] | None = None,
+) -> dict[str, FolderSyncState]:
+    """Download the new messages of several IMAP folders with asyncio.
+
+    The asyncio counterpart of `download_folders`. Each folder's new UIDs are split into ranges
+    of `batch_size`, which are fetched concurrently with one command in flight on each pooled
+    connection. Fetched messages go through a bounded queue to a single writer task that saves
+    them in a worker thread, so network waits overlap with disk writes and fetching pauses
+    whenever `queue_size` messages are waiting to be written.
+
+    Cancelling the calling task cancels every fetch and the writer, and the pool discards the
+    interrupted connections. Messages saved before the cancellation stay on disk, and no sync
+    state is returned.
+
+    Args:
+        pool: Pool of logged-in asyncio IMAP connections.
+        folders: Mapping of IMAP folder name to short local label.
+        sync_state: Each folder's state after its previous sync. Missing folders are fully
+            synced.
+        limit: Maximum number of new messages to fetch per folder (oldest first). The remaining
+            new messages are fetched by the following syncs. If None, fetch all.
+        path: Path to the directory where raw emails will be saved.
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        queue_size: Maximum number of fetched messages waiting to be written.
+        stores: Mapping of folder label to the packed store its messages are appended to, see
+            `download_folders`.
+
+    Returns:
+        The new state of every folder that could be selected.
+    """
+    stores = stores or {}
+    writes: asyncio.Queue[tuple[str, bytes, str] | None] = asyncio.Queue(maxsize=queue_size)
+    async with asyncio.TaskGroup() as task_group:
+        writer = task_group.create_task(_write_raw_emails(writes, path, stores))
+        planned = await asyncio.gather(
+            *(
+                _async_plan_folder_sync(
+                    pool,
+                    folder,
+                    label,
+                    sync_state.get(folder),
+                    limit=limit,
+                    path=path,
+                    store=stores.get(label),
+                )
+                for folder, label in folders.items()
+            )
+        )
+        plans = {
+            folder: plan for folder, plan in zip(folders, planned, strict=True) if plan is not None
+        }
+        downloads = [
+            (
+                folder,
+                task_group.create_task(
+                    _async_download_range(
+                        pool,
+                        folder,
+                        folders[folder],
+                        uidvalidity,
+                        batch,
+                        writes=writes,
+                        partial=partial,
+                    )
+                ),
+            )
+            for folder, uidvalidity, batch in _download_ranges(plans, batch_size)
+        ]
+        await asyncio.gather(*(task for _, task in downloads))
+        await writes.put(None)
+
+    logger.info("Saved %d emails.", writer.result())
+    failed: dict[str, list[int]] = collections.defaultdict(list)
+    for folder, task in downloads:
+        if (failed_start := task.result()) is not None:
+            failed[folder].append(failed_start)
+    return _next_sync_states(plans, failed)
+
+
+async def _async_plan_folder_sync(  # noqa: PLR0913
+    pool: AsyncIMAPConnectionPool,
+    folder: str,
+    label: str,
+    state: FolderSyncState | None,
+    *,
+    limit: int | None,
+    path: pathlib.Path,
+    store: RawEmailStore | None = None,
+) -> tuple[FolderSyncState, list[bytes]] | None:
+    """Select a folder, reset it if its UIDVALIDITY changed, and list the UIDs to download.
+
+    The asyncio equivalent of `_plan_folder_sync`.
+
+    Args:
+        pool: Pool of logged-in asyncio IMAP connections.
+        folder: The name of the IMAP folder to sync (e.g., 'INBOX').
+        label: A short label for the folder (e.g., 'inbox', 'spam').
+        state: The folder's state after its previous sync, or None if it was never synced.
+        limit: Maximum number of new messages to fetch (oldest first). If None, fetch all.
+        path: Path to the directory where raw emails are saved.
+        store: The packed store of the folder's raw emails, if they are saved to one.
+
+    Returns:
+        The folder's state to sync from and the new UIDs in ascending order, or None if the
+        folder could not be selected.
+    """
+    try:
+        async with pool.connection() as client:
+            logger.info("Selecting folder: '%s' (label: %s)...", folder, label)
+            uidvalidity = await client.select(folder)
+            if uidvalidity is None:
+                logger.warning("Failed to find folder '%s'. Skipping.", folder)
+                return None
+            state = _validate_folder_state(folder, label, state, uidvalidity, path, store=store)
+            uids = await async_search_folder_uids(client, state.last_uid)
+    except (imaplib.IMAP4.error, OSError, asyncio.IncompleteReadError) as error:
+        logger.warning("Failed to plan sync of folder '%s': %s", folder, error)
+        return None
+    return state, _limit_uids(folder, uids, limit, oldest=True)
+
+
+async def _async_download_range(  # noqa: PLR0913
+    pool: AsyncIMAPConnectionPool,
+    folder: str,
+    label: str,
+    uidvalidity: int,
+    uids: tuple[bytes, ...],
+    *,
+    writes: asyncio.Queue[tuple[str, bytes, str] | None],
+    partial: bool,
+) -> int | None:
+    """Fetch one UID range of a folder and queue its messages for writing.
+
+    Args:
+        pool: Pool of logged-in asyncio IMAP connections.
+        folder: The name of the IMAP folder.
+        label: A short label for the folder (e.g., 'inbox', 'spam').
+        uidvalidity: The folder's UIDVALIDITY when the range was planned.
+        uids: The UIDs to fetch.
+        writes: Bounded queue of (uid, raw_bytes, label) consumed by the writer task.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+
+    Returns:
+        None on success, otherwise the first UID of the range if it failed, or the first UID
+        missing from its FETCH responses, so it can be retried.
+    """
+    missing: list[bytes] = []
+    try:
+        async with pool.connection() as client:
+            _check_uidvalidity(folder, uidvalidity, await client.select(folder))
+            async for message in async_fetch_messages(
+                client, uids, label, batch_size=len(uids), partial=partial, missing=missing
+            ):
+                await writes.put(message)
+    except (imaplib.IMAP4.error, OSError, asyncio.IncompleteReadError) as error:
+        logger.warning(
+            "Failed to download %d messages from folder '%s': %s", len(uids), folder, error
+        )
+        return int(uids[0])
+    return int(missing[0]) if missing else None
+
+
+async def _write_raw_emails(
+    writes: asyncio.Queue[tuple[str, bytes, str] | None],
+    path: pathlib.Path,
+    stores: collections.abc.Mapping[str, RawEmailStore],
+) -> int:
+    """Save raw emails from a queue in a worker thread until a None sentinel arrives.
+
+    Args:
+        writes: Queue of (uid, raw_bytes, label) to save.
+        path: Path to the directory where raw emails will be saved.
+        stores: Mapping of folder label to the packed store its messages are appended to.
+
+    Returns:
+        The number of emails saved.
+    """
+    n_written = 0
+    while (message := await writes.get()) is not None:
+        await asyncio.to_thread(_save_to_folder, *message, path=path, stores=stores)
+        n_written += 1
+        if n_written % 500 == 0:
+            logger.info("Saved %d emails.", n_written)
+    return n_written
+
+
+async def async_connect_imap(password: str, *, compress: bool = True) -> AsyncIMAPClient:
+    """Open an asyncio TLS connection to the configured IMAP server and log in.
+
+    Args:
+        password: The IMAP password of the configured user.
+        compress: If True, compress the connection with COMPRESS=DEFLATE when the server
+            supports it, see `AsyncIMAPClient.compress`.
+
+    Returns:
+        A logged-in AsyncIMAPClient.
+    """
+    client = await AsyncIMAPClient.connect(IMAP_HOST, ssl_context=ssl.create_default_context())
+    logger.info("Logging in to IMAP server '%s' as '%s'.", IMAP_HOST, USER_EMAIL)
+    await client.login(USER_EMAIL, password)
+    if compress:
+        await client.compress()
+    return client
+
+
+async def async_fetch_and_save_emails(  # noqa: PLR0913
+    limit: int | None = None,
+    *,
+    path: pathlib.Path = paths.RAW_DIR,
+    batch_size: int = 500,
+    partial: bool = False,
+    state_path: pathlib.Path = paths.IMAP_SYNC_STATE_PATH,
+    connections: int = 4,
+    compress: bool = True,
+    packed: bool = False,
+) -> None:
+    """Fetch and save new messages from all folders in FOLDER_MAP using asyncio.
+
+    The asyncio equivalent of `fetch_and_save_emails`; run it with `asyncio.run`.
+
+    Args:
+        limit: Maximum number of new messages to fetch per folder (oldest first). The remaining
+            new messages are fetched by the following syncs. If None, fetch all.
+        path: Path to the directory where raw emails will be saved. (Default: `paths.RAW_DIR`)
+        batch_size: Maximum number of messages requested per UID FETCH command.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+        state_path: Path to the sync state JSON file. (Default: `paths.IMAP_SYNC_STATE_PATH`)
+        connections: Number of IMAP connections to use.
+        compress: If True, compress each connection with COMPRESS=DEFLATE when the server
+            supports it.
+        packed: If True, each folder's messages are appended to a packed RawEmailStore, see
+            `fetch_and_save_emails`.
+    """
+    logger.info("Starting email download process.")
+    if USER_EMAIL == "your_username@example.com":
+        error_message = "USER_EMAIL is not configured. Please edit your `.env` file."
+        raise RuntimeError(error_message)
+
+    password = await asyncio.to_thread(get_imap_password)
+    sync_state = await asyncio.to_thread(load_sync_state, state_path)
+    connect = functools.partial(async_connect_imap, password, compress=compress)
+    with contextlib.ExitStack() as stack:
+        stores = _open_raw_email_stores(stack, FOLDER_MAP.values(), path) if packed else {}
+        async with AsyncIMAPConnectionPool(connect, size=connections) as pool:
+            new_state = await async_download_folders(
+                pool,
+                FOLDER_MAP,
+                sync_state,
+                limit=limit,
+                path=path,
+                batch_size=batch_size,
+                partial=partial,
+                stores=stores,
+            )
+    await asyncio.to_thread(save_sync_state, {**sync_state, **new_state}, state_path)
     logger.info("Email download process completed.")
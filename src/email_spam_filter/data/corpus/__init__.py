@@ -0,0 +1,17 @@
+"""Partitioned on-disk corpus combining every processed dataset.
+
+Modules:
+    functions: Functions for writing and sampling the partitioned email corpus.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "load_corpus",
+    "write_corpus",
+)
+
+from email_spam_filter.data.corpus.functions import (
+    load_corpus,
+    write_corpus,
+)
@@ -0,0 +1,189 @@
+"""Functions for writing and sampling the partitioned email corpus."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import typing
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from email_spam_filter.common import paths
+from email_spam_filter.common.containers import EMAIL_DATA_SCHEMA, SCHEMA_VERSION, EmailBatch
+from email_spam_filter.data.io.functions import load_email_batch, schema_version
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import pathlib
+
+CORPUS_PARTITIONING: typing.Final[ds.Partitioning] = ds.partitioning(
+    pa.schema([("source", pa.string()), ("tag", pa.string())]), flavor="hive"
+)
+"""Hive partitioning of the corpus, e.g. `source=trec/tag=spam/part-0.parquet`."""
+logger = logging.getLogger(__name__)
+
+
+def write_corpus(
+    processed_paths: collections.abc.Sequence[pathlib.Path] | None = None,
+    corpus_path: pathlib.Path = paths.CORPUS_DIR,
+    *,
+    row_group_size: int = 1024,
+) -> int:
+    """Combine processed Parquet files into one corpus partitioned by source and tag.
+
+    Every file is streamed in row groups, so no dataset is loaded whole. The corpus is built in
+    a `.partial` directory that replaces `corpus_path` once it is complete, so readers never see
+    a half-written corpus.
+
+    Args:
+        processed_paths: Processed Parquet files to combine. If None, every existing processed
+            file of `paths.DATASET_PATHS`.
+        corpus_path: Directory to write the partitioned corpus to. Its contents are replaced.
+        row_group_size: Maximum number of emails written per row group.
+
+    Returns:
+        The number of emails written.
+    """
+    if processed_paths is None:
+        processed_paths = [
+            dataset_paths.processed
+            for dataset_paths in paths.DATASET_PATHS.values()
+            if dataset_paths.processed and dataset_paths.processed.exists()
+        ]
+    n_emails = int(sum(pq.read_metadata(path).num_rows for path in processed_paths))
+    logger.info(
+        "Writing %d emails from %d file(s) to %s.", n_emails, len(processed_paths), corpus_path
+    )
+
+    partial_path = corpus_path.with_name(f"{corpus_path.name}.partial")
+    shutil.rmtree(partial_path, ignore_errors=True)
+    ds.write_dataset(
+        (batch for path in processed_paths for batch in _iter_record_batches(path)),
+        partial_path,
+        schema=EMAIL_DATA_SCHEMA,
+        format="parquet",
+        partitioning=CORPUS_PARTITIONING,
+        basename_template="part-{i}.parquet",
+        min_rows_per_group=row_group_size,
+        max_rows_per_group=row_group_size,
+    )
+    shutil.rmtree(corpus_path, ignore_errors=True)
+    partial_path.rename(corpus_path)
+    return n_emails
+
+
+def _iter_record_batches(path: pathlib.Path) -> collections.abc.Iterator[pa.RecordBatch]:
+    """Stream a processed Parquet file as record batches following `EMAIL_DATA_SCHEMA`.
+
+    Args:
+        path: Path to the processed Parquet file.
+
+    Yields:
+        Record batches of at most one row group each. Files written with an older schema
+        version, which lack some columns, are converted whole instead.
+    """
+    if schema_version(pq.read_schema(path)) == SCHEMA_VERSION:
+        yield from pq.ParquetFile(path).iter_batches()
+        return
+    table = EmailBatch.from_emails(load_email_batch(path).to_emails()).table
+    yield from table.to_batches()
+
+
+def load_corpus(  # noqa: PLR0913
+    sources: collections.abc.Collection[str] | None = None,
+    tags: collections.abc.Collection[str] | None = None,
+    *,
+    sample: int | float | None = None,
+    columns: collections.abc.Sequence[str] | None = None,
+    seed: int = 0,
+    corpus_path: pathlib.Path = paths.CORPUS_DIR,
+) -> EmailBatch:
+    """Load emails of the chosen sources and tags from the partitioned corpus.
+
+    Only the partitions matching `sources` and `tags` are opened. When sampling, the rows of
+    every (source, tag) partition are counted from the Parquet footers and only the sampled rows
+    are kept, so the full corpus is never materialised.
+
+    Args:
+        sources: Datasets to load, keys of `paths.DATASET_PATHS` (e.g. "trec"). If None, all.
+        tags: Tags to load (e.g. "spam", "ham"). If None, all.
+        sample: Stratified sample taken from every (source, tag) partition. A float in (0, 1]
+            keeps that fraction of each partition, preserving their proportions. An int keeps
+            at most that many emails of each partition, balancing them. If None, no sampling.
+        columns: Names of the EmailData fields to read. If None, reads every column.
+        seed: Seed of the random sample.
+        corpus_path: Directory of the partitioned corpus, see `write_corpus`.
+
+    Returns:
+        An EmailBatch holding the selected emails, grouped by partition.
+    """
+    unknown = set(sources or ()) - set(paths.DATASET_PATHS)
+    if unknown:
+        error_message = (
+            f"Unknown source(s): {', '.join(sorted(unknown))}. "
+            f"Expected any of: {', '.join(paths.DATASET_PATHS)}."
+        )
+        raise ValueError(error_message)
+    if not corpus_path.is_dir():
+        error_message = (
+            f"Corpus not found at {corpus_path!r}. Build it with `write_corpus` first, or run "
+            "`scripts/parse_emails.py`."
+        )
+        raise FileNotFoundError(error_message)
+
+    dataset = ds.dataset(corpus_path, format="parquet", partitioning=CORPUS_PARTITIONING)
+    expression = ds.scalar(True)  # noqa: FBT003
+    if sources is not None:
+        expression &= ds.field("source").isin(list(sources))
+    if tags is not None:
+        expression &= ds.field("tag").isin(list(tags))
+    column_names = list(columns) if columns is not None else EMAIL_DATA_SCHEMA.names
+
+    if sample is None:
+        return EmailBatch(dataset.to_table(columns=column_names, filter=expression))
+    return EmailBatch(_sample_partitions(dataset, expression, column_names, sample, seed))
+
+
+def _sample_partitions(
+    dataset: ds.Dataset,
+    expression: ds.Expression,
+    columns: list[str],
+    sample: int | float,
+    seed: int,
+) -> pa.Table:
+    """Take a stratified random sample of every partition of a dataset matching an expression.
+
+    Args:
+        dataset: The partitioned corpus.
+        expression: Filter selecting the partitions to sample.
+        columns: Columns to read.
+        sample: Fraction, or maximum number of rows, to keep of every partition.
+        seed: Seed of the random sample.
+
+    Returns:
+        The sampled rows, grouped by partition in sorted (source, tag) order.
+    """
+    if sample <= 0 or (isinstance(sample, float) and sample > 1):
+        error_message = f"sample must be a fraction in (0, 1] or a positive count, got {sample}."
+        raise ValueError(error_message)
+
+    partitions = sorted(
+        {
+            (keys["source"], keys["tag"])
+            for fragment in dataset.get_fragments(filter=expression)
+            for keys in [ds.get_partition_keys(fragment.partition_expression)]
+        }
+    )
+    rng = np.random.default_rng(seed)
+    tables = [dataset.schema.empty_table().select(columns)]
+    for source, tag in partitions:
+        partition = (ds.field("source") == source) & (ds.field("tag") == tag)
+        n_rows = dataset.count_rows(filter=partition)
+        n_sampled = round(n_rows * sample) if isinstance(sample, float) else min(sample, n_rows)
+        indices = np.sort(rng.choice(n_rows, size=n_sampled, replace=False))
+        tables.append(dataset.take(indices, columns=columns, filter=partition))
+        logger.info("Sampled %d of %d %s %s emails.", n_sampled, n_rows, source, tag)
+    return pa.concat_tables(tables)
@@ -0,0 +1,23 @@
+"""Exact and near-duplicate detection for parsed emails.
+
+Modules:
+    functions: Functions for finding exact and near-duplicate emails with MinHash and LSH.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "cluster_duplicates",
+    "deduplicate_emails",
+    "deduplicate_processed_datasets",
+    "minhash_signature",
+    "normalise_text",
+)
+
+from email_spam_filter.data.dedup.functions import (
+    cluster_duplicates,
+    deduplicate_emails,
+    deduplicate_processed_datasets,
+    minhash_signature,
+    normalise_text,
+)
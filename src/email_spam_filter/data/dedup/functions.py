@@ -0,0 +1,349 @@
+"""Functions for finding exact and near-duplicate emails with MinHash and LSH."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import logging
+import re
+import typing
+import zlib
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from email_spam_filter.common.containers import EMAIL_DATA_SCHEMA, SCHEMA_VERSION, EmailBatch
+from email_spam_filter.data.io.functions import (
+    load_email_batch,
+    schema_version,
+    serialize_email_data,
+)
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import pathlib
+
+    import numpy.typing as npt
+
+    from email_spam_filter.common.containers import EmailData
+
+_MERSENNE_PRIME: typing.Final[int] = (1 << 31) - 1
+"""Modulus of the MinHash permutations. Shingle hashes are reduced below it to fit in int64."""
+_WORD_REGEX: typing.Final[re.Pattern[str]] = re.compile(r"\w+")
+logger = logging.getLogger(__name__)
+
+
+def normalise_text(subject: str, body: str, html_text: str = "") -> str:
+    """Reduce an email's subject and bodies to lower-case words separated by single spaces.
+
+    Args:
+        subject: Subject header of the email.
+        body: Plain-text body of the email.
+        html_text: Plain-text extracted from the HTML body of the email.
+
+    Returns:
+        The normalised text, so that emails differing only in case, punctuation or whitespace
+        compare equal.
+    """
+    return " ".join(_WORD_REGEX.findall(f"{subject} {body} {html_text}".casefold()))
+
+
+def minhash_signature(
+    text: str, *, num_perm: int = 128, shingle_size: int = 3
+) -> npt.NDArray[np.int64]:
+    """Compute the MinHash signature of the word shingles of a normalised text.
+
+    The share of equal entries between two signatures estimates the Jaccard similarity of the
+    two texts' sets of `shingle_size`-word shingles.
+
+    Args:
+        text: Normalised text, see `normalise_text`.
+        num_perm: Number of hash permutations, i.e. the length of the signature.
+        shingle_size: Number of consecutive words per shingle. Shorter texts form one shingle.
+
+    Returns:
+        Array of `num_perm` minimum hash values.
+    """
+    words = text.split()
+    shingles = {
+        " ".join(words[i : i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) % _MERSENNE_PRIME for shingle in shingles),
+        dtype=np.int64,
+        count=len(shingles),
+    )
+    a, b = _permutations(num_perm)
+    return typing.cast(
+        "npt.NDArray[np.int64]",
+        ((np.outer(a, hashes) + b[:, None]) % _MERSENNE_PRIME).min(axis=1),
+    )
+
+
+@functools.cache
+def _permutations(num_perm: int) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Return the fixed coefficients of the `a * x + b` MinHash permutations.
+
+    A fixed seed keeps signatures, and hence cluster ids, identical across runs.
+
+    Args:
+        num_perm: Number of permutations.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+
+def cluster_duplicates(  # noqa: PLR0913
+    texts: collections.abc.Sequence[str],
+    *,
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 32,
+    shingle_size: int = 3,
+    min_words: int = 5,
+) -> list[int]:
+    """Group texts into clusters of exact and near-duplicates.
+
+    Texts of fewer than `min_words` words, e.g. emails with an empty body and a generic
+    subject, carry too little content to tell apart and each stay in a cluster of their own.
+    Identical texts are grouped by content hash first. One text of every such group is then
+    MinHashed, and its signature is split into `bands` bands that are hashed into LSH buckets.
+    Two texts sharing a bucket are joined when their signatures estimate a Jaccard similarity
+    of at least `threshold`. Clusters are closed under these joins, so each text is compared
+    against one text per bucket rather than against every other text.
+
+    Args:
+        texts: Normalised texts, see `normalise_text`.
+        threshold: Minimum estimated Jaccard similarity for two texts to be near-duplicates.
+        num_perm: Length of the MinHash signatures. Must be divisible by `bands`.
+        bands: Number of LSH bands. More bands find less similar candidates.
+        shingle_size: Number of consecutive words per shingle.
+        min_words: Minimum number of words for a text to be clustered with others.
+
+    Returns:
+        The cluster id of every text, which is the position of the first text of its cluster.
+    """
+    if num_perm % bands:
+        error_message = f"num_perm ({num_perm}) must be divisible by bands ({bands})."
+        raise ValueError(error_message)
+    rows = num_perm // bands
+    parents = list(range(len(texts)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def union(first: int, second: int) -> None:
+        first, second = find(first), find(second)
+        parents[max(first, second)] = min(first, second)
+
+    first_by_digest: dict[bytes, int] = {}
+    signatures: dict[int, npt.NDArray[np.int64]] = {}
+    buckets: dict[tuple[int, bytes], int] = {}
+    for index, text in enumerate(texts):
+        if len(text.split()) < min_words:
+            continue
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        first = first_by_digest.setdefault(digest, index)
+        if first != index:
+            union(first, index)
+            continue
+
+        signature = signatures[index] = minhash_signature(
+            text, num_perm=num_perm, shingle_size=shingle_size
+        )
+        for band in range(bands):
+            key = (band, signature[band * rows : (band + 1) * rows].tobytes())
+            other = buckets.setdefault(key, index)
+            if (
+                other != index
+                and find(other) != find(index)
+                and np.mean(signatures[other] == signature) >= threshold
+            ):
+                union(other, index)
+
+    return [find(index) for index in range(len(texts))]
+
+
+def deduplicate_emails(
+    emails: collections.abc.Sequence[EmailData],
+    *,
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 32,
+    min_words: int = 5,
+) -> list[EmailData]:
+    """Assign every email the id of its cluster of exact and near-duplicates.
+
+    Args:
+        emails: The emails to deduplicate.
+        threshold: Minimum estimated Jaccard similarity of two emails' normalised subject,
+            plain-text and HTML text for them to be near-duplicates, see `cluster_duplicates`.
+        num_perm: Length of the MinHash signatures.
+        bands: Number of LSH bands.
+        min_words: Minimum number of words for an email to be clustered with others.
+
+    Returns:
+        Copies of the emails with `cluster_id` set, in input order. See `_content_cluster_ids`
+        for how the ids are derived.
+    """
+    texts = [normalise_text(email.subject, email.body, email.html_text) for email in emails]
+    clusters = cluster_duplicates(
+        texts, threshold=threshold, num_perm=num_perm, bands=bands, min_words=min_words
+    )
+    identities = [_email_identity(email.source, email.tag, email.id) for email in emails]
+    cluster_ids = _content_cluster_ids(
+        _cluster_keys(texts, identities, min_words=min_words), clusters
+    )
+    return [
+        email.model_copy(update={"cluster_id": cluster_id})
+        for email, cluster_id in zip(emails, cluster_ids, strict=True)
+    ]
+
+
+def deduplicate_processed_datasets(
+    processed_paths: collections.abc.Sequence[pathlib.Path],
+    *,
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 32,
+    min_words: int = 5,
+) -> int:
+    """Cluster duplicate emails across processed Parquet files and store their cluster ids.
+
+    Only the identifying, subject, body, HTML text and existing cluster id columns are read to
+    find the clusters. Every
+    file whose cluster ids changed is then rewritten with its `cluster_id` column filled in.
+    Cluster ids are derived from the clusters' contents, see `_content_cluster_ids`, so a
+    message that appears in several datasets, e.g. in both the personal INBOX and Spam folders,
+    shares one cluster id, and re-parsing or reordering the datasets keeps the ids unchanged.
+
+    Args:
+        processed_paths: Paths to the processed Parquet files.
+        threshold: Minimum estimated Jaccard similarity for two emails to be near-duplicates.
+        num_perm: Length of the MinHash signatures.
+        bands: Number of LSH bands.
+        min_words: Minimum number of words for an email to be clustered with others.
+
+    Returns:
+        The number of clusters found.
+    """
+    texts: list[str] = []
+    identities: list[str] = []
+    stored_ids: list[list[int | None]] = []
+    offsets = [0]
+    for path in processed_paths:
+        names = pq.read_schema(path).names
+        columns = ["id", "tag", "source", "subject", "body"]
+        columns += [name for name in ("html_text", "cluster_id") if name in names]
+        table = pq.read_table(path, columns=columns)
+        html_texts = (
+            table.column("html_text").to_pylist()
+            if "html_text" in columns
+            else itertools.repeat("", table.num_rows)
+        )
+        texts.extend(
+            map(
+                normalise_text,
+                table.column("subject").to_pylist(),
+                table.column("body").to_pylist(),
+                html_texts,
+            )
+        )
+        identities.extend(
+            map(
+                _email_identity,
+                table.column("source").to_pylist(),
+                table.column("tag").to_pylist(),
+                table.column("id").to_pylist(),
+            )
+        )
+        offsets.append(len(texts))
+        stored_ids.append(table.column("cluster_id").to_pylist() if "cluster_id" in columns else [])
+
+    clusters = cluster_duplicates(
+        texts, threshold=threshold, num_perm=num_perm, bands=bands, min_words=min_words
+    )
+    cluster_ids = _content_cluster_ids(
+        _cluster_keys(texts, identities, min_words=min_words), clusters
+    )
+    n_clusters = len(set(cluster_ids))
+    logger.info("Found %d clusters among %d emails.", n_clusters, len(texts))
+
+    for path, stored, (start, end) in zip(
+        processed_paths, stored_ids, itertools.pairwise(offsets), strict=True
+    ):
+        if stored == cluster_ids[start:end]:
+            logger.info("Cluster ids of %s are unchanged.", path)
+            continue
+        serialize_email_data(
+            _with_cluster_ids(load_email_batch(path), cluster_ids[start:end]), path
+        )
+    return n_clusters
+
+
+def _email_identity(source: str, tag: str, email_id: int) -> str:
+    """Return a key that is unique to one email across the processed datasets."""
+    return f"{source}/{tag}/{email_id}"
+
+
+def _cluster_keys(texts: list[str], identities: list[str], *, min_words: int) -> list[str]:
+    """Return the key every email's cluster id is derived from.
+
+    Texts too short to be clustered would otherwise share the id of every other email with the
+    same text, so these emails are keyed by their identity instead.
+
+    Args:
+        texts: Normalised texts, see `normalise_text`.
+        identities: The identity of every email, see `_email_identity`.
+        min_words: Minimum number of words for a text to be clustered with others.
+    """
+    return [
+        text if len(text.split()) >= min_words else f"\0{identity}"
+        for text, identity in zip(texts, identities, strict=True)
+    ]
+
+
+def _content_cluster_ids(keys: list[str], clusters: list[int]) -> list[int]:
+    """Replace cluster positions by ids derived from the clusters' contents.
+
+    The id of a cluster is the smallest 63-bit BLAKE2b digest of its members' keys, so it
+    depends neither on the order of the texts nor on which other clusters exist, and stays the
+    same when the datasets are re-parsed.
+
+    Args:
+        keys: The key of every email, see `_cluster_keys`.
+        clusters: The cluster of every text, as returned by `cluster_duplicates`.
+
+    Returns:
+        The cluster id of every text.
+    """
+    ids: dict[int, int] = {}
+    for key, cluster in zip(keys, clusters, strict=True):
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        content_id = int.from_bytes(digest) >> 1
+        ids[cluster] = min(ids.get(cluster, content_id), content_id)
+    return [ids[cluster] for cluster in clusters]
+
+
+def _with_cluster_ids(batch: EmailBatch, cluster_ids: list[int]) -> EmailBatch:
+    """Return a copy of an EmailBatch with its `cluster_id` column replaced.
+
+    Args:
+        batch: A batch holding every column, except possibly `cluster_id`.
+        cluster_ids: The cluster id of every row.
+    """
+    table = batch.table
+    if schema_version(table.schema) != SCHEMA_VERSION:
+        # Written before some columns existed, so rebuild every row with their defaults.
+        table = EmailBatch.from_emails(batch.to_emails()).table
+    table = table.drop_columns(["cluster_id"]).append_column(
+        "cluster_id", pa.array(cluster_ids, type=pa.int64())
+    )
+    return EmailBatch(table.select(EMAIL_DATA_SCHEMA.names))
@@ -1,21 +1,72 @@
 """Input/output utilities for reading, writing, and processing email data.
 
 Modules:
+    containers: Streaming writers, packed stores and placement modes for persisting email data.
     functions: Utilities for reading, writing, and processing email-related data.
 """
 
 from __future__ import annotations
 
 __all__ = (
+    "EmailDataWriter",
+    "EmailFilters",
+    "PlacementMode",
+    "RawEmailStore",
+    "analyse_html",
+    "copy_raw_email",
     "create_email_data",
+    "create_email_header_data",
     "deserialize_email_data",
+    "find_tar_archives",
+    "iter_email_directory",
+    "iter_email_headers",
+    "iter_email_store",
+    "iter_tar_members",
+    "load_email_batch",
+    "parse_email_bytes",
+    "parse_email_directory",
+    "parse_email_headers",
     "parse_email_message",
+    "parse_raw_messages",
+    "place_file",
+    "place_files",
+    "place_raw_emails",
+    "read_email_dataframe",
+    "schema_version",
     "serialize_email_data",
+    "update_processed_dataset",
+    "write_raw_emails",
 )
 
+from email_spam_filter.data.io.containers import (
+    EmailDataWriter,
+    PlacementMode,
+    RawEmailStore,
+)
 from email_spam_filter.data.io.functions import (
+    EmailFilters,
+    analyse_html,
+    copy_raw_email,
     create_email_data,
+    create_email_header_data,
     deserialize_email_data,
+    find_tar_archives,
+    iter_email_directory,
+    iter_email_headers,
+    iter_email_store,
+    iter_tar_members,
+    load_email_batch,
+    parse_email_bytes,
+    parse_email_directory,
+    parse_email_headers,
     parse_email_message,
+    parse_raw_messages,
+    place_file,
+    place_files,
+    place_raw_emails,
+    read_email_dataframe,
+    schema_version,
     serialize_email_data,
+    update_processed_dataset,
+    write_raw_emails,
 )
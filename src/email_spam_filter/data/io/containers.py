@@ -0,0 +1,422 @@
+"""Streaming writers, packed stores and placement modes for persisting email data."""
+
+from __future__ import annotations
+
+import enum
+import io
+import itertools
+import json
+import logging
+import operator
+import threading
+import typing
+import zlib
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from email_spam_filter.common.containers import EMAIL_DATA_SCHEMA
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import pathlib
+    import types
+
+    from email_spam_filter.common.containers import EmailBatch, EmailData
+
+logger = logging.getLogger(__name__)
+
+
+class PlacementMode(enum.Enum):
+    """How a raw email file is placed into a raw folder, see `place_file`.
+
+    Every mode other than COPY is a metadata-only operation that takes no extra disk space. A
+    mode the filesystem does not support falls back to COPY.
+
+    Attributes:
+        HARDLINK: Add a hard link to the source file. Source and copy must be on the same
+            filesystem, and editing either one in place changes both.
+        REFLINK: Clone the source file copy-on-write, where the filesystem supports it (e.g.
+            Btrfs or XFS on Linux). The clone is independent of the source.
+        SYMLINK: Add a symbolic link to the absolute source path. The link breaks if the
+            source is moved or deleted.
+        COPY: Copy the file contents.
+    """
+
+    HARDLINK = "hardlink"
+    REFLINK = "reflink"
+    SYMLINK = "symlink"
+    COPY = "copy"
+
+
+class EmailDataWriter:
+    """Context manager that streams EmailData into a Parquet file in bounded-size row groups.
+
+    Rows are buffered until `row_group_size` is reached and then flushed to disk, so memory use
+    is independent of the number of emails written. Data is written to a `.partial` file which
+    replaces the target path once the writer closes successfully. If the `with` block raises,
+    the partial file is still closed with a valid footer so that every flushed row group can be
+    recovered.
+
+    Example:
+        >>> with EmailDataWriter(path) as writer:
+        ...     writer.write_all(iter_email_directory(raw_dir))
+    """
+
+    def __init__(self, path: pathlib.Path, *, row_group_size: int = 1024) -> None:
+        """Initialize an EmailDataWriter instance.
+
+        Args:
+            path: Path to the output Parquet file.
+            row_group_size: Maximum number of emails held in memory and written per row group.
+        """
+        if row_group_size < 1:
+            error_message = f"row_group_size must be positive, got {row_group_size}."
+            raise ValueError(error_message)
+        self.path = path
+        self.partial_path = path.with_name(f"{path.name}.partial")
+        self.row_group_size = row_group_size
+        self.n_written = 0
+        self._buffer: list[dict[str, typing.Any]] = []
+        self._writer: pq.ParquetWriter | None = None
+
+    def __enter__(self) -> EmailDataWriter:
+        """Open the underlying Parquet file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(self.partial_path, EMAIL_DATA_SCHEMA)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        """Flush remaining rows and close the file, publishing it only on success."""
+        self.close(publish=exc_type is None)
+
+    def write(self, email_data: EmailData) -> None:
+        """Buffer a single EmailData, flushing a row group once the buffer is full.
+
+        Args:
+            email_data: The EmailData to write.
+        """
+        self._buffer.append(email_data.model_dump())
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def write_all(self, emails: collections.abc.Iterable[EmailData]) -> int:
+        """Write every EmailData from an iterable.
+
+        Args:
+            emails: Iterable of EmailData to write. Consumed lazily.
+
+        Returns:
+            The number of emails written.
+        """
+        n_emails = 0
+        for email_data in emails:
+            self.write(email_data)
+            n_emails += 1
+        return n_emails
+
+    def write_batch(self, batch: EmailBatch) -> None:
+        """Write a whole EmailBatch, splitting its Arrow table into row groups.
+
+        Args:
+            batch: The EmailBatch to write. It must hold every column.
+        """
+        self.flush()
+        self._open_writer().write_table(batch.table, row_group_size=self.row_group_size)
+        self.n_written += len(batch)
+
+    def flush(self) -> None:
+        """Write any buffered rows to disk as a row group."""
+        writer = self._open_writer()
+        if not self._buffer:
+            return
+        batch = pa.RecordBatch.from_pylist(self._buffer, schema=EMAIL_DATA_SCHEMA)
+        writer.write_batch(batch)
+        self.n_written += len(self._buffer)
+        self._buffer.clear()
+
+    def _open_writer(self) -> pq.ParquetWriter:
+        """Return the underlying Parquet writer, raising if the writer is not open."""
+        if self._writer is None:
+            error_message = "EmailDataWriter is not open. Use it as a context manager."
+            raise RuntimeError(error_message)
+        return self._writer
+
+    def close(self, *, publish: bool = True) -> None:
+        """Flush remaining rows and close the file.
+
+        Args:
+            publish: If True, atomically replace the target path with the written file. If
+                False, the file is left at `partial_path`.
+        """
+        if self._writer is None:
+            return
+        try:
+            if publish:
+                self.flush()
+        finally:
+            self._writer.close()
+            self._writer = None
+        if publish:
+            self.partial_path.replace(self.path)
+        else:
+            logger.warning(
+                "Writing interrupted, %d email(s) kept in %s.", self.n_written, self.partial_path
+            )
+
+
+class RawEmailStore:
+    """Append-only packed store of raw emails, addressed by `{uid}_{tag}` keys.
+
+    Instead of one .eml file per message, each email is zlib-compressed and appended to a
+    segment file, and its location is recorded in a JSON-lines offset index. A store replaces a
+    raw folder one-to-one: the store directory takes the folder's name and keys take the .eml
+    file stems, so e.g. `data/raw/trec_spam/12_spam.eml` becomes key `12_spam` in the store at
+    `data/raw/trec_spam`.
+
+    Writing a key again appends a new copy that supersedes the old one. Each record is
+    compressed on its own so that single emails can be read at random, while `items()` streams
+    every segment sequentially.
+
+    Layout:
+        <path>/index.jsonl: One `[key, segment, offset, length]` JSON array per record.
+        <path>/segment-00000.bin: Concatenated compressed emails.
+
+    Example:
+        >>> with RawEmailStore(path) as store:
+        ...     store.put("12_spam", raw_bytes)
+        ...     store.get("12_spam")
+    """
+
+    INDEX_NAME: typing.ClassVar[str] = "index.jsonl"
+
+    def __init__(
+        self, path: pathlib.Path, *, segment_size: int = 64 * 1024**2, compression_level: int = 6
+    ) -> None:
+        """Initialize a RawEmailStore instance. Nothing is opened until the store is used.
+
+        Args:
+            path: Directory of the store. Created on the first write.
+            segment_size: Size in bytes after which a new segment file is started.
+            compression_level: zlib compression level of each email, from 0 to 9.
+        """
+        self.path = path
+        self.segment_size = segment_size
+        self.compression_level = compression_level
+        self._index: dict[str, tuple[int, int, int]] | None = None
+        self._segment_id = -1
+        self._segment_file: typing.BinaryIO | None = None
+        self._index_file: typing.TextIO | None = None
+        self._readers: dict[int, typing.BinaryIO] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_store(cls, path: pathlib.Path) -> bool:
+        """Return True if the directory holds a RawEmailStore.
+
+        Args:
+            path: Directory to check.
+        """
+        return (path / cls.INDEX_NAME).is_file()
+
+    def __enter__(self) -> RawEmailStore:
+        """Return the store itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        """Close all open segment and index files."""
+        self.close()
+
+    def _load_index(self) -> dict[str, tuple[int, int, int]]:
+        """Read the offset index, ignoring a record left incomplete by an interrupted write."""
+        if self._index is None:
+            index: dict[str, tuple[int, int, int]] = {}
+            index_path = self.path / self.INDEX_NAME
+            if index_path.is_file():
+                with index_path.open(encoding="utf-8") as index_file:
+                    for line in index_file:
+                        try:
+                            key, segment_id, offset, length = json.loads(line)
+                        except ValueError:
+                            logger.warning("Skipping corrupt index record in %s.", index_path)
+                            continue
+                        index[key] = (segment_id, offset, length)
+            self._index = index
+        return self._index
+
+    def put(self, key: str, raw_bytes: bytes) -> None:
+        """Compress and append a raw email.
+
+        Args:
+            key: The email key, in form `{uid}_{tag}` (e.g. 12_spam).
+            raw_bytes: The raw RFC822 message contents.
+        """
+        record = zlib.compress(raw_bytes, self.compression_level)
+        with self._lock:
+            segment_file, index_file = self._open_for_append(len(record))
+            offset = segment_file.tell()
+            segment_file.write(record)
+            # The data is written before its index record, so a crash never indexes junk.
+            segment_file.flush()
+            index_file.write(json.dumps([key, self._segment_id, offset, len(record)]) + "\n")
+            index_file.flush()
+            if self._index is not None:
+                self._index[key] = (self._segment_id, offset, len(record))
+
+    def _open_for_append(self, record_size: int) -> tuple[typing.BinaryIO, typing.TextIO]:
+        """Return the segment and index files to append to, rolling over to a new segment."""
+        if self._segment_file is None or self._index_file is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            segment_ids = [int(p.stem.split("-")[1]) for p in self.path.glob("segment-*.bin")]
+            self._segment_id = max(segment_ids, default=0)
+            self._segment_file = _segment_path(self.path, self._segment_id).open("ab")
+            _truncate_incomplete_line(self.path / self.INDEX_NAME)
+            self._index_file = (self.path / self.INDEX_NAME).open("a", encoding="utf-8")
+        position = self._segment_file.tell()
+        if position and position + record_size > self.segment_size:
+            self._segment_file.close()
+            self._segment_id += 1
+            self._segment_file = _segment_path(self.path, self._segment_id).open("ab")
+        return self._segment_file, self._index_file
+
+    def get(self, key: str) -> bytes:
+        """Read a single raw email.
+
+        Args:
+            key: The email key, in form `{uid}_{tag}` (e.g. 12_spam).
+
+        Returns:
+            The raw RFC822 message contents.
+
+        Raises:
+            KeyError: If the store holds no email with this key.
+        """
+        segment_id, offset, length = self._load_index()[key]
+        with self._lock:
+            reader = self._readers.get(segment_id)
+            if reader is None:
+                reader = self._readers[segment_id] = _segment_path(self.path, segment_id).open("rb")
+            reader.seek(offset)
+            record = reader.read(length)
+        return zlib.decompress(record)
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if the store holds an email with this key."""
+        return key in self._load_index()
+
+    def __len__(self) -> int:
+        """Return the number of emails in the store."""
+        return len(self._load_index())
+
+    def keys(self) -> list[str]:
+        """Return every email key, in the order the emails were first written."""
+        return list(self._load_index())
+
+    def spans(self) -> list[tuple[int, int, int, str]]:
+        """Return the location of every email, sorted into storage order.
+
+        Returns:
+            Tuples of (segment_id, offset, length, key). Superseded copies are left out.
+        """
+        return sorted(
+            (segment_id, offset, length, key)
+            for key, (segment_id, offset, length) in self._load_index().items()
+        )
+
+    def items(self) -> collections.abc.Iterator[tuple[str, bytes]]:
+        """Stream every email by reading the segment files sequentially.
+
+        Yields:
+            Tuples of (key, raw_bytes) in storage order.
+        """
+        return self.read_spans(self.path, self.spans())
+
+    @staticmethod
+    def read_spans(
+        path: pathlib.Path, spans: collections.abc.Iterable[tuple[int, int, int, str]]
+    ) -> collections.abc.Iterator[tuple[str, bytes]]:
+        """Read emails from a store directory without loading its index.
+
+        Each segment is opened once and read front to back, so workers can stream their share of
+        a store given only the spans from `RawEmailStore.spans`.
+
+        Args:
+            path: Directory of the store.
+            spans: Tuples of (segment_id, offset, length, key) in storage order.
+
+        Yields:
+            Tuples of (key, raw_bytes).
+        """
+        for segment_id, segment_spans in itertools.groupby(spans, key=operator.itemgetter(0)):
+            with _segment_path(path, segment_id).open("rb") as segment_file:
+                for _, offset, length, key in segment_spans:
+                    if segment_file.tell() != offset:
+                        segment_file.seek(offset)
+                    yield key, zlib.decompress(segment_file.read(length))
+
+    def clear(self) -> None:
+        """Remove every email by deleting the index and segment files."""
+        self.close()
+        with self._lock:
+            for segment_path in self.path.glob("segment-*.bin"):
+                segment_path.unlink()
+            (self.path / self.INDEX_NAME).unlink(missing_ok=True)
+            self._index = {}
+
+    def close(self) -> None:
+        """Close all open segment and index files."""
+        with self._lock:
+            for file in (self._segment_file, self._index_file, *self._readers.values()):
+                if file is not None:
+                    file.close()
+            self._segment_file = None
+            self._index_file = None
+            self._readers.clear()
+
+
+def _truncate_incomplete_line(path: pathlib.Path, block_size: int = 4096) -> None:
+    """Cut a file back to its last newline, dropping a line left incomplete by a crash.
+
+    Otherwise the next appended line would be glued onto the incomplete one, and both would be
+    skipped as corrupt on load.
+
+    Args:
+        path: Path to the line-oriented file. Nothing happens if it does not exist.
+        block_size: Number of bytes read at a time while searching backwards for a newline.
+    """
+    if not path.is_file():
+        return
+    with path.open("rb+") as file:
+        end = file.seek(0, io.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            logger.warning("Dropping an incomplete record at the end of %s.", path)
+            file.truncate(position)
+
+
+def _segment_path(path: pathlib.Path, segment_id: int) -> pathlib.Path:
+    """Return the path of a RawEmailStore segment file.
+
+    Args:
+        path: Directory of the store.
+        segment_id: Number of the segment.
+    """
+    return path / f"segment-{segment_id:05d}.bin"
@@ -4,42 +4,91 @@ from __future__ import annotations
 
 __all__ = ()
 
+import concurrent.futures
+import contextlib
 import email
+import email.parser
 import email.policy
 import email.utils
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import multiprocessing as mp
+import os
 import pathlib
 import re
+import shutil
+import sys
+import tarfile
 import typing
 import urllib.parse
 
 import bs4
-import pandas as pd
+import pyarrow.parquet as pq
 
 from email_spam_filter.common.containers import (
+    SCHEMA_VERSION_KEY,
     AttributeData,
+    EmailBatch,
     EmailData,
+    EmailHeaderData,
+    HtmlAnalysis,
     TagData,
     ValueData,
 )
+from email_spam_filter.common.functions import soup_to_text
+from email_spam_filter.data.io.containers import EmailDataWriter, PlacementMode, RawEmailStore
+
+if sys.platform == "linux":
+    import fcntl
 
 if typing.TYPE_CHECKING:
-    from email.message import EmailMessage
+    import collections.abc
+    from email.message import EmailMessage, Message
+
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
 
 RAW_DIR: typing.Final[pathlib.Path] = pathlib.Path("data/raw")
+PLACEHOLDER_SIZE_HEADER: typing.Final[str] = "X-Placeholder-Size"
+"""Header giving the original size of an attachment whose payload was left out of a message."""
+PLACEMENT_MANIFEST_SUFFIX: typing.Final[str] = ".manifest.jsonl"
+"""Name of the file recording how every file in a folder was placed, see `place_files`."""
+TAR_ARCHIVE_SUFFIXES: typing.Final[tuple[str, ...]] = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+"""File name endings of the tar archives that datasets can be read from without extracting."""
+_FICLONE: typing.Final[int] = 0x40049409
+"""Linux ioctl request that clones a file's extents copy-on-write, as used by `cp --reflink`."""
+_URL_REGEX: typing.Final[re.Pattern[str]] = re.compile(r'(https?://[^\s"<>\]]+)', re.IGNORECASE)
 logger = logging.getLogger(__name__)
 
+type EmailFilters = pc.Expression | collections.abc.Sequence[typing.Any]
+"""Row predicate for processed Parquet files: a pyarrow expression or DNF filter tuples."""
 
-def create_email_data(path: pathlib.Path) -> EmailData:
+
+def create_email_data(path: pathlib.Path, *, store: RawEmailStore | None = None) -> EmailData:
     """Read an .eml file from disk and return its parsed EmailData.
 
     Args:
-        path: Filesystem path to the .eml file.
+        path: Filesystem path to the .eml file. When reading from a packed store, the path the
+            email would have had in the unpacked folder, i.e. `<store.path>/<key>.eml`.
+        store: If given, the raw email is read from this packed store by key `path.stem`.
 
     Returns:
         An EmailData instance with all extracted fields.
     """
+    if store is not None:
+        return parse_email_bytes(store.get(path.stem), path.stem, path.parent.name)
     with path.open("rb") as f:
         email_message = email.message_from_binary_file(f, policy=email.policy.default)
     folder = (path.parent).name
@@ -47,6 +96,694 @@ def create_email_data(path: pathlib.Path) -> EmailData:
     return parse_email_message(email_message, uid, folder)
 
 
+def parse_email_bytes(raw_bytes: bytes, uid: str, folder_label: str) -> EmailData:
+    """Parse raw RFC822 bytes into EmailData.
+
+    Args:
+        raw_bytes: The raw RFC822 message contents.
+        uid: Identifier in form `{uid}_{tag}` (e.g. 12_spam).
+        folder_label: Name of the raw folder or store the email belongs to.
+
+    Returns:
+        An EmailData instance with all extracted fields.
+    """
+    email_message = email.message_from_bytes(raw_bytes, policy=email.policy.default)
+    return parse_email_message(email_message, uid, folder_label)
+
+
+def copy_raw_email(
+    src: pathlib.Path,
+    dest: pathlib.Path,
+    *,
+    store: RawEmailStore | None = None,
+    placement: PlacementMode = PlacementMode.COPY,
+) -> None:
+    """Place a raw email file into a raw folder, or append it to the folder's packed store.
+
+    Args:
+        src: Path to the source email file.
+        dest: Destination .eml path in the raw folder.
+        store: If given, the email is appended to this store under key `dest.stem` instead.
+        placement: How the file is placed into the raw folder, see `place_file`. Ignored when
+            writing to a store.
+    """
+    if store is not None:
+        store.put(dest.stem, src.read_bytes())
+    else:
+        place_file(src, dest, placement)
+
+
+def place_file(
+    src: pathlib.Path, dest: pathlib.Path, placement: PlacementMode = PlacementMode.COPY
+) -> PlacementMode:
+    """Place a file at a destination path by linking, cloning or copying it.
+
+    An existing file at `dest` is replaced. If the filesystem cannot link or clone the file,
+    e.g. because `src` and `dest` are on different devices, the file is copied instead.
+
+    Args:
+        src: Path to the source file.
+        dest: Destination path of the file.
+        placement: How to place the file.
+
+    Returns:
+        The placement mode actually used.
+    """
+    dest.unlink(missing_ok=True)
+    try:
+        if placement is PlacementMode.HARDLINK:
+            dest.hardlink_to(src)
+        elif placement is PlacementMode.SYMLINK:
+            dest.symlink_to(src.resolve())
+        elif placement is PlacementMode.REFLINK:
+            _reflink(src, dest)
+        else:
+            shutil.copyfile(src, dest)
+    except OSError as error:
+        if placement is PlacementMode.COPY:
+            raise
+        _log_placement_fallback(placement, error.strerror or str(error))
+        dest.unlink(missing_ok=True)
+        shutil.copyfile(src, dest)
+        return PlacementMode.COPY
+    return placement
+
+
+def _reflink(src: pathlib.Path, dest: pathlib.Path) -> None:
+    """Clone a file copy-on-write with the Linux FICLONE ioctl.
+
+    Raises:
+        OSError: If the platform or filesystem does not support cloning.
+    """
+    if sys.platform != "linux":
+        error_message = f"Reflinks are not supported on {sys.platform}."
+        raise OSError(error_message)
+    with src.open("rb") as src_file, dest.open("wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), _FICLONE, src_file.fileno())
+
+
+@functools.cache
+def _log_placement_fallback(placement: PlacementMode, reason: str) -> None:
+    """Warn, once per mode and reason, that files are copied instead of placed by `placement`.
+
+    Args:
+        placement: The placement mode that failed.
+        reason: Why the placement mode failed.
+    """
+    logger.warning("Cannot place files by %s (%s). Copying them instead.", placement.value, reason)
+
+
+def place_raw_emails(
+    plan: collections.abc.Iterable[tuple[pathlib.Path, pathlib.Path]],
+    *,
+    packed: bool = False,
+    placement: PlacementMode = PlacementMode.COPY,
+    workers: int = 8,
+) -> None:
+    """Place raw email files into raw folders, or append them to the folders' packed stores.
+
+    Args:
+        plan: Pairs of (source path, destination .eml path in a raw folder), e.g. from a
+            dataset organiser. Each destination must be unique and its folder must exist.
+        packed: If True, each email is appended to the RawEmailStore of its destination folder
+            under key `dest.stem`, unless the store already holds that key.
+        placement: How each file is placed, see `place_files`. Ignored when `packed` is True.
+        workers: Number of threads placing files. Ignored when `packed` is True.
+    """
+    if not packed:
+        place_files(plan, placement=placement, workers=workers)
+        return
+    with contextlib.ExitStack() as stack:
+        stores: dict[pathlib.Path, RawEmailStore] = {}
+        for src, dest in plan:
+            if dest.parent not in stores:
+                stores[dest.parent] = stack.enter_context(RawEmailStore(dest.parent))
+            if dest.stem not in stores[dest.parent]:
+                copy_raw_email(src, dest, store=stores[dest.parent])
+
+
+def place_files(
+    plan: collections.abc.Iterable[tuple[pathlib.Path, pathlib.Path]],
+    *,
+    placement: PlacementMode = PlacementMode.COPY,
+    workers: int = 8,
+) -> int:
+    """Place many files concurrently, skipping those already placed by a previous run.
+
+    Every destination folder gets a sibling `<folder>.manifest.jsonl`, kept outside the folder so
+    it only ever holds emails, recording per destination file name the source path, size and
+    modification time it was placed from and the placement mode. A file
+    is skipped when its manifest record still matches its source and the destination file
+    has the source's size. Records are appended as files are placed, so an interrupted run
+    resumes where it stopped. Manifest lines that cannot be parsed are ignored and the last
+    record for a name wins.
+
+    Args:
+        plan: Pairs of (source path, destination path). Each destination must be unique and
+            its folder must exist.
+        placement: How each file is placed, see `place_file`.
+        workers: Number of threads placing files.
+
+    Returns:
+        The number of files placed, i.e. not skipped.
+    """
+    manifests: dict[pathlib.Path, dict[str, list[typing.Any]]] = {}
+    pending = []
+    n_files = 0
+    for src, dest in plan:
+        n_files += 1
+        if dest.parent not in manifests:
+            manifests[dest.parent] = _load_placement_manifest(_placement_manifest_path(dest.parent))
+        src_stat = src.stat()
+        record = [str(src), src_stat.st_size, src_stat.st_mtime_ns, placement.value]
+        if manifests[dest.parent].get(dest.name) != record or not _has_size(dest, src_stat.st_size):
+            pending.append((src, dest, record))
+
+    logger.info("Placing %d of %d files, the rest are already in place.", len(pending), n_files)
+    with contextlib.ExitStack() as stack, concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        manifest_files = {
+            folder: stack.enter_context(
+                _placement_manifest_path(folder).open("a", buffering=1, encoding="utf-8")
+            )
+            for folder in {dest.parent for _, dest, _ in pending}
+        }
+        placed = pool.map(lambda item: place_file(item[0], item[1], placement), pending)
+        for (_, dest, record), _ in zip(pending, placed, strict=True):
+            manifest_files[dest.parent].write(json.dumps([dest.name, *record]) + "\n")
+    return len(pending)
+
+
+def _placement_manifest_path(folder: pathlib.Path) -> pathlib.Path:
+    """Return the path of the placement manifest of a destination folder.
+
+    Args:
+        folder: Path to the destination folder.
+    """
+    return folder.with_name(folder.name + PLACEMENT_MANIFEST_SUFFIX)
+
+
+def _load_placement_manifest(path: pathlib.Path) -> dict[str, list[typing.Any]]:
+    """Read a placement manifest into a mapping of destination file name to its record.
+
+    Args:
+        path: Path to the manifest file. It need not exist.
+    """
+    manifest: dict[str, list[typing.Any]] = {}
+    if not path.is_file():
+        return manifest
+    with path.open(encoding="utf-8") as manifest_file:
+        for line in manifest_file:
+            try:
+                name, *record = json.loads(line)
+            except (ValueError, TypeError):
+                logger.warning("Skipping corrupt manifest record in %s.", path)
+                continue
+            manifest[name] = record
+    return manifest
+
+
+def _has_size(path: pathlib.Path, size: int) -> bool:
+    """Return True if the file, or the file a symlink points to, exists and has `size` bytes.
+
+    Args:
+        path: Path to the file.
+        size: Expected size in bytes.
+    """
+    try:
+        return path.stat().st_size == size
+    except FileNotFoundError:
+        return False
+
+
+def write_raw_emails(
+    emails: collections.abc.Iterable[tuple[pathlib.Path, bytes]], *, packed: bool = False
+) -> int:
+    """Write raw email bytes into raw folders, or append them to the folders' packed stores.
+
+    The counterpart of `place_raw_emails` for emails that are not files on disk, e.g. members
+    streamed out of a tar archive. Emails already written by a previous run are skipped, so an
+    interrupted run can simply be repeated.
+
+    Args:
+        emails: Pairs of (destination .eml path in a raw folder, raw RFC822 bytes). Each
+            destination must be unique and its folder must exist.
+        packed: If True, each email is appended to the RawEmailStore of its destination folder
+            under key `dest.stem`, unless the store already holds that key. Otherwise a .eml
+            file is written, unless one of the same size already exists.
+
+    Returns:
+        The number of emails written, i.e. not skipped.
+    """
+    n_written = 0
+    with contextlib.ExitStack() as stack:
+        stores: dict[pathlib.Path, RawEmailStore] = {}
+        for dest, raw_bytes in emails:
+            if packed:
+                if dest.parent not in stores:
+                    stores[dest.parent] = stack.enter_context(RawEmailStore(dest.parent))
+                if dest.stem in stores[dest.parent]:
+                    continue
+                stores[dest.parent].put(dest.stem, raw_bytes)
+            elif _has_size(dest, len(raw_bytes)):
+                continue
+            else:
+                dest.write_bytes(raw_bytes)
+            n_written += 1
+    logger.info("Wrote %d emails, the rest were already in place.", n_written)
+    return n_written
+
+
+def find_tar_archives(path: pathlib.Path) -> list[pathlib.Path]:
+    """Return the tar archives at a path.
+
+    Args:
+        path: Either a tar archive or a directory holding tar archives.
+
+    Returns:
+        The path itself if it is a tar archive, otherwise the tar archives directly inside it in
+        sorted order. Empty if there are none or the path does not exist.
+    """
+    if path.is_file():
+        return [path] if path.name.lower().endswith(TAR_ARCHIVE_SUFFIXES) else []
+    if not path.is_dir():
+        return []
+    return sorted(
+        p for p in path.iterdir() if p.is_file() and p.name.lower().endswith(TAR_ARCHIVE_SUFFIXES)
+    )
+
+
+def iter_tar_members(
+    archive_path: pathlib.Path,
+) -> collections.abc.Generator[tuple[str, bytes], None, None]:
+    """Stream the regular files out of a, possibly compressed, tar archive.
+
+    The archive is read front to back in a single pass and nothing is extracted to disk, so
+    only one member is held in memory at a time.
+
+    Args:
+        archive_path: Path to a .tar, .tar.gz, .tar.bz2 or .tar.xz archive.
+
+    Yields:
+        Tuples of (member name, member bytes) in archive order. Member names use "/" separators
+        and have no leading "./".
+    """
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            member_file = archive.extractfile(member)
+            if member_file is None:
+                continue
+            with member_file:
+                yield member.name.removeprefix("./"), member_file.read()
+
+
+def create_email_header_data(path: pathlib.Path) -> EmailHeaderData:
+    """Read only the header block of an .eml file and return its parsed EmailHeaderData.
+
+    The file is read up to the first blank line, so the cost does not depend on the size of the
+    body or attachments.
+
+    Args:
+        path: Filesystem path to the .eml file.
+
+    Returns:
+        An EmailHeaderData instance with the extracted header fields.
+    """
+    with path.open("rb") as f:
+        header_bytes = _read_header_block(f)
+    email_message = email.parser.BytesHeaderParser(policy=email.policy.default).parsebytes(
+        header_bytes
+    )
+    return parse_email_headers(email_message, path.stem, path.parent.name)
+
+
+def _read_header_block(f: typing.BinaryIO) -> bytes:
+    """Read lines from a binary file up to and including the blank line ending the headers.
+
+    Args:
+        f: A binary file positioned at the start of a message.
+
+    Returns:
+        The raw header block.
+    """
+    lines = []
+    for line in f:
+        lines.append(line)
+        if line in {b"\n", b"\r\n"}:
+            break
+    return b"".join(lines)
+
+
+def parse_email_directory(
+    paths: pathlib.Path | collections.abc.Iterable[pathlib.Path],
+    *,
+    workers: int | None = None,
+    chunksize: int | None = None,
+) -> list[EmailData]:
+    """Parse many .eml files into EmailData, fanning the work out over a process pool.
+
+    Args:
+        paths: Either a directory containing .eml files or an iterable of .eml file paths.
+        workers: Number of worker processes. If None, uses `os.cpu_count()`. A value of 1 parses
+            serially in the current process.
+        chunksize: Number of paths handed to a worker at a time. If None, a chunk size is chosen
+            so that each worker receives roughly four chunks.
+
+    Returns:
+        A list of EmailData instances in sorted-path order.
+    """
+    return list(iter_email_directory(paths, workers=workers, chunksize=chunksize))
+
+
+def iter_email_directory(
+    paths: pathlib.Path | collections.abc.Iterable[pathlib.Path],
+    *,
+    workers: int | None = None,
+    chunksize: int | None = None,
+) -> collections.abc.Iterator[EmailData]:
+    """Lazily parse many .eml files into EmailData using a process pool.
+
+    Results are yielded as soon as they are ready, in sorted-path order, so they can be streamed
+    into an EmailDataWriter without holding the whole corpus in memory.
+
+    Args:
+        paths: Either a directory containing .eml files or an iterable of .eml file paths.
+        workers: Number of worker processes. If None, uses `os.cpu_count()`. A value of 1 parses
+            serially in the current process.
+        chunksize: Number of paths handed to a worker at a time. If None, a chunk size is chosen
+            so that each worker receives roughly four chunks.
+
+    Yields:
+        EmailData instances in sorted-path order. If `paths` is a packed RawEmailStore directory,
+        see `iter_email_store`.
+    """
+    if isinstance(paths, pathlib.Path) and RawEmailStore.is_store(paths):
+        return iter_email_store(RawEmailStore(paths), workers=workers, chunksize=chunksize)
+    return _iter_parsed(create_email_data, paths, workers=workers, chunksize=chunksize)
+
+
+def iter_email_store(
+    store: RawEmailStore, *, workers: int | None = None, chunksize: int | None = None
+) -> collections.abc.Iterator[EmailData]:
+    """Lazily parse every email of a packed RawEmailStore into EmailData using a process pool.
+
+    The store is split into runs of consecutive records and each worker streams its runs
+    straight from the segment files, so raw bytes are never shipped between processes. Only a
+    few runs per worker are in flight, so parsed emails never pile up in memory.
+
+    Args:
+        store: The packed store to parse. Its directory name is used as the folder label.
+        workers: Number of worker processes. If None, uses `os.cpu_count()`. A value of 1 parses
+            serially in the current process.
+        chunksize: Number of emails handed to a worker at a time. If None, a chunk size is
+            chosen so that each worker receives roughly four chunks.
+
+    Yields:
+        EmailData instances in storage order.
+    """
+    spans = store.spans()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(spans) <= 1:
+        for key, raw_bytes in store.items():
+            yield parse_email_bytes(raw_bytes, key, store.path.name)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(spans) // (workers * 4))
+    chunks = ((store.path, spans[i : i + chunksize]) for i in range(0, len(spans), chunksize))
+    with _process_pool(workers) as executor:
+        yield from _iter_chunk_results(
+            executor, _parse_store_chunk, chunks, max_pending=workers * 2
+        )
+
+
+def _parse_store_chunk(
+    chunk: tuple[pathlib.Path, list[tuple[int, int, int, str]]],
+) -> list[EmailData]:
+    """Parse a run of emails from a packed store, for use in a worker process.
+
+    Args:
+        chunk: Tuple of (store_path, spans) as produced by `RawEmailStore.spans`.
+
+    Returns:
+        The parsed EmailData, in span order.
+    """
+    path, spans = chunk
+    return [
+        parse_email_bytes(raw_bytes, key, path.name)
+        for key, raw_bytes in RawEmailStore.read_spans(path, spans)
+    ]
+
+
+def parse_raw_messages(
+    messages: collections.abc.Iterable[tuple[str, bytes, str]],
+    *,
+    workers: int | None = None,
+    chunksize: int = 64,
+) -> collections.abc.Iterator[EmailData]:
+    """Lazily parse raw email bytes into EmailData using a process pool.
+
+    Messages are consumed as they are produced and only a few chunks per worker are in flight,
+    so an unbounded stream, e.g. the members of a tar archive, is parsed in constant memory.
+
+    Args:
+        messages: Tuples of (uid in form `{uid}_{tag}`, raw RFC822 bytes, folder label).
+        workers: Number of worker processes. If None, uses `os.cpu_count()`. A value of 1 parses
+            serially in the current process.
+        chunksize: Number of messages handed to a worker at a time.
+
+    Yields:
+        EmailData instances in message order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for uid, raw_bytes, folder_label in messages:
+            yield parse_email_bytes(raw_bytes, uid, folder_label)
+        return
+
+    messages = iter(messages)
+    chunks = iter(lambda: list(itertools.islice(messages, chunksize)), [])
+    with _process_pool(workers) as executor:
+        yield from _iter_chunk_results(
+            executor, _parse_message_chunk, chunks, max_pending=workers * 2
+        )
+
+
+def _parse_message_chunk(chunk: list[tuple[str, bytes, str]]) -> list[EmailData]:
+    """Parse a chunk of raw messages, for use in a worker process.
+
+    Args:
+        chunk: Tuples of (uid, raw RFC822 bytes, folder label).
+
+    Returns:
+        The parsed EmailData, in chunk order.
+    """
+    return [parse_email_bytes(raw_bytes, uid, label) for uid, raw_bytes, label in chunk]
+
+
+def iter_email_headers(
+    paths: pathlib.Path | collections.abc.Iterable[pathlib.Path],
+    *,
+    workers: int | None = None,
+    chunksize: int | None = None,
+) -> collections.abc.Iterator[EmailHeaderData]:
+    """Lazily parse only the headers of many .eml files for fast triage or pre-filtering.
+
+    Args:
+        paths: Either a directory containing .eml files or an iterable of .eml file paths.
+        workers: Number of worker processes. If None, uses `os.cpu_count()`. A value of 1 parses
+            serially in the current process.
+        chunksize: Number of paths handed to a worker at a time. If None, a chunk size is chosen
+            so that each worker receives roughly four chunks.
+
+    Yields:
+        EmailHeaderData instances in sorted-path order.
+    """
+    return _iter_parsed(create_email_header_data, paths, workers=workers, chunksize=chunksize)
+
+
+def _iter_parsed[ResultT](
+    parse: collections.abc.Callable[[pathlib.Path], ResultT],
+    paths: pathlib.Path | collections.abc.Iterable[pathlib.Path],
+    *,
+    workers: int | None,
+    chunksize: int | None,
+) -> collections.abc.Iterator[ResultT]:
+    """Apply a picklable per-file parser to many .eml files, using a process pool if useful.
+
+    Args:
+        parse: Module-level function parsing a single .eml path.
+        paths: Either a directory containing .eml files or an iterable of .eml file paths.
+        workers: Number of worker processes. If None, uses `os.cpu_count()`.
+        chunksize: Number of paths handed to a worker at a time. If None, a chunk size is chosen
+            so that each worker receives roughly four chunks.
+
+    Yields:
+        The parsed results in sorted-path order.
+    """
+    if isinstance(paths, pathlib.Path):
+        paths = paths.glob("*.eml")
+    eml_paths = sorted(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(eml_paths) <= 1:
+        yield from (parse(path) for path in eml_paths)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(eml_paths) // (workers * 4))
+    chunks = itertools.batched(eml_paths, chunksize)
+    with _process_pool(workers) as executor:
+        yield from _iter_chunk_results(
+            executor, functools.partial(_parse_path_chunk, parse), chunks, max_pending=workers * 2
+        )
+
+
+def _parse_path_chunk[ResultT](
+    parse: collections.abc.Callable[[pathlib.Path], ResultT], chunk: tuple[pathlib.Path, ...]
+) -> list[ResultT]:
+    """Apply a per-file parser to a chunk of .eml paths, for use in a worker process.
+
+    Args:
+        parse: Module-level function parsing a single .eml path.
+        chunk: The paths to parse.
+
+    Returns:
+        The parsed results, in chunk order.
+    """
+    return [parse(path) for path in chunk]
+
+
+def _iter_chunk_results[ChunkT, ResultT](
+    executor: concurrent.futures.Executor,
+    parse_chunk: collections.abc.Callable[[ChunkT], list[ResultT]],
+    chunks: collections.abc.Iterable[ChunkT],
+    *,
+    max_pending: int,
+) -> collections.abc.Iterator[ResultT]:
+    """Parse chunks on an executor with a bounded number of chunks in flight.
+
+    Chunks are submitted as `chunks` is consumed, and once `max_pending` are in flight the
+    oldest one's results are yielded before the next is submitted. Unlike `Executor.map`, which
+    submits every chunk up front, at most `max_pending` chunks of results are held at once.
+
+    Args:
+        executor: The executor to parse on.
+        parse_chunk: Picklable function parsing one chunk into a list of results.
+        chunks: The chunks to parse.
+        max_pending: Maximum number of chunks submitted but not yet yielded.
+
+    Yields:
+        The parsed results, in chunk order.
+    """
+    pending: list[concurrent.futures.Future[list[ResultT]]] = []
+    for chunk in chunks:
+        pending.append(executor.submit(parse_chunk, chunk))
+        if len(pending) >= max_pending:
+            yield from pending.pop(0).result()
+    while pending:
+        yield from pending.pop(0).result()
+
+
+def _process_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Create a process pool that is safe to start from a multi-threaded parent.
+
+    pyarrow keeps background threads alive, so workers are started through a fork server where
+    available instead of forking the parent directly.
+
+    Args:
+        workers: Number of worker processes.
+
+    Returns:
+        A new ProcessPoolExecutor.
+    """
+    start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else None
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp.get_context(start_method)
+    )
+
+
+def update_processed_dataset(
+    eml_paths: collections.abc.Iterable[pathlib.Path],
+    processed_path: pathlib.Path,
+    *,
+    manifest_path: pathlib.Path | None = None,
+    workers: int | None = None,
+) -> list[EmailData]:
+    """Incrementally bring a processed Parquet dataset up to date with its raw .eml files.
+
+    A manifest recording the size, modification time and content hash of every parsed file is
+    kept next to the Parquet file. Only new or changed files are parsed, rows of deleted files
+    are dropped, and the result is merged into the existing dataset. If either the manifest or
+    the Parquet file is missing, every file is parsed.
+
+    Args:
+        eml_paths: Every .eml file that currently belongs to the dataset.
+        processed_path: Path to the processed Parquet database.
+        manifest_path: Path to the JSON manifest. (Default: `<processed_path>.manifest.json`)
+        workers: Number of worker processes used for parsing, see `parse_email_directory`.
+
+    Returns:
+        The full, updated list of EmailData in sorted-path order.
+    """
+    if manifest_path is None:
+        manifest_path = processed_path.with_suffix(".manifest.json")
+    eml_paths = sorted(eml_paths)
+
+    old_manifest: dict[str, dict[str, typing.Any]] = {}
+    existing: list[EmailData] = []
+    if manifest_path.exists() and processed_path.exists():
+        old_manifest = json.loads(manifest_path.read_text())
+        existing = deserialize_email_data(processed_path)
+
+    manifest: dict[str, dict[str, typing.Any]] = {}
+    changed: list[pathlib.Path] = []
+    for path in eml_paths:
+        key = str(path.resolve())
+        stat = path.stat()
+        entry = old_manifest.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            manifest[key] = entry
+            continue
+        digest = _file_digest(path)
+        if not entry or entry["sha256"] != digest:
+            changed.append(path)
+        manifest[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+    deleted = old_manifest.keys() - manifest.keys()
+    stale = {path.stem for path in changed} | {pathlib.Path(key).stem for key in deleted}
+    logger.info(
+        "%d new or changed, %d deleted and %d unchanged file(s) for %s.",
+        len(changed),
+        len(deleted),
+        len(eml_paths) - len(changed),
+        processed_path,
+    )
+
+    rows = {f"{e.id}_{e.tag}": e for e in existing if f"{e.id}_{e.tag}" not in stale}
+    if changed:
+        parsed = parse_email_directory(changed, workers=workers)
+        rows.update((f"{e.id}_{e.tag}", e) for e in parsed)
+    email_data = [rows[path.stem] for path in eml_paths if path.stem in rows]
+    if changed or deleted or not processed_path.exists():
+        serialize_email_data(email_data, processed_path)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return email_data
+
+
+def _file_digest(path: pathlib.Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file to hash.
+
+    Returns:
+        The hex digest string.
+    """
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
 def parse_email_message(email_message: EmailMessage, uid: str, folder_label: str) -> EmailData:
     """Extract EmailData from an EmailMessage object.
 
@@ -58,6 +795,60 @@ def parse_email_message(email_message: EmailMessage, uid: str, folder_label: str
     Returns:
         An EmailData instance with parsed content.
     """
+    headers = parse_email_headers(email_message, uid, folder_label)
+    plain_body, html_body, attachments = _extract_email_parts(email_message, uid, folder_label)
+    html_analysis = analyse_html(html_body, include_text=True)
+    plain_urls, plain_contexts = _extract_plain_links(plain_body)
+    link_urls = html_analysis.link_urls + tuple(plain_urls)
+    contexts = html_analysis.link_contexts + tuple(plain_contexts)
+    n_links = len(link_urls)
+    n_dupe_links = n_links - len(set(link_urls))
+    link_domains_set = set()
+    for url in link_urls:
+        try:
+            netloc = urllib.parse.urlparse(url).netloc
+            link_domains_set.add(netloc)
+        except ValueError as error:
+            logger.info("MALFORMED URL found in %s: %s", f"{RAW_DIR}/{folder_label}/{uid}.eml", url)
+            logger.debug(error)
+            link_domains_set.add("MALFORMED")
+    link_domains = tuple(link_domains_set)
+
+    return EmailData(
+        id=headers.id,
+        tag=headers.tag,
+        source=headers.source,
+        subject=headers.subject,
+        body=plain_body,
+        unique_html_tags=html_analysis.unique_html_tags,
+        from_addr=headers.from_addr,
+        from_name=headers.from_name,
+        n_links=n_links,
+        n_dupe_links=n_dupe_links,
+        link_domains=link_domains,
+        link_contexts=contexts,
+        n_rcpts=headers.n_rcpts,
+        has_attach=bool(attachments),
+        auth_fail=headers.auth_fail,
+        n_attach=len(attachments),
+        attach_size=sum(size for _, size in attachments),
+        attach_types=tuple(ctype for ctype, _ in attachments),
+        html_text=html_analysis.text,
+    )
+
+
+def parse_email_headers(email_message: Message, uid: str, folder_label: str) -> EmailHeaderData:
+    """Extract EmailHeaderData from the headers of a parsed message.
+
+    Args:
+        email_message: The message to inspect. Only its headers are read, so the result of a
+            header-only parse is enough.
+        uid: Unique identifier to assign. Must be in form 123_tag. (e.g. 12_spam).
+        folder_label: Folder label (e.g., 'inbox').
+
+    Returns:
+        An EmailHeaderData instance with the parsed header fields.
+    """
     id_str, tag = uid.split("_", 1)
     subject = email_message.get("Subject", "")
 
@@ -80,53 +871,27 @@ def parse_email_message(email_message: EmailMessage, uid: str, folder_label: str
     rcpt_headers = to_headers + cc_headers
     n_rcpts = len(email.utils.getaddresses(rcpt_headers))
 
-    has_attach = any(
-        part.get_content_disposition() == "attachment" for part in email_message.iter_attachments()
-    )
     auth_fail = any(
         "fail" in hdr.lower() for hdr in email_message.get_all("Authentication-Results", [])
     )
 
-    plain_body, html_body = _extract_email_parts(email_message, uid, folder_label)
-    tag_counts = _extract_unique_tag_data(html_body)
-
-    link_urls, contexts = _extract_link_contexts(plain_body, html_body)
-    n_links = len(link_urls)
-    n_dupe_links = n_links - len(set(link_urls))
-    link_domains_set = set()
-    for url in link_urls:
-        try:
-            netloc = urllib.parse.urlparse(url).netloc
-            link_domains_set.add(netloc)
-        except ValueError as error:
-            logger.info("MALFORMED URL found in %s: %s", f"{RAW_DIR}/{folder_label}/{uid}.eml", url)
-            logger.debug(error)
-            link_domains_set.add("MALFORMED")
-    link_domains = tuple(link_domains_set)
-
-    return EmailData(
+    return EmailHeaderData(
         id=int(id_str),
         tag=tag,
         source=folder_label.split("_", 1)[0],
         subject=subject,
-        body=plain_body,
-        unique_html_tags=tag_counts,
         from_addr=from_addr,
         from_name=from_name,
-        n_links=n_links,
-        n_dupe_links=n_dupe_links,
-        link_domains=link_domains,
-        link_contexts=contexts,
         n_rcpts=n_rcpts,
-        has_attach=has_attach,
         auth_fail=auth_fail,
+        message_id=str(email_message.get("Message-ID", "")).strip(),
     )
 
 
 def _extract_email_parts(
     email_message: EmailMessage, uid: str, folder_label: str
-) -> tuple[str, str]:
-    """Extract plain-text and HTML parts from the EmailMessage.
+) -> tuple[str, str, list[tuple[str, int]]]:
+    """Extract plain-text and HTML parts and attachment facts from the EmailMessage.
 
     Args:
         email_message: The EmailMessage object to inspect.
@@ -134,17 +899,30 @@ def _extract_email_parts(
         folder_label: Folder label (e.g., 'inbox').
 
     Returns:
-        A tuple containing the plain-text and html parts of the EmailMessage.
+        A tuple containing the plain-text and html parts of the EmailMessage, and the MIME type
+        and encoded size of each attachment.
     """
     if hasattr(email_message, "is_multipart") and email_message.is_multipart():
         return _extract_parts_multipart(email_message, uid, folder_label)
-    return _extract_parts_nonmultipart(email_message, uid, folder_label)
+    plain_body, html_body = _extract_parts_nonmultipart(email_message, uid, folder_label)
+    attachments = (
+        [_attachment_info(email_message)]
+        if email_message.get_content_disposition() == "attachment"
+        else []
+    )
+    return plain_body, html_body, attachments
 
 
 def _extract_parts_multipart(
     email_message: EmailMessage, uid: str, folder_label: str
-) -> tuple[str, str]:
-    """Extract plain-text and HTML parts from a multipart EmailMessage.
+) -> tuple[str, str, list[tuple[str, int]]]:
+    """Extract plain-text and HTML parts and attachment facts from a multipart EmailMessage.
+
+    Parts are classified by content type and disposition before anything is decoded. Only the
+    first non-attachment text/plain and text/html parts are decoded; attachments are described
+    from their headers and encoded payload length, and every other part is skipped. Attachments
+    are not descended into, so the parts of an attached message are neither counted as
+    attachments nor taken as the body, see `_iter_leaf_parts`.
 
     Args:
         email_message: The EmailMessage object to inspect.
@@ -152,27 +930,71 @@ def _extract_parts_multipart(
         folder_label: Folder label (e.g., 'inbox').
 
     Returns:
-        A tuple containing the plain-text and html parts of the EmailMessage.
+        A tuple containing the plain-text and html parts of the EmailMessage, and the MIME type
+        and encoded size of each attachment.
     """
     plain_body = ""
     html_body = ""
-    for part in email_message.walk():
-        if part.get_content_maintype() == "multipart":
+    attachments: list[tuple[str, int]] = []
+    for part in _iter_leaf_parts(email_message):
+        if part.get_content_disposition() == "attachment":
+            attachments.append(_attachment_info(part))
             continue
         ctype = part.get_content_type()
+        wanted = (ctype == "text/plain" and not plain_body) or (
+            ctype == "text/html" and not html_body
+        )
+        if not wanted:
+            continue
         try:
             content = _safe_get_content(part, uid, folder_label)
         except KeyError:
             continue
-        if isinstance(content, str):
-            content = content.strip()
-        else:
+        if not isinstance(content, str):
             continue
-        if ctype == "text/plain" and not plain_body:
-            plain_body = content
-        elif ctype == "text/html" and not html_body:
-            html_body = content
-    return plain_body, html_body
+        if ctype == "text/plain":
+            plain_body = content.strip()
+        else:
+            html_body = content.strip()
+    return plain_body, html_body, attachments
+
+
+def _iter_leaf_parts(part: EmailMessage) -> collections.abc.Iterator[EmailMessage]:
+    """Yield the non-container parts of a message in `walk` order, without entering attachments.
+
+    Unlike `EmailMessage.walk`, a part with an attachment disposition is yielded whole, so an
+    attached message (message/rfc822) is one part and its own parts are skipped. Inline
+    attached messages are still descended into, like multipart containers.
+
+    Args:
+        part: The message, or one of its parts.
+
+    Yields:
+        The leaf parts, and attachment parts, in order of appearance.
+    """
+    if part.get_content_disposition() == "attachment" or not part.is_multipart():
+        yield part
+        return
+    for child in typing.cast("list[EmailMessage]", part.get_payload()):
+        yield from _iter_leaf_parts(child)
+
+
+def _attachment_info(part: EmailMessage) -> tuple[str, int]:
+    """Describe an attachment part without decoding its payload.
+
+    Args:
+        part: The attachment part.
+
+    Returns:
+        The MIME type of the part and the length of its encoded payload. Attached messages,
+        whose payload is already parsed, report a size of zero. Placeholder parts report the
+        size recorded in their `PLACEHOLDER_SIZE_HEADER`.
+    """
+    placeholder_size = str(part.get(PLACEHOLDER_SIZE_HEADER, "")).strip()
+    if placeholder_size.isdigit():
+        return part.get_content_type(), int(placeholder_size)
+    payload = part.get_payload()
+    return part.get_content_type(), len(payload) if isinstance(payload, str) else 0
 
 
 def _extract_parts_nonmultipart(
@@ -240,22 +1062,27 @@ def _safe_get_content(email_message: EmailMessage, uid: str, folder_label: str)
     return ""
 
 
-def _extract_unique_tag_data(html_body: str) -> tuple[TagData, ...]:
-    """Extract TagData describing each unique tag in the HTML.
+def analyse_html(html_body: str, *, include_text: bool = False) -> HtmlAnalysis:
+    """Parse an HTML body once and extract tag statistics, anchors and (optionally) text.
 
     Args:
         html_body: The email's HTML body.
+        include_text: If True, also extract the cleaned plain-text of the HTML.
 
     Returns:
-        A list containing TagData for each unique tag in the HTML.
+        An HtmlAnalysis holding everything extracted from the single parse.
     """
-    unique_html_tags: list[TagData] = []
-    tag_dict: dict[str, dict[str, typing.Any]] = {}
+    if not html_body:
+        return HtmlAnalysis()
 
     try:
         soup = bs4.BeautifulSoup(html_body, "html.parser")
     except bs4.exceptions.ParserRejectedMarkup:
         soup = bs4.BeautifulSoup(html_body, "html5lib")
+
+    tag_dict: dict[str, dict[str, typing.Any]] = {}
+    link_urls: list[str] = []
+    link_contexts: list[str] = []
     for tag in soup.find_all():
         if not isinstance(tag, bs4.Tag):
             continue
@@ -267,7 +1094,11 @@ def _extract_unique_tag_data(html_body: str) -> tuple[TagData, ...]:
             values = val if isinstance(val, (list | tuple)) else [val]
             for value in values:
                 attr_entry["values"][value] = attr_entry["values"].get(value, 0) + 1
+        if tag.name == "a" and "href" in tag.attrs:
+            link_urls.append(str(tag["href"]))
+            link_contexts.append(str(tag))
 
+    unique_html_tags: list[TagData] = []
     for tag_name, tag_info in tag_dict.items():
         unique_attributes: list[AttributeData] = []
         for attr_name, attr_info in tag_info["attributes"].items():
@@ -279,37 +1110,26 @@ def _extract_unique_tag_data(html_body: str) -> tuple[TagData, ...]:
             TagData(tag=tag_name, count=tag_info["count"], attributes=tuple(unique_attributes))
         )
 
-    return tuple(unique_html_tags)
+    return HtmlAnalysis(
+        unique_html_tags=tuple(unique_html_tags),
+        link_urls=tuple(link_urls),
+        link_contexts=tuple(link_contexts),
+        text=soup_to_text(soup) if include_text else "",
+    )
 
 
-def _extract_link_contexts(
-    plain_body: str, html_body: str
-) -> tuple[tuple[str, ...], tuple[str, ...]]:
-    """Find all links in HTML anchors and bare URLs.
+def _extract_plain_links(plain_body: str) -> tuple[list[str], list[str]]:
+    """Find all bare URLs in a plain-text body.
 
     Args:
         plain_body: The email's plain-text body.
-        html_body: The email's HTML body.
 
     Returns:
         A tuple containing the list of full URLs and the context of each URLs usage.
     """
     full_urls: list[str] = []
     contexts: list[str] = []
-
-    if html_body:
-        try:
-            soup = bs4.BeautifulSoup(html_body, "html.parser")
-        except bs4.exceptions.ParserRejectedMarkup:
-            soup = bs4.BeautifulSoup(html_body, "html5lib")
-        for a in soup.find_all("a", href=True):
-            if not isinstance(a, bs4.Tag):
-                continue
-            full_urls.append(str(a["href"]))
-            contexts.append(str(a))
-
-    url_regex = re.compile(r'(https?://[^\s"<>\]]+)', re.IGNORECASE)
-    for match in url_regex.finditer(plain_body):
+    for match in _URL_REGEX.finditer(plain_body):
         url = match.group(1)
         full_urls.append(url.rstrip("]>)},.;"))
         start, end = match.span(1)
@@ -317,40 +1137,136 @@ def _extract_link_contexts(
         prefix = plain_body[max(0, start - window) : start]
         suffix = plain_body[end : end + window]
         contexts.append(f"{prefix}…{suffix}")
+    return full_urls, contexts
+
+
+def read_email_dataframe(
+    path: pathlib.Path,
+    *,
+    columns: collections.abc.Sequence[str] | None = None,
+    filters: EmailFilters | None = None,
+) -> pd.DataFrame:
+    """Read selected columns and rows of a processed Parquet file into a DataFrame.
+
+    Only the requested columns are read and row groups are pruned through `filters` by the
+    Parquet reader, so targeted loads touch a fraction of the file. Filters may refer to columns
+    that are not selected.
+
+    Args:
+        path: Path to the Parquet file.
+        columns: Names of the EmailData fields to read. If None, reads every column.
+        filters: Row predicate pushed down to the Parquet reader, see `deserialize_email_data`.
 
-    return tuple(full_urls), tuple(contexts)
+    Returns:
+        A DataFrame with one row per matching email and one column per selected field.
+    """
+    email_dataframe: pd.DataFrame = pq.read_table(
+        path, columns=columns, filters=filters
+    ).to_pandas()
+    return email_dataframe
 
 
-def serialize_email_data(email_data_list: list[EmailData], path: pathlib.Path) -> None:
-    """Serialize a list of EmailData objects to a Parquet file.
+def serialize_email_data(
+    email_data_list: collections.abc.Iterable[EmailData] | EmailBatch,
+    path: pathlib.Path,
+    *,
+    row_group_size: int = 1024,
+) -> None:
+    """Serialize EmailData objects to a Parquet file, streaming them in bounded row groups.
 
     Args:
-        email_data_list: List of EmailData objects to serialize.
+        email_data_list: Iterable of EmailData objects to serialize, consumed lazily, or an
+            EmailBatch whose Arrow table is written directly.
         path: Path to the output Parquet file.
+        row_group_size: Maximum number of emails held in memory and written per row group.
     """
-    records = []
-    for email_data in email_data_list:
-        record = email_data.model_dump()
-        record["unique_html_tags"] = json.dumps(
-            [t.model_dump() for t in email_data.unique_html_tags]
-        )
-        record["link_domains"] = json.dumps(email_data.link_domains)
-        record["link_contexts"] = json.dumps(email_data.link_contexts)
-        records.append(record)
-    email_dataframe = pd.DataFrame(records)
-    email_dataframe.to_parquet(path, index=False)
+    with EmailDataWriter(path, row_group_size=row_group_size) as writer:
+        if isinstance(email_data_list, EmailBatch):
+            writer.write_batch(email_data_list)
+        else:
+            writer.write_all(email_data_list)
 
 
-def deserialize_email_data(path: pathlib.Path) -> list[EmailData]:
+def deserialize_email_data(
+    path: pathlib.Path,
+    *,
+    filters: EmailFilters | None = None,
+    validate: bool = False,
+) -> list[EmailData]:
     """Deserialize a Parquet file into a list of EmailData objects.
 
+    Files written with the native nested schema are converted from Arrow one column at a time
+    and, unless `validate` is set, EmailData is built through pydantic's trusted construction
+    path without re-validating every field. Files without a schema version use the legacy
+    layout where nested fields are stored as JSON strings and are always validated.
+
     Args:
         path: Path to the Parquet file.
+        filters: Row predicate pushed down to the Parquet reader, either a pyarrow compute
+            expression or DNF tuples such as `[("tag", "==", "inbox"), ("id", ">=", 100)]`.
+            Row groups whose statistics cannot match are never decoded.
+        validate: If True, strictly validate every row, even for files written with our schema.
 
     Returns:
         List of EmailData objects reconstructed from file.
     """
-    email_dataframe = pd.read_parquet(path)
+    table = pq.read_table(path, filters=filters)
+    if schema_version(table.schema) is None:
+        return _deserialize_legacy_email_data(table.to_pandas())
+    if validate:
+        return [EmailData.model_validate(row) for row in table.to_pylist()]
+
+    return EmailBatch(table).to_emails()
+
+
+def load_email_batch(
+    path: pathlib.Path,
+    *,
+    columns: collections.abc.Sequence[str] | None = None,
+    filters: EmailFilters | None = None,
+) -> EmailBatch:
+    """Load a processed Parquet file into a columnar EmailBatch without building EmailData.
+
+    Files written with the native nested schema are wrapped as-is, without copying the Arrow
+    buffers. Legacy JSON-string files are converted, and then always hold every column.
+
+    Args:
+        path: Path to the Parquet file.
+        columns: Names of the EmailData fields to read. If None, reads every column.
+        filters: Row predicate pushed down to the Parquet reader, see `deserialize_email_data`.
+
+    Returns:
+        An EmailBatch holding the selected rows and columns.
+    """
+    if schema_version(pq.read_schema(path)) is None:
+        return EmailBatch.from_emails(deserialize_email_data(path, filters=filters))
+    return EmailBatch(pq.read_table(path, columns=columns, filters=filters))
+
+
+def schema_version(schema: pa.Schema) -> int | None:
+    """Return the EmailData schema version a processed Parquet file was written with.
+
+    Files written with an older version lack the columns added since, see `SCHEMA_VERSION`.
+
+    Args:
+        schema: The Arrow schema of the file, e.g. from `pq.read_schema`.
+
+    Returns:
+        The schema version, or None for the legacy JSON-string layout.
+    """
+    version = (schema.metadata or {}).get(SCHEMA_VERSION_KEY)
+    return int(version) if version is not None else None
+
+
+def _deserialize_legacy_email_data(email_dataframe: pd.DataFrame) -> list[EmailData]:
+    """Rebuild EmailData from a DataFrame using the legacy JSON-string layout.
+
+    Args:
+        email_dataframe: DataFrame read from a legacy processed Parquet file.
+
+    Returns:
+        List of EmailData objects reconstructed from the DataFrame.
+    """
     results = []
     for _, row in email_dataframe.iterrows():
         tags = tuple(TagData.model_validate(t) for t in json.loads(row["unique_html_tags"]))
@@ -91,15 +91,16 @@ def run_labelling_session(email_path: Path | None, label_path: Path | None) -> N
     if not email_path or not label_path:
         error_message = "Please ensure both input paths are correctly defined."
         raise TypeError(error_message)
-    emails = deserialize_email_data(email_path)
     labels = _load_existing_labels(label_path)
+    labelled_ids = [int(email_id) for email_id in labels]
+    emails = deserialize_email_data(
+        email_path, filters=[("id", "not in", labelled_ids)] if labelled_ids else None
+    )
 
     logger.info("Loaded %s existing labels.", len(labels))
-    logger.info("%s emails remaining to label.", len(emails) - len(labels))
+    logger.info("%s emails remaining to label.", len(emails))
 
     for email in sorted(emails, key=lambda e: e.id):
-        if str(email.id) in labels:
-            continue
         if not _label_single_email(email, labels, label_path):
             break
 
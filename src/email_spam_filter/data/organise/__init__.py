@@ -8,6 +8,7 @@ Modules:
 from __future__ import annotations
 
 __all__ = (
+    "ARCHIVE_READERS",
     "DATASET_MODULES",
     "spamassassin",
     "trec",
@@ -19,3 +20,8 @@ DATASET_MODULES = {
     "TREC": trec.organise_trec_data,
     "SpamAssassin": spamassassin.organise_spamassassin_data,
 }
+
+ARCHIVE_READERS = {
+    "trec": trec.iter_trec_archives,
+    "spamassassin": spamassassin.iter_spamassassin_archives,
+}
@@ -6,8 +6,12 @@ Modules:
 
 from __future__ import annotations
 
-__all__ = ("organise_spamassassin_data",)
+__all__ = (
+    "iter_spamassassin_archives",
+    "organise_spamassassin_data",
+)
 
 from email_spam_filter.data.organise.spamassassin.functions import (
+    iter_spamassassin_archives,
     organise_spamassassin_data,
 )
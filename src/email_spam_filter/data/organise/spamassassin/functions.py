@@ -3,31 +3,56 @@
 from __future__ import annotations
 
 import logging
-import shutil
 import typing
 
 from email_spam_filter.common import paths
+from email_spam_filter.data.io.containers import PlacementMode
+from email_spam_filter.data.io.functions import (
+    find_tar_archives,
+    iter_tar_members,
+    place_raw_emails,
+    write_raw_emails,
+)
 
 if typing.TYPE_CHECKING:
+    import collections.abc
     import pathlib
 
 logger = logging.getLogger(__name__)
 
 
-def organise_spamassassin_data(
+def organise_spamassassin_data(  # noqa: PLR0913
     external_path: pathlib.Path | None = paths.SPAM_ASSASSIN_PATHS.external,
     raw_ham_path: pathlib.Path | None = paths.SPAM_ASSASSIN_PATHS.raw_ham,
     raw_spam_path: pathlib.Path | None = paths.SPAM_ASSASSIN_PATHS.raw_spam,
+    *,
+    packed: bool = False,
+    placement: PlacementMode = PlacementMode.COPY,
+    workers: int = 8,
 ) -> None:
-    """Reads the SpamAssassin external folders and copies each file into a ham or spam folder.
+    """Reads the SpamAssassin external folders and places each file into a ham or spam folder.
+
+    Ids are assigned from the sorted directory listing, so every run maps each source file to
+    the same destination, and files already placed by a previous run are skipped.
+
+    If `external_path` is, or contains, the SpamAssassin tar archives as downloaded (e.g.
+    `20030228_spam.tar.bz2`), the emails are streamed straight out of the archives instead,
+    without extracting them first, and any other entries are ignored. See
+    `iter_spamassassin_archives`.
 
     Args:
-        external_path: Path to the external sourced raw Spam Assassin dataset.
+        external_path: Path to the external sourced raw Spam Assassin dataset, or to one of its
+            tar archives.
             (Default: `paths.SPAM_ASSASSIN_PATHS.raw_external`)
         raw_ham_path: Path to the folder where the ham .eml files will be stored.
             (Default: `paths.SPAM_ASSASSIN_PATHS.raw_ham`)
         raw_spam_path: Path to the folder where the spam .eml files will be stored.
             (Default: `paths.SPAM_ASSASSIN_PATHS.raw_spam`)
+        packed: If True, the ham and spam folders are written as packed RawEmailStores keyed by
+            the .eml file stem, instead of holding one .eml file per email.
+        placement: How each file is placed into the ham or spam folder, see `place_file`.
+            Every mode but COPY takes no extra disk space. Ignored when `packed` is True.
+        workers: Number of threads placing files, see `place_files`.
     """
     if not (external_path and raw_ham_path and raw_spam_path):
         error_message = "All arguments must be valid pathlib.Path instances (not None)."
@@ -39,6 +64,17 @@ def organise_spamassassin_data(
     raw_spam_path.mkdir(parents=True, exist_ok=True)
 
     logger.info("Organising data...")
+    archives = find_tar_archives(external_path)
+    if archives:
+        folders = {"ham": raw_ham_path, "spam": raw_spam_path}
+        emails = (
+            (folders[uid.split("_", 1)[1]] / f"{uid}.eml", raw_bytes)
+            for uid, raw_bytes, _ in iter_spamassassin_archives(archives)
+        )
+        write_raw_emails(emails, packed=packed)
+        logger.info("SpamAssassin data organisation complete.")
+        return
+
     if not external_path.is_dir():
         error_message = (
             f"SpamAssassin data not found at {external_path!r}. "
@@ -47,13 +83,38 @@ def organise_spamassassin_data(
         )
         raise FileNotFoundError(error_message)
 
-    missing_files: list[pathlib.Path] = []
-    ham_uid: int = 0
-    spam_uid: int = 0
+    plan, missing_files = _plan_spamassassin_placement(external_path, raw_ham_path, raw_spam_path)
+    place_raw_emails(plan, packed=packed, placement=placement, workers=workers)
+
+    if missing_files:
+        logger.warning(
+            "Skipped %d invalid or missing files. Change logger level to DEBUG to view details.",
+            len(missing_files),
+        )
+
+    logger.info("SpamAssassin data organisation complete.")
+
+
+def _plan_spamassassin_placement(
+    external_path: pathlib.Path, raw_ham_path: pathlib.Path, raw_spam_path: pathlib.Path
+) -> tuple[list[tuple[pathlib.Path, pathlib.Path]], list[pathlib.Path]]:
+    """Assign every SpamAssassin file its destination path, in sorted directory order.
+
+    Args:
+        external_path: Path to the external sourced raw Spam Assassin dataset.
+        raw_ham_path: Path to the folder where the ham .eml files will be stored.
+        raw_spam_path: Path to the folder where the spam .eml files will be stored.
 
+    Returns:
+        The (source, destination) pairs of the files to place, and the skipped entries.
+    """
+    folders = {"ham": raw_ham_path, "spam": raw_spam_path}
+    counts = dict.fromkeys(folders, 0)
+    plan: list[tuple[pathlib.Path, pathlib.Path]] = []
+    missing_files: list[pathlib.Path] = []
     for subdir in sorted(external_path.iterdir()):
         subdir_name = subdir.name.lower()
-        if not subdir.is_dir() or not any(tag in subdir_name for tag in ("ham", "spam")):
+        if not subdir.is_dir() or not any(tag in subdir_name for tag in folders):
             error_message = f"Incorrect folder '{subdir.name}' in SpamAssassin external data."
             raise FileNotFoundError(error_message)
 
@@ -63,22 +124,37 @@ def organise_spamassassin_data(
                 missing_files.append(src)
                 logger.debug("[!] Skipping invalid or non-file entry: %s", src)
                 continue
-            if label == "ham":
-                ham_uid += 1
-                dest = raw_ham_path / f"{ham_uid}_ham.eml"
-            elif label == "spam":
-                spam_uid += 1
-                dest = raw_spam_path / f"{spam_uid}_spam.eml"
-            else:
-                missing_files.append(src)
-                logger.debug("[!] Unrecognised label for data file: %s", src)
+            counts[label] += 1
+            plan.append((src, folders[label] / f"{counts[label]}_{label}.eml"))
+    return plan, missing_files
 
-            shutil.copy(str(src), str(dest))
 
-    if missing_files:
-        logger.warning(
-            "Skipped %d invalid or missing files. Change logger level to DEBUG to view details.",
-            len(missing_files),
-        )
+def iter_spamassassin_archives(
+    archive_paths: collections.abc.Sequence[pathlib.Path],
+) -> collections.abc.Iterator[tuple[str, bytes, str]]:
+    """Stream the labelled emails of the SpamAssassin dataset straight out of its tar archives.
 
-    logger.info("SpamAssassin data organisation complete.")
+    Each email is labelled from the top-level folder it is stored under in its archive (e.g.
+    `easy_ham/` or `spam_2/`). Nothing is extracted to disk. Ids are assigned in archive order,
+    so they are stable for a given set of archives but differ from the ids
+    `organise_spamassassin_data` assigns to the extracted dataset.
+
+    Args:
+        archive_paths: The SpamAssassin tar archives, read in the given order.
+
+    Yields:
+        Tuples of (uid in form `{uid}_{tag}`, raw RFC822 bytes, folder label such as
+        "spamassassin_ham"), ready for `parse_raw_messages`.
+    """
+    counts = {"ham": 0, "spam": 0}
+    for archive_path in archive_paths:
+        for name, raw_bytes in iter_tar_members(archive_path):
+            folder_name = name.split("/", 1)[0]
+            if "/" not in name or not any(tag in folder_name.lower() for tag in counts):
+                error_message = (
+                    f"Incorrect folder '{folder_name}' in SpamAssassin archive {archive_path.name}."
+                )
+                raise FileNotFoundError(error_message)
+            label = "spam" if "spam" in folder_name.lower() else "ham"
+            counts[label] += 1
+            yield f"{counts[label]}_{label}", raw_bytes, f"spamassassin_{label}"
@@ -6,8 +6,12 @@ Modules:
 
 from __future__ import annotations
 
-__all__ = ("organise_trec_data",)
+__all__ = (
+    "iter_trec_archives",
+    "organise_trec_data",
+)
 
 from email_spam_filter.data.organise.trec.functions import (
+    iter_trec_archives,
     organise_trec_data,
 )
@@ -2,32 +2,57 @@
 
 from __future__ import annotations
 
+import contextlib
 import logging
-import shutil
+import posixpath
 import typing
 
 from email_spam_filter.common import paths
+from email_spam_filter.data.io.containers import PlacementMode
+from email_spam_filter.data.io.functions import (
+    find_tar_archives,
+    iter_tar_members,
+    place_raw_emails,
+    write_raw_emails,
+)
 
 if typing.TYPE_CHECKING:
+    import collections.abc
     import pathlib
 
 logger = logging.getLogger(__name__)
 
 
-def organise_trec_data(
+def organise_trec_data(  # noqa: PLR0913
     external_path: pathlib.Path | None = paths.TREC_PATHS.external,
     raw_ham_path: pathlib.Path | None = paths.TREC_PATHS.raw_ham,
     raw_spam_path: pathlib.Path | None = paths.TREC_PATHS.raw_spam,
+    *,
+    packed: bool = False,
+    placement: PlacementMode = PlacementMode.COPY,
+    workers: int = 8,
 ) -> None:
-    """Reads the TREC index and copies each file into a ham or spam folder.
+    """Reads the TREC index and places each file into a ham or spam folder.
+
+    Ids are assigned from the order of the index, so every run maps each source file to the
+    same destination, and files already placed by a previous run are skipped.
+
+    If `external_path` holds no `full/index` file but is, or contains, the TREC tar archive
+    (e.g. `trec07p.tgz`), the emails are streamed straight out of the archive instead, without
+    extracting it first. See `iter_trec_archives`.
 
     Args:
-        external_path: Path to the external sourced TREC dataset.
+        external_path: Path to the external sourced TREC dataset, or to its tar archive.
             (Default: `paths.TREC_PATHS.raw_external`)
         raw_ham_path: Path to the folder where the ham .eml files will be stored.
             (Default: `paths.TREC_PATHS.raw_ham`)
         raw_spam_path: Path to the folder where the spam .eml files will be stored.
             (Default: `paths.TREC_PATHS.raw_spam`)
+        packed: If True, the ham and spam folders are written as packed RawEmailStores keyed by
+            the .eml file stem, instead of holding one .eml file per email.
+        placement: How each file is placed into the ham or spam folder, see `place_file`.
+            Every mode but COPY takes no extra disk space. Ignored when `packed` is True.
+        workers: Number of threads placing files, see `place_files`.
     """
     if not (external_path and raw_ham_path and raw_spam_path):
         error_message = "All arguments must be valid pathlib.Path instances (not None)."
@@ -40,44 +65,147 @@ def organise_trec_data(
 
     logger.info("Organising data...")
     index_path = external_path / "full" / "index"
+    archives = [] if index_path.is_file() else find_tar_archives(external_path)
+    if archives:
+        folders = {"ham": raw_ham_path, "spam": raw_spam_path}
+        emails = (
+            (folders[uid.split("_", 1)[1]] / f"{uid}.eml", raw_bytes)
+            for uid, raw_bytes, _ in iter_trec_archives(archives)
+        )
+        write_raw_emails(emails, packed=packed)
+        logger.info("TREC data organisation complete.")
+        return
+
     if not index_path.is_file():
         error_message = (
             f"Index file not found at {index_path!r}. Please verify that the TREC "
             "dataset was unzipped correctly, the directory names are accurate, and a 'full' folder "
-            "containing an 'index' file exists. You can download the correct data from: https://plg.uwaterloo.ca/cgi-bin/cgiwrap/gvcormac/foo"
+            "containing an 'index' file exists, or place the TREC .tgz archive there as "
+            "downloaded. You can download the correct data from: https://plg.uwaterloo.ca/cgi-bin/cgiwrap/gvcormac/foo"
         )
         raise FileNotFoundError(error_message)
 
-    missing_files: list[pathlib.Path] = []
-    ham_uid: int = 0
-    spam_uid: int = 0
+    plan, missing_files = _plan_trec_placement(index_path, raw_ham_path, raw_spam_path)
+    place_raw_emails(plan, packed=packed, placement=placement, workers=workers)
+
+    if missing_files:
+        logger.warning(
+            "Skipped %d invalid or missing files. Change logger level to DEBUG to view details.",
+            len(missing_files),
+        )
 
+    logger.info("TREC data organisation complete.")
+
+
+def _plan_trec_placement(
+    index_path: pathlib.Path, raw_ham_path: pathlib.Path, raw_spam_path: pathlib.Path
+) -> tuple[list[tuple[pathlib.Path, pathlib.Path]], list[pathlib.Path]]:
+    """Assign every file listed in the TREC index its destination path, in index order.
+
+    Args:
+        index_path: Path to the `full/index` file of the TREC dataset.
+        raw_ham_path: Path to the folder where the ham .eml files will be stored.
+        raw_spam_path: Path to the folder where the spam .eml files will be stored.
+
+    Returns:
+        The (source, destination) pairs of the files to place, and the missing source files.
+    """
+    folders = {"ham": raw_ham_path, "spam": raw_spam_path}
+    counts = dict.fromkeys(folders, 0)
+    plan: list[tuple[pathlib.Path, pathlib.Path]] = []
+    missing_files: list[pathlib.Path] = []
     with index_path.open() as idx_file:
         for line in idx_file:
             label, rel_path = line.strip().split(maxsplit=1)
-            if label not in ("ham", "spam"):
+            if label not in folders:
                 error_message = f"Invalid tag {label} in index"
                 raise RuntimeError(error_message)
-            src = (external_path / "full" / rel_path).resolve()
+            src = (index_path.parent / rel_path).resolve()
             if not src.is_file():
                 missing_files.append(src)
                 logger.debug("[!] Data file missing: %s", src)
                 continue
-            if label == "ham":
-                ham_uid += 1
-                dest = raw_ham_path / f"{ham_uid}_ham.eml"
-            elif label == "spam":
-                spam_uid += 1
-                dest = raw_spam_path / f"{spam_uid}_spam.eml"
-            else:
-                missing_files.append(src)
-                logger.debug("[!] Unrecognised label for data file: %s", src)
-            shutil.copy(str(src), str(dest))
+            counts[label] += 1
+            plan.append((src, folders[label] / f"{counts[label]}_{label}.eml"))
+    return plan, missing_files
 
-    if missing_files:
+
+def iter_trec_archives(
+    archive_paths: collections.abc.Sequence[pathlib.Path],
+) -> collections.abc.Iterator[tuple[str, bytes, str]]:
+    """Stream the labelled emails of the TREC dataset straight out of its tar archives.
+
+    The archives are scanned for the `full/index` member first, which is usually near the
+    start, then streamed once more to read the emails it lists. Nothing is extracted to disk.
+    Ids are assigned from the order of the index, matching `organise_trec_data` on the
+    extracted dataset as long as no listed file is missing.
+
+    Args:
+        archive_paths: The TREC tar archive, or all parts of it if it was split.
+
+    Yields:
+        Tuples of (uid in form `{uid}_{tag}`, raw RFC822 bytes, folder label such as
+        "trec_ham") in archive order, ready for `parse_raw_messages`.
+    """
+    index_name, index_bytes = _read_trec_archive_index(archive_paths)
+    members = _plan_trec_members(index_name, index_bytes.decode().splitlines())
+    for archive_path in archive_paths:
+        for name, raw_bytes in iter_tar_members(archive_path):
+            uid = members.pop(name, None)
+            if uid is not None:
+                yield uid, raw_bytes, f"trec_{uid.split('_', 1)[1]}"
+
+    for name in members:
+        logger.debug("[!] Data file missing from archive: %s", name)
+    if members:
         logger.warning(
             "Skipped %d invalid or missing files. Change logger level to DEBUG to view details.",
-            len(missing_files),
+            len(members),
         )
 
-    logger.info("TREC data organisation complete.")
+
+def _read_trec_archive_index(
+    archive_paths: collections.abc.Sequence[pathlib.Path],
+) -> tuple[str, bytes]:
+    """Find the `full/index` member of the TREC tar archives.
+
+    Args:
+        archive_paths: The TREC tar archives.
+
+    Returns:
+        The member name of the index and its contents.
+    """
+    for archive_path in archive_paths:
+        with contextlib.closing(iter_tar_members(archive_path)) as members:
+            for name, raw_bytes in members:
+                if name == "full/index" or name.endswith("/full/index"):
+                    return name, raw_bytes
+    error_message = (
+        f"Index file not found in {[str(p) for p in archive_paths]}. Please verify that the "
+        "archive is the TREC dataset and contains a 'full/index' file. You can download the "
+        "correct data from: https://plg.uwaterloo.ca/cgi-bin/cgiwrap/gvcormac/foo"
+    )
+    raise FileNotFoundError(error_message)
+
+
+def _plan_trec_members(index_name: str, index_lines: list[str]) -> dict[str, str]:
+    """Assign every archive member listed in the TREC index its uid, in index order.
+
+    Args:
+        index_name: Member name of the index, which its relative paths are resolved against.
+        index_lines: Lines of the index.
+
+    Returns:
+        Mapping of archive member name to uid in form `{uid}_{tag}`.
+    """
+    counts = {"ham": 0, "spam": 0}
+    members = {}
+    for line in index_lines:
+        label, rel_path = line.strip().split(maxsplit=1)
+        if label not in counts:
+            error_message = f"Invalid tag {label} in index"
+            raise RuntimeError(error_message)
+        counts[label] += 1
+        name = posixpath.normpath(posixpath.join(posixpath.dirname(index_name), rel_path))
+        members[name] = f"{counts[label]}_{label}"
+    return members
@@ -7,12 +7,20 @@ Modules:
 
 from __future__ import annotations
 
-__all__ = ("ModelPipeline", "split_labelled_and_inbox", "to_features")
+__all__ = (
+    "TRAINING_COLUMNS",
+    "ModelPipeline",
+    "select_cluster_representatives",
+    "split_labelled_and_inbox",
+    "to_features",
+)
 
 from email_spam_filter.ml.common.containers import (
     ModelPipeline,
 )
 from email_spam_filter.ml.common.functions import (
+    TRAINING_COLUMNS,
+    select_cluster_representatives,
     split_labelled_and_inbox,
     to_features,
 )
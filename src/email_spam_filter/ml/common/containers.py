@@ -5,11 +5,13 @@ from __future__ import annotations
 import logging
 import typing
 
+from email_spam_filter.ml.common.functions import select_cluster_representatives
+
 if typing.TYPE_CHECKING:
     import pandas as pd
     from sklearn.pipeline import Pipeline
 
-    from email_spam_filter.common.containers import EmailData
+    from email_spam_filter.common.containers import EmailBatch, EmailData
 
 
 class ModelPipeline:
@@ -19,15 +21,18 @@ class ModelPipeline:
         self,
         name: str,
         model: typing.Callable[[], Pipeline],
-        training_model: typing.Callable[[Pipeline, list[EmailData], logging.Logger], Pipeline],
-        prediction_model: typing.Callable[[list[EmailData], Pipeline], pd.DataFrame],
+        training_model: typing.Callable[
+            [Pipeline, list[EmailData] | EmailBatch, logging.Logger, list[int] | None], Pipeline
+        ],
+        prediction_model: typing.Callable[[list[EmailData] | EmailBatch, Pipeline], pd.DataFrame],
     ) -> None:
         """Initialize a ModelPipeline instance.
 
         Args:
             name: A human-readable name for the model.
             model: A function that constructs and returns an untrained pipeline.
-            training_model: A function that accepts EmailData, a logger and a pipeline to train.
+            training_model: A function that accepts a pipeline to train, EmailData, a logger and
+                optional per-email sample weights.
             prediction_model: A function that performs prediction using the trained pipeline.
         """
         self.name = name
@@ -53,14 +58,27 @@ class ModelPipeline:
         props[classifier_name]["feature_names_out"] = feature_names
         return props
 
-    def train(self, emails: list[EmailData]) -> ModelPipeline:
-        """Train the model and store the fitted pipeline."""
+    def train(
+        self, emails: list[EmailData] | EmailBatch, *, deduplicate: bool = False
+    ) -> ModelPipeline:
+        """Train the model and store the fitted pipeline.
+
+        Args:
+            emails: The labelled emails to train on, as a list or an EmailBatch holding at least
+                the `TRAINING_COLUMNS`.
+            deduplicate: If True, train on one representative per duplicate cluster and label,
+                weighted by the cluster size, see `select_cluster_representatives`. Requires
+                the emails to have been deduplicated, otherwise every email is kept.
+        """
         logger = logging.getLogger(__name__)
-        self.model = self._train(self.model, emails, logger)
+        sample_weight = None
+        if deduplicate:
+            emails, sample_weight = select_cluster_representatives(emails)
+        self.model = self._train(self.model, emails, logger, sample_weight)
         self._is_trained = True
         return self
 
-    def predict(self, emails: list[EmailData]) -> pd.DataFrame:
+    def predict(self, emails: list[EmailData] | EmailBatch) -> pd.DataFrame:
         """Run prediction on a list of emails using the trained model."""
         if not self._is_trained:
             error_message = "Model has not been trained yet. Call `train()` first."
@@ -6,6 +6,9 @@ import logging
 import typing
 
 import pandas as pd
+import pyarrow.compute as pc
+
+from email_spam_filter.common.containers import EmailBatch
 
 if typing.TYPE_CHECKING:
     from email_spam_filter.common.containers import EmailData
@@ -13,52 +16,137 @@ if typing.TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-def to_features(emails: list[EmailData]) -> tuple[pd.DataFrame, pd.Series[int]]:
-    """Convert a list of EmailData into feature DataFrame and label Series.
+_FEATURE_COLUMNS: typing.Final[tuple[str, ...]] = (
+    "id",
+    "tag",
+    "source",
+    "subject",
+    "body",
+    "from_addr",
+    "n_links",
+    "n_dupe_links",
+    "n_rcpts",
+    "has_attach",
+    "auth_fail",
+    "unique_html_tags",
+)
+TRAINING_COLUMNS: typing.Final[tuple[str, ...]] = (*_FEATURE_COLUMNS, "cluster_id")
+"""Columns a model needs to train and predict, to load with `load_email_batch(columns=...)`."""
+_LABELLED_TAGS: typing.Final[tuple[str, ...]] = ("spam", "ham")
+
+
+def to_features(emails: list[EmailData] | EmailBatch) -> tuple[pd.DataFrame, pd.Series[int]]:
+    """Convert emails into feature DataFrame and label Series.
 
     Args:
-        emails: A list of EmailData instances.
+        emails: A list of EmailData instances, or an EmailBatch which is converted column by
+            column without building per-email objects.
 
     Returns:
         A tuple with the created feature dataframe and label series. (X, y)
     """
-    records: list[dict[str, typing.Any]] = [
-        {
-            "id": email.id,
-            "tag": email.tag,
-            "source": email.source,
-            "subject": email.subject,
-            "body": email.body,
-            "from_addr": email.from_addr,
-            "n_links": email.n_links,
-            "n_dupe_links": email.n_dupe_links,
-            "n_rcpts": email.n_rcpts,
-            "has_attach": email.has_attach,
-            "auth_fail": email.auth_fail,
-            "unique_html_tags": email.unique_html_tags,
-        }
-        for email in emails
-    ]
-    dataframe = pd.DataFrame.from_records(records)
+    if isinstance(emails, EmailBatch):
+        dataframe = pd.DataFrame({name: emails.column(name) for name in _FEATURE_COLUMNS})
+    else:
+        records: list[dict[str, typing.Any]] = [
+            {name: getattr(email, name) for name in _FEATURE_COLUMNS} for email in emails
+        ]
+        dataframe = pd.DataFrame.from_records(records)
     labels = (dataframe["tag"] == "spam").astype(int)
     return dataframe, labels
 
 
-def split_labelled_and_inbox(emails: list[EmailData]) -> tuple[list[EmailData], list[EmailData]]:
+@typing.overload
+def split_labelled_and_inbox(emails: EmailBatch) -> tuple[EmailBatch, EmailBatch]: ...
+
+
+@typing.overload
+def split_labelled_and_inbox(
+    emails: list[EmailData],
+) -> tuple[list[EmailData], list[EmailData]]: ...
+
+
+def split_labelled_and_inbox(
+    emails: list[EmailData] | EmailBatch,
+) -> tuple[list[EmailData], list[EmailData]] | tuple[EmailBatch, EmailBatch]:
     """Split emails into labelled (spam/ham) and unlabelled (inbox) subsets.
 
     Args:
-        emails: List of EmailData instances.
+        emails: List of EmailData instances, or an EmailBatch e.g. loaded with only the
+            `TRAINING_COLUMNS`, which is split without building per-email objects.
 
     Returns:
         A tuple containing:
-        - List of emails labelled as 'spam' or 'ham'.
-        - List of emails labelled as 'inbox'.
+        - The emails labelled as 'spam' or 'ham'.
+        - The emails labelled as 'inbox'.
+        Both are EmailBatches if `emails` is one, otherwise lists.
     """
-    labelled = [e for e in emails if e.tag in ("spam", "ham")]
-    n_spam = sum(1 for e in labelled if e.tag == "spam")
-    n_ham = sum(1 for e in labelled if e.tag == "ham")
-    logger.info("Labelled dataset: %d spam, %d ham (total %d)", n_spam, n_ham, len(labelled))
+    if isinstance(emails, EmailBatch):
+        labelled_batch = emails.filter(pc.field("tag").isin(_LABELLED_TAGS))
+        inbox_batch = emails.filter(pc.field("tag") == "inbox")
+        _log_split(labelled_batch.column("tag"), len(inbox_batch))
+        return labelled_batch, inbox_batch
+    labelled = [e for e in emails if e.tag in _LABELLED_TAGS]
     inbox = [e for e in emails if e.tag == "inbox"]
-    logger.info("Inbox emails: %d", len(inbox))
+    _log_split([e.tag for e in labelled], len(inbox))
     return labelled, inbox
+
+
+def _log_split(labelled_tags: list[str], n_inbox: int) -> None:
+    """Log the size of the labelled and inbox subsets.
+
+    Args:
+        labelled_tags: The tag of every labelled email.
+        n_inbox: Number of inbox emails.
+    """
+    n_spam, n_ham = labelled_tags.count("spam"), labelled_tags.count("ham")
+    logger.info("Labelled dataset: %d spam, %d ham (total %d)", n_spam, n_ham, len(labelled_tags))
+    logger.info("Inbox emails: %d", n_inbox)
+
+
+@typing.overload
+def select_cluster_representatives(emails: EmailBatch) -> tuple[EmailBatch, list[int]]: ...
+
+
+@typing.overload
+def select_cluster_representatives(
+    emails: list[EmailData],
+) -> tuple[list[EmailData], list[int]]: ...
+
+
+def select_cluster_representatives(
+    emails: list[EmailData] | EmailBatch,
+) -> tuple[list[EmailData], list[int]] | tuple[EmailBatch, list[int]]:
+    """Keep one email per duplicate cluster and label, weighted by the number it stands for.
+
+    Emails of a cluster with different labels, e.g. a message filed as both ham and spam, are
+    kept once per label so the conflict stays visible to the model. Emails without a
+    `cluster_id` are their own cluster.
+
+    Args:
+        emails: Emails whose `cluster_id` was set by deduplication, as a list or EmailBatch.
+
+    Returns:
+        A tuple containing:
+        - The first email of every cluster and label, in input order, of the same type as
+          `emails`.
+        - The number of emails each representative stands for, to use as sample weights.
+    """
+    if isinstance(emails, EmailBatch):
+        cluster_ids, tags = emails.column("cluster_id"), emails.column("tag")
+    else:
+        cluster_ids, tags = [e.cluster_id for e in emails], [e.tag for e in emails]
+    positions: dict[tuple[int, str], int] = {}
+    indices: list[int] = []
+    weights: list[int] = []
+    for index, (cluster_id, tag) in enumerate(zip(cluster_ids, tags, strict=True)):
+        key = (cluster_id if cluster_id is not None else -1 - index, tag)
+        position = positions.setdefault(key, len(indices))
+        if position == len(indices):
+            indices.append(index)
+            weights.append(0)
+        weights[position] += 1
+    logger.info("Kept %d cluster representatives of %d emails.", len(indices), len(emails))
+    if isinstance(emails, EmailBatch):
+        return EmailBatch(emails.table.take(indices)), weights
+    return [emails[index] for index in indices], weights
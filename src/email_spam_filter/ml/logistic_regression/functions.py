@@ -13,21 +13,28 @@ if typing.TYPE_CHECKING:
 
     from sklearn.pipeline import Pipeline
 
-    from email_spam_filter.common.containers import EmailData, TagData
+    from email_spam_filter.common.containers import EmailBatch, EmailData, TagData
 
 
-def training_model(model: Pipeline, emails: list[EmailData], logger: Logger) -> Pipeline:
+def training_model(
+    model: Pipeline,
+    emails: list[EmailData] | EmailBatch,
+    logger: Logger,
+    sample_weight: list[int] | None = None,
+) -> Pipeline:
     """Train the provided scikit-learn pipeline on the labelled email data."""
     x, y = to_features(emails)
     logger.info("Training logistic regression model on %d samples.", len(emails))
-    return model.fit(x, y)
+    if sample_weight is None:
+        return model.fit(x, y)
+    return model.fit(x, y, classifier__sample_weight=sample_weight)
 
 
-def prediction_model(emails: list[EmailData], model: Pipeline) -> pd.DataFrame:
+def prediction_model(emails: list[EmailData] | EmailBatch, model: Pipeline) -> pd.DataFrame:
     """Run prediction on email data and return spam probabilities."""
     x, _ = to_features(emails)
     probabilities = model.predict_proba(x)[:, 1]
-    return pd.DataFrame({"id": [e.id for e in emails], "probability": probabilities})
+    return pd.DataFrame({"id": x["id"].tolist(), "probability": probabilities})
 
 
 def extract_html_features(html_series: list[tuple[TagData, ...]]) -> list[dict[str, int]]:
@@ -0,0 +1,23 @@
+"""Streaming classification of freshly fetched emails and server-side actions on the results.
+
+Modules:
+    functions: Pipelines for scoring new emails as they arrive and acting on the predictions.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "move_predicted_spam",
+    "run_scoring_daemon",
+    "score_folders",
+    "stream_predictions",
+    "watch_folder",
+)
+
+from email_spam_filter.scoring.functions import (
+    move_predicted_spam,
+    run_scoring_daemon,
+    score_folders,
+    stream_predictions,
+    watch_folder,
+)
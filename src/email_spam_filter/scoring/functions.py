@@ -0,0 +1,551 @@
+"""Pipelines for scoring new emails as they arrive and acting on the predictions."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import functools
+import imaplib
+import logging
+import queue
+import threading
+import typing
+
+import pandas as pd
+
+from email_spam_filter.common.constants import FOLDER_MAP
+from email_spam_filter.data.collection.personal.containers import FolderSyncState
+from email_spam_filter.data.collection.personal.functions import (
+    async_connect_imap,
+    async_fetch_messages,
+    async_search_folder_uids,
+    connect_imap,
+    fetch_folder,
+    get_imap_password,
+    move_messages,
+    save_raw_email,
+    select_folder,
+)
+from email_spam_filter.data.io.containers import EmailDataWriter
+from email_spam_filter.data.io.functions import parse_email_bytes
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import pathlib
+
+    from email_spam_filter.common.containers import EmailData
+    from email_spam_filter.data.collection.personal.containers import AsyncIMAPClient
+    from email_spam_filter.ml.common import ModelPipeline
+
+logger = logging.getLogger(__name__)
+
+_END: typing.Final = object()
+"""Sentinel put on a stage's output queue once the stage has finished."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _StageError:
+    """An exception raised in a pipeline stage, passed downstream to be re-raised."""
+
+    error: BaseException
+
+
+def stream_predictions(  # noqa: PLR0913
+    messages: collections.abc.Iterable[tuple[str, bytes, str]],
+    model: ModelPipeline,
+    *,
+    batch_size: int = 32,
+    queue_size: int = 256,
+    raw_tap: collections.abc.Callable[[str, bytes, str], object] | None = None,
+    email_tap: collections.abc.Callable[[EmailData], object] | None = None,
+) -> collections.abc.Generator[pd.DataFrame, None, None]:
+    """Score raw messages as they arrive, without a round trip through files on disk.
+
+    Three stages run concurrently, connected by bounded queues: a fetch thread pulls messages
+    from `messages` (e.g. `fetch_folder`), a parse thread turns them into EmailData, and the
+    calling thread runs `model.predict` on micro-batches. A micro-batch is handed on once it
+    holds `batch_size` emails, or earlier as soon as no parsed message is waiting, so freshly
+    fetched mail is never held back to fill a batch.
+
+    Stopping the iteration early stops both threads. An exception raised by a stage, including
+    one from `messages` or a tap, is re-raised in the calling thread.
+
+    Args:
+        messages: Iterable of (uid, raw_bytes, label), consumed in the fetch thread.
+        model: A trained ModelPipeline.
+        batch_size: Maximum number of emails per `model.predict` call.
+        queue_size: Maximum number of fetched messages waiting to be parsed.
+        raw_tap: Optional side tap called with every (uid, raw_bytes, label) in the fetch
+            thread, e.g. `save_raw_email` to also persist the raw message.
+        email_tap: Optional side tap called with every parsed EmailData in the parse thread,
+            e.g. `EmailDataWriter.write` to also persist the processed email.
+
+    Yields:
+        One predictions DataFrame per micro-batch, with the `id` and `tag` of each email and its
+        spam `probability`.
+    """
+    if batch_size < 1:
+        error_message = f"batch_size must be positive, got {batch_size}."
+        raise ValueError(error_message)
+    stop = threading.Event()
+    raw_queue: queue.Queue[object] = queue.Queue(maxsize=queue_size)
+    batch_queue: queue.Queue[object] = queue.Queue(maxsize=max(1, queue_size // batch_size))
+
+    fetch = functools.partial(_fetch_stage, messages, raw_queue, stop, raw_tap=raw_tap)
+    parse = functools.partial(
+        _parse_stage, raw_queue, batch_queue, stop, batch_size=batch_size, email_tap=email_tap
+    )
+    threads = [
+        _start_stage(fetch, raw_queue, stop, name="fetch"),
+        _start_stage(parse, batch_queue, stop, name="parse"),
+    ]
+    try:
+        while (batch := batch_queue.get()) is not _END:
+            if isinstance(batch, _StageError):
+                raise batch.error
+            yield _predict_batch(model, typing.cast("list[EmailData]", batch))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def _fetch_stage(
+    messages: collections.abc.Iterable[tuple[str, bytes, str]],
+    output: queue.Queue[object],
+    stop: threading.Event,
+    *,
+    raw_tap: collections.abc.Callable[[str, bytes, str], object] | None,
+) -> None:
+    """Pull raw messages into the parse queue, passing each through the raw tap first.
+
+    Args:
+        messages: Iterable of (uid, raw_bytes, label).
+        output: Bounded queue of raw messages waiting to be parsed.
+        stop: Event set by the consumer to stop every stage.
+        raw_tap: Optional callable receiving every (uid, raw_bytes, label).
+    """
+    for message in messages:
+        if stop.is_set():
+            return
+        if raw_tap is not None:
+            raw_tap(*message)
+        _put(output, message, stop)
+
+
+def _parse_stage(
+    source: queue.Queue[object],
+    output: queue.Queue[object],
+    stop: threading.Event,
+    *,
+    batch_size: int,
+    email_tap: collections.abc.Callable[[EmailData], object] | None,
+) -> None:
+    """Parse raw messages into micro-batches of EmailData, until the fetch stage ends.
+
+    A batch is handed on when it is full or when no raw message is waiting to be parsed.
+    Messages that fail to parse are logged and skipped.
+
+    Args:
+        source: Queue of raw messages from the fetch stage.
+        output: Bounded queue of micro-batches waiting to be scored.
+        stop: Event set by the consumer to stop every stage.
+        batch_size: Maximum number of emails per micro-batch.
+        email_tap: Optional callable receiving every parsed EmailData.
+    """
+    batch: list[EmailData] = []
+    while (message := _get(source, stop)) is not _END:
+        if isinstance(message, _StageError):
+            raise message.error
+        uid, raw_bytes, label = typing.cast("tuple[str, bytes, str]", message)
+        try:
+            email_data = parse_email_bytes(raw_bytes, f"{uid}_{label}", f"{label}_personal")
+        except Exception:
+            logger.exception("Failed to parse email UID %s of '%s'. Skipping it.", uid, label)
+        else:
+            if email_tap is not None:
+                email_tap(email_data)
+            batch.append(email_data)
+        if batch and (len(batch) >= batch_size or source.empty()):
+            _put(output, batch, stop)
+            batch = []
+    if batch:
+        _put(output, batch, stop)
+
+
+def _start_stage(
+    work: collections.abc.Callable[[], None],
+    output: queue.Queue[object],
+    stop: threading.Event,
+    *,
+    name: str,
+) -> threading.Thread:
+    """Run a pipeline stage in a daemon thread that always ends its output with `_END`.
+
+    Args:
+        work: The stage's work, putting its results on `output`.
+        output: The stage's output queue.
+        stop: Event set by the consumer to stop every stage.
+        name: Short name of the stage, used in the thread name.
+
+    Returns:
+        The started thread.
+    """
+
+    def run() -> None:
+        try:
+            work()
+        except BaseException as error:  # noqa: BLE001
+            _put(output, _StageError(error), stop)
+        finally:
+            _put(output, _END, stop)
+
+    thread = threading.Thread(target=run, name=f"stream-predictions-{name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def _put(output: queue.Queue[object], item: object, stop: threading.Event) -> None:
+    """Put an item on a bounded queue, giving up once the pipeline is stopped.
+
+    Args:
+        output: The queue to put the item on.
+        item: The item to put.
+        stop: Event set by the consumer to stop every stage.
+    """
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+        return
+
+
+def _get(source: queue.Queue[object], stop: threading.Event) -> object:
+    """Take an item from a queue, returning `_END` once the pipeline is stopped.
+
+    Args:
+        source: The queue to take an item from.
+        stop: Event set by the consumer to stop every stage.
+
+    Returns:
+        The next item, or `_END`.
+    """
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _predict_batch(model: ModelPipeline, batch: list[EmailData]) -> pd.DataFrame:
+    """Score a micro-batch, adding each email's tag next to its id.
+
+    Args:
+        model: A trained ModelPipeline.
+        batch: The parsed emails to score.
+
+    Returns:
+        The predictions DataFrame of the batch.
+    """
+    predictions = model.predict(batch)
+    predictions.insert(1, "tag", [email_data.tag for email_data in batch])
+    return predictions
+
+
+def score_folders(  # noqa: PLR0913
+    model: ModelPipeline,
+    folders: collections.abc.Mapping[str, str] = FOLDER_MAP,
+    *,
+    limit: int | None = None,
+    batch_size: int = 32,
+    raw_path: pathlib.Path | None = None,
+    processed_path: pathlib.Path | None = None,
+    partial: bool = False,
+) -> pd.DataFrame:
+    """Fetch the most recent messages of IMAP folders and score them with a trained model.
+
+    Messages go straight from the IMAP connection through the parser into the model, see
+    `stream_predictions`. Nothing is written to disk unless a raw or processed path is given.
+
+    Args:
+        model: A trained ModelPipeline, kept loaded for the whole run.
+        folders: Mapping of IMAP folder name to short local label. (Default: `FOLDER_MAP`)
+        limit: Maximum number of messages to score per folder (most recent). If None, score all.
+        batch_size: Maximum number of emails per `model.predict` call.
+        raw_path: If given, every raw message is also saved under this directory, as by
+            `save_raw_email`.
+        processed_path: If given, every parsed email is also written to this Parquet file.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+
+    Returns:
+        The predictions of every scored email, with columns `id`, `tag` and `probability`.
+    """
+    imap = connect_imap(get_imap_password())
+    try:
+        with contextlib.ExitStack() as stack:
+            writer = (
+                stack.enter_context(EmailDataWriter(processed_path)) if processed_path else None
+            )
+            messages = (
+                message
+                for folder, label in folders.items()
+                for message in fetch_folder(imap, folder, label, limit, partial=partial)
+            )
+            predictions = []
+            for batch_predictions in stream_predictions(
+                messages,
+                model,
+                batch_size=batch_size,
+                raw_tap=functools.partial(save_raw_email, path=raw_path) if raw_path else None,
+                email_tap=writer.write if writer is not None else None,
+            ):
+                predictions.append(batch_predictions)
+                logger.info("Scored %d emails.", sum(len(p) for p in predictions))
+    finally:
+        imap.logout()
+    if not predictions:
+        return pd.DataFrame({"id": [], "tag": [], "probability": []})
+    return pd.concat(predictions, ignore_index=True)
+
+
+def move_predicted_spam(  # noqa: PLR0913
+    imap: imaplib.IMAP4,
+    predictions: pd.DataFrame,
+    destination: str,
+    *,
+    threshold: float = 0.9,
+    folders: collections.abc.Mapping[str, str] = FOLDER_MAP,
+    batch_size: int = 500,
+    dry_run: bool = False,
+) -> dict[str, list[int]]:
+    """Move the emails predicted to be spam into a spam folder on the IMAP server.
+
+    Emails are grouped by the folder they were fetched from, via their `tag`, and moved with a
+    few batched commands per folder, see `move_messages`. Emails already in the destination
+    folder are left alone.
+
+    Args:
+        imap: An authenticated IMAP4 or IMAP4_SSL client.
+        predictions: Predictions DataFrame with columns `id` (the message UID), `tag` (the
+            folder label) and `probability`, as returned by `score_folders`.
+        destination: The name of the IMAP folder to move spam to (e.g., 'Spam').
+        threshold: Minimum spam probability of the emails to move.
+        folders: Mapping of IMAP folder name to short local label. (Default: `FOLDER_MAP`)
+        batch_size: Maximum number of UIDs per command.
+        dry_run: If True, only log what would be moved and leave the server unchanged.
+
+    Returns:
+        Mapping of source folder name to the UIDs moved, or that would be moved on a dry run.
+    """
+    folder_by_label = {label: folder for folder, label in folders.items()}
+    spam = predictions[predictions["probability"] >= threshold]
+    moved = {}
+    for tag, group in spam.groupby("tag", sort=False):
+        folder = folder_by_label.get(str(tag))
+        if folder is None:
+            logger.warning("No IMAP folder has label '%s'. Not moving its emails.", tag)
+            continue
+        if folder == destination:
+            continue
+        uids = sorted(int(uid) for uid in group["id"])
+        if dry_run:
+            logger.info(
+                "Would move %d emails from '%s' to '%s': %s",
+                len(uids),
+                folder,
+                destination,
+                ", ".join(map(str, uids)),
+            )
+            moved[folder] = uids
+        elif select_folder(imap, folder, readonly=False) is not None:
+            moved[folder] = move_messages(imap, uids, destination, batch_size=batch_size)
+    return moved
+
+
+async def run_scoring_daemon(  # noqa: PLR0913
+    model: ModelPipeline,
+    folders: collections.abc.Mapping[str, str] = FOLDER_MAP,
+    *,
+    connect: collections.abc.Callable[[], collections.abc.Awaitable[AsyncIMAPClient]] | None = None,
+    on_predictions: collections.abc.Callable[[pd.DataFrame], object] | None = None,
+    idle_timeout: float = 25 * 60,
+    backoff: float = 1.0,
+    max_backoff: float = 300.0,
+    partial: bool = False,
+) -> None:
+    """Score new messages as soon as they arrive, until cancelled.
+
+    Every folder is watched over its own IMAP connection held in IDLE, see `watch_folder`, so
+    new mail is scored within moments of arriving instead of at the next batch run. The same
+    loaded model scores every folder. Run it with `asyncio.run`.
+
+    Args:
+        model: A trained ModelPipeline, kept loaded for the whole run.
+        folders: Mapping of IMAP folder name to short local label. (Default: `FOLDER_MAP`)
+        connect: Coroutine function returning a new, logged-in AsyncIMAPClient. If None,
+            connect to the configured IMAP server with the password from the keyring.
+        on_predictions: Callable receiving the predictions DataFrame of every group of newly
+            arrived emails, with columns `id`, `tag` and `probability`. If None, log them.
+        idle_timeout: Seconds after which IDLE is restarted even without new mail.
+        backoff: Seconds to wait before the first reconnection attempt.
+        max_backoff: Maximum seconds to wait between reconnection attempts.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+    """
+    if connect is None:
+        password = await asyncio.to_thread(get_imap_password)
+        connect = functools.partial(async_connect_imap, password)
+    async with asyncio.TaskGroup() as group:
+        for folder, label in folders.items():
+            group.create_task(
+                watch_folder(
+                    connect,
+                    folder,
+                    label,
+                    model,
+                    on_predictions=on_predictions or _log_predictions,
+                    idle_timeout=idle_timeout,
+                    backoff=backoff,
+                    max_backoff=max_backoff,
+                    partial=partial,
+                )
+            )
+
+
+async def watch_folder(  # noqa: PLR0913
+    connect: collections.abc.Callable[[], collections.abc.Awaitable[AsyncIMAPClient]],
+    folder: str,
+    label: str,
+    model: ModelPipeline,
+    *,
+    on_predictions: collections.abc.Callable[[pd.DataFrame], object],
+    idle_timeout: float = 25 * 60,
+    backoff: float = 1.0,
+    max_backoff: float = 300.0,
+    partial: bool = False,
+) -> None:
+    """Hold an IDLE connection on one folder and score every message that arrives, until cancelled.
+
+    Only messages above the highest UID seen when the folder is first selected are scored.
+    When the connection drops it is reopened with exponential backoff, and messages that
+    arrived in the meantime are scored on reconnection. If the folder's UIDVALIDITY changes,
+    scoring restarts from its newest message. Messages that fail to parse, and failures of
+    `on_predictions`, are logged and skipped without stopping the watch.
+
+    Args:
+        connect: Coroutine function returning a new, logged-in AsyncIMAPClient.
+        folder: The name of the IMAP folder to watch (e.g., 'INBOX').
+        label: A short label to attach to each message (e.g., 'inbox', 'spam').
+        model: A trained ModelPipeline.
+        on_predictions: Callable receiving the predictions DataFrame of every group of newly
+            arrived emails.
+        idle_timeout: Seconds after which IDLE is restarted even without new mail.
+        backoff: Seconds to wait before the first reconnection attempt.
+        max_backoff: Maximum seconds to wait between reconnection attempts.
+        partial: If True, skip attachment payloads, see `fetch_messages`.
+    """
+    state: FolderSyncState | None = None
+    delay = backoff
+    while True:
+        try:
+            async with await connect() as client:
+                uidvalidity = await client.select(folder)
+                if uidvalidity is None:
+                    logger.warning("Failed to find folder '%s'. Not watching it.", folder)
+                    return
+                delay = backoff
+                if state is None or state.uidvalidity != uidvalidity:
+                    uids = await async_search_folder_uids(client)
+                    state = FolderSyncState(
+                        uidvalidity=uidvalidity, last_uid=int(uids[-1]) if uids else 0
+                    )
+                logger.info("Watching folder '%s' from UID %d.", folder, state.last_uid)
+                while True:
+                    state = await _score_new_messages(
+                        client, label, model, state, on_predictions=on_predictions, partial=partial
+                    )
+                    await client.idle(idle_timeout)
+        except (imaplib.IMAP4.error, OSError, asyncio.IncompleteReadError) as error:
+            logger.warning(
+                "Lost connection watching '%s' (%s). Reconnecting in %.1fs.", folder, error, delay
+            )
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, max_backoff)
+
+
+async def _score_new_messages(  # noqa: PLR0913
+    client: AsyncIMAPClient,
+    label: str,
+    model: ModelPipeline,
+    state: FolderSyncState,
+    *,
+    on_predictions: collections.abc.Callable[[pd.DataFrame], object],
+    partial: bool,
+) -> FolderSyncState:
+    """Fetch and score the messages of the selected folder above the last seen UID.
+
+    Args:
+        client: A logged-in AsyncIMAPClient with the folder selected.
+        label: A short label to attach to each message.
+        model: A trained ModelPipeline.
+        state: The folder's UIDVALIDITY and highest UID already scored.
+        on_predictions: Callable receiving the predictions DataFrame of the new messages.
+        partial: If True, skip attachment payloads.
+
+    Returns:
+        The folder's state after scoring the new messages. It stops just below the first
+        message missing from the FETCH responses, so that it is fetched again.
+    """
+    uids = await async_search_folder_uids(client, state.last_uid)
+    if not uids:
+        return state
+    missing: list[bytes] = []
+    messages = [
+        message
+        async for message in async_fetch_messages(
+            client, uids, label, partial=partial, missing=missing
+        )
+    ]
+    predictions = await asyncio.to_thread(_parse_and_predict, model, messages)
+    if predictions is not None:
+        try:
+            on_predictions(predictions)
+        except Exception:
+            logger.exception("Failed to handle the predictions of %d emails.", len(predictions))
+    last_uid = int(missing[0]) - 1 if missing else int(uids[-1])
+    return state.model_copy(update={"last_uid": max(last_uid, state.last_uid)})
+
+
+def _parse_and_predict(
+    model: ModelPipeline, messages: list[tuple[str, bytes, str]]
+) -> pd.DataFrame | None:
+    """Parse raw messages and score them, skipping the ones that fail to parse.
+
+    Args:
+        model: A trained ModelPipeline.
+        messages: The fetched messages as (uid, raw_bytes, label).
+
+    Returns:
+        The predictions DataFrame, or None if no message could be parsed.
+    """
+    emails = []
+    for uid, raw_bytes, label in messages:
+        try:
+            emails.append(parse_email_bytes(raw_bytes, f"{uid}_{label}", f"{label}_personal"))
+        except Exception:
+            logger.exception("Failed to parse email UID %s of '%s'. Skipping it.", uid, label)
+    return _predict_batch(model, emails) if emails else None
+
+
+def _log_predictions(predictions: pd.DataFrame) -> None:
+    """Log the spam probability of every scored email.
+
+    Args:
+        predictions: The predictions DataFrame, with columns `id`, `tag` and `probability`.
+    """
+    for row in predictions.itertuples(index=False):
+        logger.info(
+            "Scored email %s (%s): spam probability %.3f.", row.id, row.tag, row.probability
+        )
@@ -0,0 +1,111 @@
+"""Tests for containers for the common module."""
+
+from __future__ import annotations
+
+import pyarrow.compute as pc
+import pytest
+
+from email_spam_filter.common.containers import (
+    AttributeData,
+    EmailBatch,
+    EmailData,
+    EmailView,
+    TagData,
+    ValueData,
+)
+
+
+def _make_email(idx: int, tag: str) -> EmailData:
+    return EmailData(
+        id=idx,
+        tag=tag,
+        source="test",
+        subject=f"Subject {idx}",
+        body="Plain text",
+        unique_html_tags=(
+            TagData(
+                tag="a",
+                count=2,
+                attributes=(
+                    AttributeData(
+                        attribute="href",
+                        count=2,
+                        values=(
+                            ValueData(value="https://example.com", count=1),
+                            ValueData(value=f"https://example.com/{idx}", count=1),
+                        ),
+                    ),
+                ),
+            ),
+            TagData(tag="br", count=idx, attributes=()),
+        ),
+        from_addr="example@example.com",
+        from_name="Tester",
+        n_links=2,
+        n_dupe_links=0,
+        link_domains=("example.com",),
+        link_contexts=("<a>one</a>", "<a>two</a>"),
+        n_rcpts=1,
+        has_attach=False,
+        auth_fail=idx % 2 == 0,
+    )
+
+
+@pytest.fixture
+def emails_fixture() -> list[EmailData]:
+    return [_make_email(1, "spam"), _make_email(2, "ham"), _make_email(3, "inbox")]
+
+
+class TestEmailBatch:
+    @staticmethod
+    def test_roundtrip(emails_fixture: list[EmailData]) -> None:
+        batch = EmailBatch.from_emails(emails_fixture)
+
+        assert len(batch) == 3
+        assert batch.to_emails() == emails_fixture
+        assert batch.column("link_contexts") == [e.link_contexts for e in emails_fixture]
+
+    @staticmethod
+    def test_view_quacks_like_email_data(emails_fixture: list[EmailData]) -> None:
+        batch = EmailBatch.from_emails(emails_fixture)
+        view = batch[-1]
+
+        assert isinstance(view, EmailView)
+        expected = emails_fixture[-1]
+        for name in EmailData.model_fields:
+            assert getattr(view, name) == getattr(expected, name)
+        assert view.to_email_data() == expected
+        assert [v.id for v in batch] == [1, 2, 3]
+        with pytest.raises(IndexError):
+            batch[3]
+
+    @staticmethod
+    def test_slice_and_filter(emails_fixture: list[EmailData]) -> None:
+        batch = EmailBatch.from_emails(emails_fixture)
+
+        assert batch[1:].to_emails() == emails_fixture[1:]
+        assert batch[1:][0].unique_html_tags == emails_fixture[1].unique_html_tags
+        labelled = batch.filter(pc.field("tag").isin(["spam", "ham"]))
+        assert [v.tag for v in labelled] == ["spam", "ham"]
+
+    @staticmethod
+    def test_projected_batch(emails_fixture: list[EmailData]) -> None:
+        batch = EmailBatch(EmailBatch.from_emails(emails_fixture).table.select(["id", "tag"]))
+
+        assert batch[0].tag == "spam"
+        with pytest.raises(AttributeError, match="no column 'body'"):
+            _ = batch[0].body
+
+    @staticmethod
+    def test_missing_defaulted_columns(emails_fixture: list[EmailData]) -> None:
+        table = EmailBatch.from_emails(emails_fixture).table
+        batch = EmailBatch(table.drop_columns(["n_attach", "attach_size", "attach_types"]))
+
+        assert batch[0].attach_types == ()
+        assert batch.to_emails() == emails_fixture
+
+    @staticmethod
+    def test_unknown_column(emails_fixture: list[EmailData]) -> None:
+        table = EmailBatch.from_emails(emails_fixture).table
+        with pytest.raises(ValueError, match="Unknown EmailBatch column"):
+            EmailBatch(table.rename_columns([*table.column_names[:-1], "other"]))
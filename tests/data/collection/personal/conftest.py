@@ -0,0 +1,502 @@
+"""Fake IMAP server fixtures for the personal data collection tests."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import email
+import email.message
+import imaplib
+import pathlib
+import re
+import socketserver
+import threading
+import typing
+import zlib
+
+import pytest
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import io
+    import types
+
+_TOKEN_REGEX = re.compile(r'"((?:[^"\\]|\\.)*)"|(\([^)]*\))|(\S+)')
+_FETCH_ITEM_REGEX = re.compile(r"[A-Z0-9.]+(?:\[[^\]]*\])?")
+
+
+class _DroppedConnectionError(Exception):
+    """Raised by a session to drop the client connection without a response."""
+
+
+@dataclasses.dataclass
+class FakeMailbox:
+    """An in-memory mailbox: messages keyed by UID, sequence numbers follow UID order."""
+
+    uidvalidity: int = 1
+    messages: dict[int, bytes] = dataclasses.field(default_factory=dict)
+    deleted: set[int] = dataclasses.field(default_factory=set)
+
+    def uids(self) -> list[int]:
+        return sorted(self.messages)
+
+
+class _FakeIMAPState:
+    """Mailboxes and command log shared by every connection to a fake server."""
+
+    def __init__(self) -> None:
+        self.mailboxes: dict[str, FakeMailbox] = {}
+        self.commands: list[str] = []
+        self.drop_on_fetch: set[int] = set()
+        self.omit_on_fetch: set[int] = set()
+        self.extensions = {"IDLE", "COMPRESS=DEFLATE", "MOVE", "UIDPLUS"}
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def add_mailbox(
+        self, name: str, messages: dict[int, bytes], *, uidvalidity: int = 1
+    ) -> FakeMailbox:
+        mailbox = FakeMailbox(uidvalidity=uidvalidity, messages=dict(messages))
+        self.mailboxes[name] = mailbox
+        return mailbox
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer, _FakeIMAPState):
+    """Minimal threaded IMAP4rev1 server covering the commands used by the collection code."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        socketserver.ThreadingTCPServer.__init__(self, ("127.0.0.1", 0), _FakeIMAPHandler)
+        _FakeIMAPState.__init__(self)
+
+    @property
+    def port(self) -> int:
+        return int(self.server_address[1])
+
+
+class FakeAsyncIMAPServer(_FakeIMAPState):
+    """The same fake IMAP server running on the current asyncio event loop."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._server: asyncio.Server | None = None
+        self._connections: list[_FakeAsyncConnection] = []
+        self.idling = asyncio.Event()
+
+    async def __aenter__(self) -> FakeAsyncIMAPServer:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        assert self._server is not None
+        self._server.close()
+        for connection in list(self._connections):
+            connection.writer.close()
+        await self._server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return int(self._server.sockets[0].getsockname()[1])
+
+    def deliver(self, name: str, uid: int, raw: bytes) -> None:
+        """Add a message to a mailbox and notify every client idling on it."""
+        mailbox = self.mailboxes[name]
+        mailbox.messages[uid] = raw
+        for connection in self._connections:
+            if connection.session.idle_tag is not None and connection.session.selected is mailbox:
+                connection.write(b"* %d EXISTS\r\n" % len(mailbox.messages))
+
+    def drop_connections(self) -> None:
+        """Close every client connection without a response, as a crashing server would."""
+        for connection in list(self._connections):
+            connection.writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _FakeAsyncConnection(self, reader, writer)
+        self._connections.append(connection)
+        connection.write(connection.session.flush())
+        try:
+            while line := await connection.readline():
+                keep_open = connection.session.handle_line(line)
+                connection.write(connection.session.flush())
+                await writer.drain()
+                if connection.session.idle_tag is not None:
+                    self.idling.set()
+                if not keep_open:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.remove(connection)
+            writer.close()
+
+
+class _FakeAsyncConnection:
+    """One client connection of the asyncio fake server, deflating it once COMPRESS succeeds."""
+
+    def __init__(
+        self,
+        server: FakeAsyncIMAPServer,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.session = _FakeIMAPSession(server)
+        self.compressor: zlib._Compress | None = None
+        self.decompressor: zlib._Decompress | None = None
+        self.inflated = b""
+
+    async def readline(self) -> bytes:
+        if self.decompressor is None:
+            return await self.reader.readline()
+        while b"\n" not in self.inflated:
+            chunk = await self.reader.read(4096)
+            if not chunk:
+                return b""
+            self.inflated += self.decompressor.decompress(chunk)
+        line, _, self.inflated = self.inflated.partition(b"\n")
+        return line + b"\n"
+
+    def write(self, data: bytes) -> None:
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.server.bytes_sent += len(data)
+        self.writer.write(data)
+        if self.session.compressing and self.compressor is None:
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+
+class _FakeIMAPHandler(socketserver.StreamRequestHandler):
+    server: FakeIMAPServer
+
+    def handle(self) -> None:
+        session = _FakeIMAPSession(self.server)
+        self.compressor: zlib._Compress | None = None
+        self.decompressor: zlib._Decompress | None = None
+        self.inflated = b""
+        self.write(session.flush())
+        while line := self.readline():
+            keep_open = session.handle_line(line)
+            self.write(session.flush())
+            if session.compressing and self.compressor is None:
+                self.compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+                self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            if not keep_open:
+                return
+
+    def readline(self) -> bytes:
+        if self.decompressor is None:
+            return self.rfile.readline()
+        while b"\n" not in self.inflated:
+            chunk = typing.cast("io.BufferedReader", self.rfile).read1(4096)
+            if not chunk:
+                return b""
+            self.inflated += self.decompressor.decompress(chunk)
+        line, _, self.inflated = self.inflated.partition(b"\n")
+        return line + b"\n"
+
+    def write(self, data: bytes) -> None:
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        with self.server.lock:
+            self.server.bytes_sent += len(data)
+        self.wfile.write(data)
+
+
+class _FakeIMAPSession:
+    """Transport-independent IMAP protocol state of a single client connection."""
+
+    def __init__(self, state: _FakeIMAPState) -> None:
+        self.state = state
+        self.selected: FakeMailbox | None = None
+        self.idle_tag: str | None = None
+        self.compressing = False
+        self.output: list[bytes] = []
+        self.read_only = True
+        self.send(b"* OK [CAPABILITY IMAP4rev1 IDLE] Fake IMAP ready")
+
+    def flush(self) -> bytes:
+        data = b"".join(self.output)
+        self.output.clear()
+        return data
+
+    def send(self, line: bytes) -> None:
+        self.output.append(line + b"\r\n")
+
+    def handle_line(self, line: bytes) -> bool:
+        """Handle one command line, returning False once the connection should close."""
+        if self.idle_tag is not None:
+            status = (
+                "OK IDLE terminated" if line.strip().upper() == b"DONE" else "BAD Expected DONE"
+            )
+            self.send(f"{self.idle_tag} {status}".encode())
+            self.idle_tag = None
+            return True
+        tag, _, rest = line.decode().rstrip("\r\n").partition(" ")
+        command, _, args = rest.partition(" ")
+        command = command.upper()
+        with self.state.lock:
+            self.state.commands.append(rest)
+        if command == "IDLE" and self.selected is not None:
+            self.idle_tag = tag
+            self.send(b"+ idling")
+            return True
+        try:
+            if command == "UID":
+                command, _, args = args.partition(" ")
+                handled = self.dispatch(f"UID {command.upper()}", args)
+            else:
+                handled = self.dispatch(command, args)
+        except _DroppedConnectionError:
+            self.output.clear()
+            return False
+        self.send(f"{tag} {handled}".encode())
+        return command != "LOGOUT"
+
+    def dispatch(self, command: str, args: str) -> str:  # noqa: PLR0911
+        tokens = [
+            next(group for group in match.groups() if group is not None)
+            for match in _TOKEN_REGEX.finditer(args)
+        ]
+        if command == "CAPABILITY":
+            extensions = " ".join(sorted(self.state.extensions))
+            self.send(f"* CAPABILITY IMAP4rev1 {extensions}".encode())
+            return "OK CAPABILITY completed"
+        if command == "COMPRESS":
+            if "COMPRESS=DEFLATE" not in self.state.extensions or tokens != ["DEFLATE"]:
+                return "BAD Unsupported compression"
+            self.compressing = True
+            return "OK DEFLATE active"
+        if command in {"LOGIN", "NOOP"}:
+            return f"OK {command} completed"
+        if command in {"SELECT", "EXAMINE"}:
+            return self.select(tokens[0], read_only=command == "EXAMINE")
+        if command == "LOGOUT":
+            self.send(b"* BYE Fake IMAP closing")
+            return "OK LOGOUT completed"
+        if self.selected is None:
+            return "BAD No mailbox selected"
+        if command in {"SEARCH", "UID SEARCH"}:
+            return self.search(tokens, by_uid=command.startswith("UID"))
+        if command in {"FETCH", "UID FETCH"}:
+            return self.fetch(tokens[0], tokens[1], by_uid=command.startswith("UID"))
+        return self.modify(command, tokens)
+
+    def modify(self, command: str, tokens: list[str]) -> str:  # noqa: PLR0911
+        """Handle the commands that change the selected mailbox, by UID only."""
+        assert self.selected is not None
+        mailbox = self.selected
+        required = {"UID MOVE": "MOVE", "UID EXPUNGE": "UIDPLUS"}.get(command)
+        if required is not None and required not in self.state.extensions:
+            return "BAD Unknown command"
+        if self.read_only:
+            return "NO Mailbox is read-only"
+        wanted = _expand_set(tokens[0], mailbox.uids()) if command.startswith("UID") else set()
+        if command in {"UID MOVE", "UID COPY"}:
+            target = self.state.mailboxes.get(tokens[1])
+            if target is None:
+                return "NO [TRYCREATE] Mailbox does not exist"
+            for uid in sorted(wanted):
+                target.messages[max(target.uids(), default=0) + 1] = mailbox.messages[uid]
+            if command == "UID MOVE":
+                self.expunge(wanted)
+            return f"OK {command.removeprefix('UID ')} completed"
+        if command == "UID STORE":
+            if tokens[1:] != ["+FLAGS.SILENT", "(\\Deleted)"]:
+                return "BAD Unsupported store"
+            mailbox.deleted |= wanted
+            return "OK STORE completed"
+        if command in {"EXPUNGE", "UID EXPUNGE"}:
+            self.expunge(mailbox.deleted & wanted if command == "UID EXPUNGE" else mailbox.deleted)
+            return "OK EXPUNGE completed"
+        return "BAD Unknown command"
+
+    def expunge(self, uids: set[int]) -> None:
+        assert self.selected is not None
+        for uid in sorted(uids, reverse=True):
+            self.send(b"* %d EXPUNGE" % (self.selected.uids().index(uid) + 1))
+            del self.selected.messages[uid]
+            self.selected.deleted.discard(uid)
+
+    def select(self, name: str, *, read_only: bool) -> str:
+        mailbox = self.state.mailboxes.get(name)
+        if mailbox is None:
+            self.selected = None
+            return "NO Mailbox does not exist"
+        self.selected = mailbox
+        self.read_only = read_only
+        uids = mailbox.uids()
+        self.send(b"* %d EXISTS" % len(uids))
+        self.send(b"* OK [UIDVALIDITY %d] UIDs valid" % mailbox.uidvalidity)
+        self.send(b"* OK [UIDNEXT %d] Predicted next UID" % ((uids[-1] if uids else 0) + 1))
+        mode = "READ-ONLY" if read_only else "READ-WRITE"
+        return f"OK [{mode}] SELECT completed"
+
+    def search(self, tokens: list[str], *, by_uid: bool) -> str:
+        assert self.selected is not None
+        uids = self.selected.uids()
+        if tokens[:1] == ["ALL"]:
+            matches = list(range(1, len(uids) + 1)) if not by_uid else uids
+        elif tokens[:1] == ["UID"]:
+            wanted = _expand_set(tokens[1], uids)
+            matches = [uid for uid in uids if uid in wanted]
+            if not by_uid:
+                matches = [uids.index(uid) + 1 for uid in matches]
+        else:
+            return "BAD Unsupported search"
+        self.send(b"* SEARCH " + " ".join(map(str, matches)).encode())
+        return "OK SEARCH completed"
+
+    def fetch(self, message_set: str, items: str, *, by_uid: bool) -> str:
+        assert self.selected is not None
+        uids = self.selected.uids()
+        if by_uid:
+            wanted = _expand_set(message_set, uids)
+            targets = [(seq, uid) for seq, uid in enumerate(uids, start=1) if uid in wanted]
+        else:
+            wanted = _expand_set(message_set, list(range(1, len(uids) + 1)))
+            targets = [(seq, uid) for seq, uid in enumerate(uids, start=1) if seq in wanted]
+        if any(uid in self.state.drop_on_fetch for _, uid in targets):
+            raise _DroppedConnectionError
+        requested = _FETCH_ITEM_REGEX.findall(items.upper())
+        if by_uid and "UID" not in requested:
+            requested.insert(0, "UID")
+        for seq, uid in targets:
+            if uid in self.state.omit_on_fetch:
+                continue
+            raw = self.selected.messages[uid]
+            fetched = b" ".join(_fetch_item(name, uid, raw) for name in requested)
+            self.output.append(b"* %d FETCH (%s)\r\n" % (seq, fetched))
+        return "OK FETCH completed"
+
+
+def _fetch_item(name: str, uid: int, raw: bytes) -> bytes:
+    """Render one FETCH data item of a message, e.g. `UID 5` or `BODY[1] {<n>}<literal>`."""
+    if name == "UID":
+        return b"UID %d" % uid
+    if name == "BODYSTRUCTURE":
+        return b"BODYSTRUCTURE " + _bodystructure(email.message_from_bytes(raw))
+    if name == "RFC822":
+        data = raw
+    else:
+        name = name.replace(".PEEK", "")
+        data = _body_section(raw, name[name.index("[") + 1 : -1])
+    return b"%s {%d}\r\n%s" % (name.encode(), len(data), data)
+
+
+def _body_section(raw: bytes, section: str) -> bytes:
+    """Return the header block or the encoded body of a numbered part of a raw message."""
+    if section == "HEADER":
+        header, separator, _ = raw.partition(b"\n\n")
+        return header + separator
+    part = email.message_from_bytes(raw)
+    for number in section.split("."):
+        if part.get_content_type() == "message/rfc822":
+            part = typing.cast("email.message.Message", part.get_payload(0))
+        if part.is_multipart():
+            part = typing.cast("list[email.message.Message]", part.get_payload())[int(number) - 1]
+    return _part_body(part)
+
+
+def _part_body(part: email.message.Message) -> bytes:
+    payload = part.get_payload()
+    assert isinstance(payload, str)
+    return payload.encode("ascii", "surrogateescape")
+
+
+def _bodystructure(part: email.message.Message) -> bytes:
+    """Render the BODYSTRUCTURE of a message, with disposition extension data."""
+    if part.get_content_type() == "message/rfc822":
+        return _message_bodystructure(part)
+    if part.is_multipart():
+        subparts = typing.cast("list[email.message.Message]", part.get_payload())
+        children = b"".join(_bodystructure(child) for child in subparts)
+        return b'(%s "%s")' % (children, part.get_content_subtype().upper().encode())
+    params = " ".join(
+        f'"{name.upper()}" "{value}"' for name, value in (part.get_params() or [])[1:]
+    )
+    body = _part_body(part)
+    fields = [
+        f'"{part.get_content_maintype().upper()}"',
+        f'"{part.get_content_subtype().upper()}"',
+        f"({params})" if params else "NIL",
+        "NIL",
+        "NIL",
+        f'"{part.get("Content-Transfer-Encoding", "7BIT").upper()}"',
+        str(len(body)),
+    ]
+    if part.get_content_maintype() == "text":
+        fields.append(str(body.count(b"\n")))
+    disposition = part.get_content_disposition()
+    fields += ["NIL", f'("{disposition.upper()}" NIL)' if disposition else "NIL"]
+    return f"({' '.join(fields)})".encode()
+
+
+def _message_bodystructure(part: email.message.Message) -> bytes:
+    """Render the BODYSTRUCTURE of an attached message, with an empty envelope."""
+    inner = typing.cast("email.message.Message", part.get_payload(0))
+    body = inner.as_bytes()
+    disposition = part.get_content_disposition()
+    fields = [
+        b'"MESSAGE" "RFC822" NIL NIL NIL',
+        b'"%s"' % part.get("Content-Transfer-Encoding", "7BIT").upper().encode(),
+        b"%d" % len(body),
+        b"(%s)" % b" ".join([b"NIL"] * 10),
+        _bodystructure(inner),
+        b"%d" % body.count(b"\n"),
+        b"NIL",
+        b'("%s" NIL)' % disposition.upper().encode() if disposition else b"NIL",
+    ]
+    return b"(%s)" % b" ".join(fields)
+
+
+def _expand_set(message_set: str, existing: list[int]) -> set[int]:
+    """Return the existing numbers matched by an IMAP message set such as `1:3,7,9:*`."""
+    largest = existing[-1] if existing else 0
+    ranges = []
+    for part in message_set.split(","):
+        start, _, end = part.partition(":")
+        first = largest if start == "*" else int(start)
+        last = first if not end else largest if end == "*" else int(end)
+        ranges.append((min(first, last), max(first, last)))
+    return {number for number in existing if any(lo <= number <= hi for lo, hi in ranges)}
+
+
+@pytest.fixture
+def eml_fixture() -> bytes:
+    path = pathlib.Path(__file__).parents[2] / "example_email.eml"
+    return path.read_bytes()
+
+
+@pytest.fixture
+def imap_server() -> collections.abc.Iterator[FakeIMAPServer]:
+    server = FakeIMAPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def imap_client(imap_server: FakeIMAPServer) -> collections.abc.Iterator[imaplib.IMAP4]:
+    with imaplib.IMAP4("127.0.0.1", imap_server.port) as imap:
+        imap.login("user@example.com", "password")
+        yield imap
+
+
+@pytest.fixture
+def async_imap_server() -> FakeAsyncIMAPServer:
+    """An asyncio fake server, started by `async with` inside the test's event loop."""
+    return FakeAsyncIMAPServer()
@@ -0,0 +1,275 @@
+"""Tests for containers for the personal data collection module."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import imaplib
+import threading
+import time
+import typing
+
+import pytest
+
+from email_spam_filter.data.collection.personal.containers import (
+    AsyncIMAPClient,
+    AsyncIMAPConnectionPool,
+    CompressedIMAP4,
+    IMAPConnectionPool,
+    IMAPResponseData,
+    RawEmailWriter,
+)
+
+if typing.TYPE_CHECKING:
+    import pytest_mock
+
+    from tests.data.collection.personal.conftest import FakeAsyncIMAPServer, FakeIMAPServer
+
+
+def _fetch_inbox(imap_server: FakeIMAPServer, *, compress: bool) -> tuple[bool, list[typing.Any]]:
+    with CompressedIMAP4("127.0.0.1", imap_server.port) as imap:
+        imap.login("user@example.com", "password")
+        compressed = imap.compress() if compress else False
+        imap.select("INBOX", readonly=True)
+        _, data = imap.uid("FETCH", "1:*", "(RFC822)")
+    return compressed, data
+
+
+class TestCompressedIMAP4:
+    @staticmethod
+    def test_compresses_transfer(imap_server: FakeIMAPServer, eml_fixture: bytes) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 21), eml_fixture))
+
+        _, plain = _fetch_inbox(imap_server, compress=False)
+        plain_bytes, imap_server.bytes_sent = imap_server.bytes_sent, 0
+        compressed, deflated = _fetch_inbox(imap_server, compress=True)
+
+        assert compressed
+        assert "COMPRESS DEFLATE" in imap_server.commands
+        assert deflated == plain
+        assert imap_server.bytes_sent * 4 < plain_bytes
+
+    @staticmethod
+    def test_falls_back_without_server_support(
+        imap_server: FakeIMAPServer, eml_fixture: bytes
+    ) -> None:
+        imap_server.extensions.discard("COMPRESS=DEFLATE")
+        imap_server.add_mailbox("INBOX", {3: eml_fixture})
+
+        compressed, data = _fetch_inbox(imap_server, compress=True)
+
+        assert not compressed
+        assert "COMPRESS DEFLATE" not in imap_server.commands
+        assert data[0] == (b"1 (UID 3 RFC822 {%d}" % len(eml_fixture), eml_fixture)
+
+
+class TestIMAPConnectionPool:
+    @staticmethod
+    def test_reuses_connections(mocker: pytest_mock.MockerFixture) -> None:
+        connect = mocker.Mock(side_effect=lambda: mocker.MagicMock(spec=imaplib.IMAP4))
+        barrier = threading.Barrier(3)
+
+        def borrow() -> imaplib.IMAP4:
+            with pool.connection() as imap:
+                barrier.wait(timeout=5)
+                return imap
+
+        with IMAPConnectionPool(connect, size=3) as pool:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                borrowed = list(executor.map(lambda _: borrow(), range(3)))
+            with pool.connection() as imap:
+                assert imap in borrowed
+
+        assert connect.call_count == 3
+        assert len(set(map(id, borrowed))) == 3
+        for imap in borrowed:
+            typing.cast("typing.Any", imap).logout.assert_called_once()
+
+    @staticmethod
+    def test_discards_broken_connection(mocker: pytest_mock.MockerFixture) -> None:
+        connect = mocker.Mock(side_effect=lambda: mocker.MagicMock(spec=imaplib.IMAP4))
+
+        def use_broken() -> None:
+            with pool.connection():
+                error_message = "socket error: EOF"
+                raise imaplib.IMAP4.abort(error_message)
+
+        with IMAPConnectionPool(connect, size=1) as pool:
+            with pytest.raises(imaplib.IMAP4.abort):
+                use_broken()
+            with pool.connection():
+                pass
+
+        assert connect.call_count == 2
+
+    @staticmethod
+    def test_discard_wakes_waiting_thread(mocker: pytest_mock.MockerFixture) -> None:
+        connect = mocker.Mock(side_effect=lambda: mocker.MagicMock(spec=imaplib.IMAP4))
+        borrowed = threading.Event()
+
+        def use_broken() -> None:
+            with pool.connection():
+                borrowed.set()
+                time.sleep(0.1)
+                error_message = "socket error: EOF"
+                raise imaplib.IMAP4.abort(error_message)
+
+        def wait_for_connection() -> imaplib.IMAP4:
+            borrowed.wait(timeout=5)
+            with pool.connection() as imap:
+                return imap
+
+        with (
+            IMAPConnectionPool(connect, size=1) as pool,
+            concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor,
+        ):
+            broken = executor.submit(use_broken)
+            waiting = executor.submit(wait_for_connection)
+            with pytest.raises(imaplib.IMAP4.abort):
+                broken.result(timeout=5)
+            replacement = waiting.result(timeout=5)
+
+        assert connect.call_count == 2
+        typing.cast("typing.Any", replacement).shutdown.assert_not_called()
+
+    @staticmethod
+    def test_invalid_size(mocker: pytest_mock.MockerFixture) -> None:
+        with pytest.raises(ValueError, match="size must be positive"):
+            IMAPConnectionPool(mocker.Mock(), size=0)
+
+
+def test_raw_email_writer_counts_progress(mocker: pytest_mock.MockerFixture) -> None:
+    save = mocker.Mock()
+    writer = RawEmailWriter(save, log_every=2)
+    writer.add_total(4)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda uid: writer.write(str(uid), b"raw", "inbox"), range(4)))
+
+    assert writer.n_written == writer.total == 4
+    assert save.call_count == 4
+
+
+class TestAsyncIMAPClient:
+    @staticmethod
+    def test_select_search_and_fetch(
+        async_imap_server: FakeAsyncIMAPServer, eml_fixture: bytes
+    ) -> None:
+        async_imap_server.add_mailbox("INBOX", {3: eml_fixture, 7: b"short"}, uidvalidity=11)
+
+        async def session() -> tuple[int | None, int | None, IMAPResponseData, IMAPResponseData]:
+            async with async_imap_server:
+                client = await AsyncIMAPClient.connect("127.0.0.1", async_imap_server.port)
+                async with client:
+                    await client.login("user@example.com", 'pa"ss')
+                    missing = await client.select("Missing")
+                    uidvalidity = await client.select("INBOX")
+                    _, search = await client.uid("SEARCH", "UID 1:*")
+                    _, fetch = await client.uid("FETCH", "3:7", "(RFC822)")
+                    return missing, uidvalidity, search, fetch
+
+        missing, uidvalidity, search, fetch = asyncio.run(session())
+
+        assert missing is None
+        assert uidvalidity == 11
+        assert search == [b"3 7"]
+        assert fetch[0] == (b"1 FETCH (UID 3 RFC822 {%d}" % len(eml_fixture), eml_fixture)
+        assert fetch[1:] == [b")", (b"2 FETCH (UID 7 RFC822 {5}", b"short"), b")"]
+
+    @staticmethod
+    def test_idle(async_imap_server: FakeAsyncIMAPServer, eml_fixture: bytes) -> None:
+        async_imap_server.add_mailbox("INBOX", {3: eml_fixture})
+
+        async def session() -> tuple[list[bytes], list[bytes]]:
+            async with async_imap_server:
+                client = await AsyncIMAPClient.connect("127.0.0.1", async_imap_server.port)
+                async with client:
+                    await client.login("user@example.com", "password")
+                    await client.select("INBOX")
+                    idle = asyncio.create_task(client.idle(5))
+                    await async_imap_server.idling.wait()
+                    async_imap_server.deliver("INBOX", 4, eml_fixture)
+                    return await idle, await client.idle(0.05)
+
+        updates, timed_out = asyncio.run(session())
+
+        assert updates == [b"2 EXISTS"]
+        assert timed_out == []
+
+    @staticmethod
+    @pytest.mark.parametrize("supported", (True, False))
+    def test_compress(
+        async_imap_server: FakeAsyncIMAPServer,
+        eml_fixture: bytes,
+        supported: bool,  # noqa: FBT001
+    ) -> None:
+        if not supported:
+            async_imap_server.extensions.discard("COMPRESS=DEFLATE")
+        async_imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 21), eml_fixture))
+
+        async def session() -> tuple[bool, IMAPResponseData, list[bytes]]:
+            async with async_imap_server:
+                client = await AsyncIMAPClient.connect("127.0.0.1", async_imap_server.port)
+                async with client:
+                    await client.login("user@example.com", "password")
+                    compressed = await client.compress()
+                    await client.select("INBOX")
+                    _, fetch = await client.uid("FETCH", "1:*", "(RFC822)")
+                    idle = asyncio.create_task(client.idle(5))
+                    await async_imap_server.idling.wait()
+                    async_imap_server.deliver("INBOX", 21, eml_fixture)
+                    return compressed, fetch, await idle
+
+        compressed, fetch, updates = asyncio.run(session())
+
+        assert compressed is supported
+        assert fetch[0] == (b"1 FETCH (UID 1 RFC822 {%d}" % len(eml_fixture), eml_fixture)
+        assert len(fetch) == 40
+        assert updates == [b"21 EXISTS"]
+        assert (async_imap_server.bytes_sent * 4 < 20 * len(eml_fixture)) is supported
+
+
+class TestAsyncIMAPConnectionPool:
+    @staticmethod
+    def test_discards_connection_on_abort(mocker: pytest_mock.MockerFixture) -> None:
+        clients = [mocker.AsyncMock(spec=AsyncIMAPClient) for _ in range(2)]
+        connect = mocker.AsyncMock(side_effect=clients)
+
+        async def fail(pool: AsyncIMAPConnectionPool, error: imaplib.IMAP4.error) -> None:
+            async with pool.connection():
+                raise error
+
+        async def use_pool() -> None:
+            async with AsyncIMAPConnectionPool(connect, size=1) as pool:
+                with pytest.raises(imaplib.IMAP4.abort):
+                    await fail(pool, imaplib.IMAP4.abort("socket error: EOF"))
+                with pytest.raises(imaplib.IMAP4.error):
+                    await fail(pool, imaplib.IMAP4.error("NO"))
+                async with pool.connection() as client:
+                    assert client is clients[1]
+
+        asyncio.run(use_pool())
+
+        assert connect.await_count == 2
+        clients[0].close.assert_awaited_once()
+        clients[1].logout.assert_awaited_once()
+
+    @staticmethod
+    def test_close_empties_slots(mocker: pytest_mock.MockerFixture) -> None:
+        clients = [mocker.AsyncMock(spec=AsyncIMAPClient) for _ in range(2)]
+        connect = mocker.AsyncMock(side_effect=clients)
+
+        async def use_pool() -> None:
+            pool = AsyncIMAPConnectionPool(connect, size=1)
+            async with pool.connection() as client:
+                assert client is clients[0]
+            await pool.close()
+            async with pool.connection() as client:
+                assert client is clients[1]
+            await pool.close()
+
+        asyncio.run(use_pool())
+
+        assert connect.await_count == 2
+        clients[0].logout.assert_awaited_once()
+        clients[1].logout.assert_awaited_once()
@@ -2,27 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
+import email.message
 import imaplib
-import pathlib
 import typing
 
 import keyring
 import pytest
 
+from email_spam_filter.data.collection.personal import functions as personal_functions
+from email_spam_filter.data.collection.personal.containers import (
+    AsyncIMAPClient,
+    AsyncIMAPConnectionPool,
+    FolderSyncState,
+    IMAPConnectionPool,
+)
 from email_spam_filter.data.collection.personal.functions import (
+    async_download_folders,
+    async_fetch_folder,
+    download_folders,
     fetch_folder,
     get_imap_password,
+    load_sync_state,
+    move_messages,
     save_raw_email,
+    save_sync_state,
+    sync_folder,
 )
+from email_spam_filter.data.io import RawEmailStore, parse_email_bytes
 
 if typing.TYPE_CHECKING:
-    import pytest_mock
+    import collections.abc
+    import pathlib
 
+    import pytest_mock
 
-@pytest.fixture
-def eml_fixture() -> bytes:
-    path = pathlib.Path(__file__).parents[2] / "example_email.eml"
-    return path.read_bytes()
+    from tests.data.collection.personal.conftest import FakeAsyncIMAPServer, FakeIMAPServer
 
 
 @pytest.fixture
@@ -37,13 +52,14 @@ def label_fixture() -> str:
 
 @pytest.fixture
 def imap_fixture(mocker: pytest_mock.MockerFixture, eml_fixture: bytes) -> imaplib.IMAP4_SSL:
+    responses = {
+        "SEARCH": ("OK", [b"1"]),
+        "FETCH": ("OK", [(b"1 (UID 1 RFC822 {%d}" % len(eml_fixture), eml_fixture), b")"]),
+    }
     imap_fixture = mocker.MagicMock(spec=imaplib.IMAP4_SSL)
     imap_fixture.select.return_value = ("OK", [b"1"])
-    imap_fixture.search.return_value = ("OK", [b"1"])
-    imap_fixture.fetch.return_value = (
-        "OK",
-        [(b"1 (RFC822 {%d})" % len(eml_fixture), eml_fixture), b")"],
-    )
+    imap_fixture.response.return_value = ("UIDVALIDITY", [b"1"])
+    imap_fixture.uid.side_effect = lambda command, *_: responses[command]
     return typing.cast("imaplib.IMAP4_SSL", imap_fixture)
 
 
@@ -88,6 +104,521 @@ def test_fetch_folder(
     assert label == label_fixture
 
 
+@pytest.mark.parametrize(("batch_size", "n_fetches"), ((3, 2), (500, 1)))
+def test_fetch_folder_batches(
+    imap_server: FakeIMAPServer,
+    imap_client: imaplib.IMAP4,
+    eml_fixture: bytes,
+    batch_size: int,
+    n_fetches: int,
+) -> None:
+    imap_server.add_mailbox(
+        "INBOX", {uid: eml_fixture + b"X-Id: %d\r\n" % uid for uid in (3, 4, 5, 8, 9)}
+    )
+
+    results = list(fetch_folder(imap_client, "INBOX", "inbox", limit=4, batch_size=batch_size))
+
+    assert [uid for uid, _, _ in results] == ["4", "5", "8", "9"]
+    assert all(raw.endswith(b"X-Id: %d\r\n" % int(uid)) for uid, raw, _ in results)
+    fetches = [command for command in imap_server.commands if command.startswith("UID FETCH")]
+    assert len(fetches) == n_fetches
+    assert fetches[0].startswith("UID FETCH 4:5,8")
+
+
+def _email_with_attachment() -> bytes:
+    message = email.message.EmailMessage()
+    message["From"] = "Alice <alice@example.com>"
+    message["To"] = "bob@example.com"
+    message["Subject"] = "Quarterly report"
+    message.set_content("Plain body with https://example.com/report")
+    message.add_alternative("<p>HTML body</p>", subtype="html")
+    message.add_attachment(
+        bytes(range(256)) * 400, maintype="application", subtype="pdf", filename="report.pdf"
+    )
+    return message.as_bytes()
+
+
+def _forwarded_email(disposition: str) -> bytes:
+    forwarded = email.message.EmailMessage()
+    forwarded["From"] = "Dave <dave@example.com>"
+    forwarded["Subject"] = "Invoice"
+    forwarded.set_content("Inner body")
+    forwarded.add_attachment(
+        bytes(range(256)) * 400, maintype="application", subtype="pdf", filename="invoice.pdf"
+    )
+    message = email.message.EmailMessage()
+    message["From"] = "Alice <alice@example.com>"
+    message["Subject"] = "Fwd: Invoice"
+    message.set_content("See the forwarded message.")
+    message.add_attachment(forwarded, disposition=disposition)
+    return message.as_bytes()
+
+
+class TestPartialFetch:
+    @staticmethod
+    def test_skips_attachment_payloads(
+        imap_server: FakeIMAPServer, imap_client: imaplib.IMAP4
+    ) -> None:
+        plain = b"From: carol@example.com\nSubject: Hi\n\nJust text.\n"
+        imap_server.add_mailbox("INBOX", {1: _email_with_attachment(), 2: plain})
+
+        full = list(fetch_folder(imap_client, "INBOX", "inbox"))
+        partial = list(fetch_folder(imap_client, "INBOX", "inbox", partial=True))
+
+        assert [uid for uid, _, _ in partial] == ["1", "2"]
+        for (uid, full_raw, _), (_, partial_raw, _) in zip(full, partial, strict=True):
+            expected = parse_email_bytes(full_raw, f"{uid}_inbox", "inbox_personal")
+            assert parse_email_bytes(partial_raw, f"{uid}_inbox", "inbox_personal") == expected
+        assert partial[0][1].count(b"report.pdf") == 0
+        assert len(partial[0][1]) * 10 < len(full[0][1])
+        section_fetches = [command for command in imap_server.commands if ".PEEK[1" in command]
+        assert section_fetches == [
+            "UID FETCH 1 (UID BODY.PEEK[1.1] BODY.PEEK[1.2])",
+            "UID FETCH 2 (UID BODY.PEEK[1])",
+        ]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("disposition", "attach_types"),
+        (("attachment", ("message/rfc822",)), ("inline", ("application/pdf",))),
+    )
+    def test_forwarded_message(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        disposition: str,
+        attach_types: tuple[str, ...],
+    ) -> None:
+        imap_server.add_mailbox("INBOX", {1: _forwarded_email(disposition)})
+
+        [(uid, full_raw, _)] = fetch_folder(imap_client, "INBOX", "inbox")
+        [(_, partial_raw, _)] = fetch_folder(imap_client, "INBOX", "inbox", partial=True)
+
+        expected = parse_email_bytes(full_raw, f"{uid}_inbox", "inbox_personal")
+        assert parse_email_bytes(partial_raw, f"{uid}_inbox", "inbox_personal") == expected
+        assert expected.body == "See the forwarded message."
+        assert expected.attach_types == attach_types
+        assert partial_raw.count(b"invoice.pdf") == 0
+
+    @staticmethod
+    def test_groups_messages_by_sections(
+        imap_server: FakeIMAPServer, imap_client: imaplib.IMAP4
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys((1, 2, 3), _email_with_attachment()))
+
+        results = list(fetch_folder(imap_client, "INBOX", "inbox", partial=True))
+
+        assert len(results) == 3
+        fetches = [command for command in imap_server.commands if command.startswith("UID FETCH")]
+        assert fetches == [
+            "UID FETCH 1:3 (UID BODYSTRUCTURE BODY.PEEK[HEADER])",
+            "UID FETCH 1:3 (UID BODY.PEEK[1.1] BODY.PEEK[1.2])",
+        ]
+
+
+class TestSyncFolder:
+    @staticmethod
+    def test_incremental_sync(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        mailbox = imap_server.add_mailbox("INBOX", {1: eml_fixture, 2: eml_fixture}, uidvalidity=7)
+        state = sync_folder(imap_client, "INBOX", "inbox", None, path=tmp_path)
+        assert state == FolderSyncState(uidvalidity=7, last_uid=2)
+
+        imap_server.commands.clear()
+        assert sync_folder(imap_client, "INBOX", "inbox", state, path=tmp_path) == state
+        assert not any(command.startswith("UID FETCH") for command in imap_server.commands)
+
+        mailbox.messages[5] = eml_fixture
+        state = sync_folder(imap_client, "INBOX", "inbox", state, path=tmp_path)
+        assert state == FolderSyncState(uidvalidity=7, last_uid=5)
+        assert sorted(p.name for p in (tmp_path / "inbox_personal").iterdir()) == [
+            "1_inbox.eml",
+            "2_inbox.eml",
+            "5_inbox.eml",
+        ]
+
+    @staticmethod
+    def test_uidvalidity_change_resyncs(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        save_raw_email("9", eml_fixture, "inbox", path=tmp_path)
+        imap_server.add_mailbox("INBOX", {1: eml_fixture}, uidvalidity=8)
+        stale_state = FolderSyncState(uidvalidity=7, last_uid=9)
+
+        state = sync_folder(imap_client, "INBOX", "inbox", stale_state, path=tmp_path)
+
+        assert state == FolderSyncState(uidvalidity=8, last_uid=1)
+        assert [p.name for p in (tmp_path / "inbox_personal").iterdir()] == ["1_inbox.eml"]
+
+    @staticmethod
+    def test_first_sync_keeps_existing_files(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        save_raw_email("9", eml_fixture, "inbox", path=tmp_path)
+        imap_server.add_mailbox("INBOX", {1: eml_fixture}, uidvalidity=8)
+
+        state = sync_folder(imap_client, "INBOX", "inbox", None, path=tmp_path)
+
+        assert state == FolderSyncState(uidvalidity=8, last_uid=1)
+        assert sorted(p.name for p in (tmp_path / "inbox_personal").iterdir()) == [
+            "1_inbox.eml",
+            "9_inbox.eml",
+        ]
+
+    @staticmethod
+    def test_limit_fetches_oldest_first(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 6), eml_fixture))
+
+        state = sync_folder(imap_client, "INBOX", "inbox", None, limit=3, path=tmp_path)
+        assert state == FolderSyncState(uidvalidity=1, last_uid=3)
+        state = sync_folder(imap_client, "INBOX", "inbox", state, limit=3, path=tmp_path)
+
+        assert state == FolderSyncState(uidvalidity=1, last_uid=5)
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 5
+
+    @staticmethod
+    def test_message_missing_from_fetch_is_retried(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 5), eml_fixture))
+        imap_server.omit_on_fetch = {2}
+
+        state = sync_folder(imap_client, "INBOX", "inbox", None, path=tmp_path)
+        assert state == FolderSyncState(uidvalidity=1, last_uid=1)
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 3
+
+        imap_server.omit_on_fetch = set()
+        state = sync_folder(imap_client, "INBOX", "inbox", state, path=tmp_path)
+        assert state == FolderSyncState(uidvalidity=1, last_uid=4)
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 4
+
+    @staticmethod
+    def test_missing_folder(imap_client: imaplib.IMAP4, tmp_path: pathlib.Path) -> None:
+        assert sync_folder(imap_client, "Missing", "missing", None, path=tmp_path) is None
+
+    @staticmethod
+    def test_state_roundtrip(tmp_path: pathlib.Path) -> None:
+        state_path = tmp_path / "state.json"
+        assert load_sync_state(state_path) == {}
+
+        state = {"INBOX": FolderSyncState(uidvalidity=3, last_uid=42)}
+        save_sync_state(state, state_path)
+        assert load_sync_state(state_path) == state
+
+    @staticmethod
+    def test_save_raw_email_to_store(eml_fixture: bytes, tmp_path: pathlib.Path) -> None:
+        with RawEmailStore(tmp_path / "inbox_personal") as store:
+            save_raw_email("9", eml_fixture, "inbox", path=tmp_path / "unused", store=store)
+
+        assert not (tmp_path / "unused").exists()
+        assert RawEmailStore(tmp_path / "inbox_personal").get("9_inbox") == eml_fixture
+
+    @staticmethod
+    def test_sync_to_store(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", {1: eml_fixture, 2: eml_fixture}, uidvalidity=8)
+        with RawEmailStore(tmp_path / "inbox_personal") as store:
+            store.put("9_inbox", eml_fixture)
+            stale_state = FolderSyncState(uidvalidity=7, last_uid=9)
+
+            state = sync_folder(
+                imap_client, "INBOX", "inbox", stale_state, path=tmp_path, store=store
+            )
+
+        assert state == FolderSyncState(uidvalidity=8, last_uid=2)
+        assert RawEmailStore(tmp_path / "inbox_personal").keys() == ["1_inbox", "2_inbox"]
+        assert not list((tmp_path / "inbox_personal").glob("*.eml"))
+
+
+class TestDownloadFolders:
+    @staticmethod
+    @pytest.fixture
+    def pool(imap_server: FakeIMAPServer) -> collections.abc.Iterator[IMAPConnectionPool]:
+        def connect() -> imaplib.IMAP4:
+            imap = imaplib.IMAP4("127.0.0.1", imap_server.port)
+            imap.login("user@example.com", "password")
+            return imap
+
+        with IMAPConnectionPool(connect, size=3) as pool:
+            yield pool
+
+    @staticmethod
+    def test_parallel_download(
+        imap_server: FakeIMAPServer,
+        pool: IMAPConnectionPool,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 8), eml_fixture), uidvalidity=3)
+        imap_server.add_mailbox("Spam", {4: eml_fixture, 9: eml_fixture}, uidvalidity=5)
+        folders = {"INBOX": "inbox", "Spam": "spam", "Missing": "missing"}
+        previous = {"INBOX": FolderSyncState(uidvalidity=3, last_uid=2)}
+
+        state = download_folders(pool, folders, previous, path=tmp_path, batch_size=2)
+
+        assert state == {
+            "INBOX": FolderSyncState(uidvalidity=3, last_uid=7),
+            "Spam": FolderSyncState(uidvalidity=5, last_uid=9),
+        }
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 5
+        assert len(list((tmp_path / "spam_personal").iterdir())) == 2
+        assert sum(command.startswith("LOGIN") for command in imap_server.commands) <= 3
+        assert sum(command.startswith("UID FETCH") for command in imap_server.commands) == 4
+
+    @staticmethod
+    def test_failed_range_is_retried(
+        imap_server: FakeIMAPServer,
+        pool: IMAPConnectionPool,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 7), eml_fixture))
+        imap_server.drop_on_fetch = {3}
+
+        state = download_folders(pool, {"INBOX": "inbox"}, {}, path=tmp_path, batch_size=2)
+
+        assert state == {"INBOX": FolderSyncState(uidvalidity=1, last_uid=2)}
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 4
+
+    @staticmethod
+    def test_download_to_stores(
+        imap_server: FakeIMAPServer,
+        pool: IMAPConnectionPool,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 4), eml_fixture))
+        imap_server.add_mailbox("Spam", {4: eml_fixture})
+        folders = {"INBOX": "inbox", "Spam": "spam"}
+
+        with RawEmailStore(tmp_path / "inbox_personal") as store:
+            download_folders(
+                pool, folders, {}, path=tmp_path, batch_size=2, stores={"inbox": store}
+            )
+
+        assert sorted(RawEmailStore(tmp_path / "inbox_personal").keys()) == [
+            "1_inbox",
+            "2_inbox",
+            "3_inbox",
+        ]
+        assert [p.name for p in (tmp_path / "spam_personal").iterdir()] == ["4_spam.eml"]
+
+    @staticmethod
+    def test_message_missing_from_fetch_is_retried(
+        imap_server: FakeIMAPServer,
+        pool: IMAPConnectionPool,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 7), eml_fixture))
+        imap_server.omit_on_fetch = {4}
+
+        state = download_folders(pool, {"INBOX": "inbox"}, {}, path=tmp_path, batch_size=2)
+
+        assert state == {"INBOX": FolderSyncState(uidvalidity=1, last_uid=3)}
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 5
+
+
+class TestAsyncCollection:
+    @staticmethod
+    def _connect(
+        server: FakeAsyncIMAPServer,
+    ) -> collections.abc.Callable[[], collections.abc.Awaitable[AsyncIMAPClient]]:
+        async def connect() -> AsyncIMAPClient:
+            client = await AsyncIMAPClient.connect("127.0.0.1", server.port)
+            await client.login("user@example.com", "password")
+            return client
+
+        return connect
+
+    @staticmethod
+    def test_async_fetch_folder(async_imap_server: FakeAsyncIMAPServer, eml_fixture: bytes) -> None:
+        async_imap_server.add_mailbox("INBOX", dict.fromkeys((2, 3, 9), eml_fixture))
+
+        async def fetch() -> list[tuple[str, bytes, str]]:
+            async with async_imap_server:
+                client = await TestAsyncCollection._connect(async_imap_server)()
+                async with client:
+                    return [
+                        message
+                        async for message in async_fetch_folder(
+                            client, "INBOX", "inbox", limit=2, batch_size=1
+                        )
+                    ]
+
+        results = asyncio.run(fetch())
+
+        assert [(uid, label) for uid, _, label in results] == [("3", "inbox"), ("9", "inbox")]
+        assert all(raw == eml_fixture for _, raw, _ in results)
+
+    @staticmethod
+    def test_async_partial_fetch(async_imap_server: FakeAsyncIMAPServer) -> None:
+        raw = _email_with_attachment()
+        async_imap_server.add_mailbox("INBOX", {4: raw})
+
+        async def fetch() -> list[tuple[str, bytes, str]]:
+            async with async_imap_server:
+                client = await TestAsyncCollection._connect(async_imap_server)()
+                async with client:
+                    return [
+                        message
+                        async for message in async_fetch_folder(
+                            client, "INBOX", "inbox", partial=True
+                        )
+                    ]
+
+        [(uid, partial_raw, _)] = asyncio.run(fetch())
+
+        expected = parse_email_bytes(raw, "4_inbox", "inbox_personal")
+        assert parse_email_bytes(partial_raw, f"{uid}_inbox", "inbox_personal") == expected
+
+    @staticmethod
+    def test_async_download_folders(
+        async_imap_server: FakeAsyncIMAPServer, eml_fixture: bytes, tmp_path: pathlib.Path
+    ) -> None:
+        async_imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 8), eml_fixture))
+        async_imap_server.add_mailbox("Spam", {4: eml_fixture}, uidvalidity=5)
+        async_imap_server.drop_on_fetch = {6}
+        folders = {"INBOX": "inbox", "Spam": "spam", "Missing": "missing"}
+
+        async def download() -> dict[str, FolderSyncState]:
+            async with (
+                async_imap_server,
+                AsyncIMAPConnectionPool(
+                    TestAsyncCollection._connect(async_imap_server), size=2
+                ) as pool,
+            ):
+                return await async_download_folders(
+                    pool, folders, {}, path=tmp_path, batch_size=2, queue_size=1
+                )
+
+        state = asyncio.run(download())
+
+        assert state == {
+            "INBOX": FolderSyncState(uidvalidity=1, last_uid=4),
+            "Spam": FolderSyncState(uidvalidity=5, last_uid=4),
+        }
+        assert len(list((tmp_path / "inbox_personal").iterdir())) == 5
+        assert len(list((tmp_path / "spam_personal").iterdir())) == 1
+
+    @staticmethod
+    def test_async_download_cancellation(
+        async_imap_server: FakeAsyncIMAPServer,
+        eml_fixture: bytes,
+        tmp_path: pathlib.Path,
+        mocker: pytest_mock.MockerFixture,
+    ) -> None:
+        async_imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 51), eml_fixture))
+        save = mocker.patch.object(personal_functions, "save_raw_email")
+
+        async def download_then_cancel() -> None:
+            loop = asyncio.get_running_loop()
+            saved = asyncio.Event()
+            save.side_effect = lambda *_, **__: loop.call_soon_threadsafe(saved.set)
+            async with (
+                async_imap_server,
+                AsyncIMAPConnectionPool(
+                    TestAsyncCollection._connect(async_imap_server), size=2
+                ) as pool,
+            ):
+                task = asyncio.create_task(
+                    async_download_folders(
+                        pool, {"INBOX": "inbox"}, {}, path=tmp_path, batch_size=5, queue_size=1
+                    )
+                )
+                await saved.wait()
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(download_then_cancel())
+
+        assert 0 < save.call_count < 50
+
+
+class TestMoveMessages:
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("extensions", "commands"),
+        (
+            ({"MOVE"}, ["UID MOVE 1:3 Spam", "UID MOVE 5 Spam"]),
+            (
+                {"UIDPLUS"},
+                [
+                    "UID COPY 1:3 Spam",
+                    "UID STORE 1:3 +FLAGS.SILENT (\\Deleted)",
+                    "UID EXPUNGE 1:3",
+                    "UID COPY 5 Spam",
+                    "UID STORE 5 +FLAGS.SILENT (\\Deleted)",
+                    "UID EXPUNGE 5",
+                ],
+            ),
+            (
+                set(),
+                [
+                    "UID COPY 1:3 Spam",
+                    "UID STORE 1:3 +FLAGS.SILENT (\\Deleted)",
+                    "EXPUNGE",
+                    "UID COPY 5 Spam",
+                    "UID STORE 5 +FLAGS.SILENT (\\Deleted)",
+                    "EXPUNGE",
+                ],
+            ),
+        ),
+    )
+    def test_batches_commands(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        extensions: set[str],
+        commands: list[str],
+    ) -> None:
+        imap_server.extensions = extensions
+        inbox = imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 7), eml_fixture))
+        spam = imap_server.add_mailbox("Spam", {})
+        personal_functions.select_folder(imap_client, "INBOX", readonly=False)
+        imap_server.commands.clear()
+
+        moved = move_messages(imap_client, [b"5", b"2", b"1", b"3"], "Spam", batch_size=3)
+
+        assert moved == [1, 2, 3, 5]
+        assert imap_server.commands == ["CAPABILITY", *commands]
+        assert inbox.uids() == [4, 6]
+        assert spam.uids() == [1, 2, 3, 4]
+
+    @staticmethod
+    def test_read_only_folder_is_not_moved(
+        imap_server: FakeIMAPServer, imap_client: imaplib.IMAP4, eml_fixture: bytes
+    ) -> None:
+        inbox = imap_server.add_mailbox("INBOX", {1: eml_fixture})
+        imap_server.add_mailbox("Spam", {})
+        personal_functions.select_folder(imap_client, "INBOX")
+
+        assert move_messages(imap_client, [1], "Spam") == []
+        assert inbox.uids() == [1]
+
+
 def test_save_raw_email(eml_fixture: bytes, label_fixture: str, tmp_path: pathlib.Path) -> None:
     uid = "123"
     save_raw_email(uid, eml_fixture, label_fixture, path=tmp_path)
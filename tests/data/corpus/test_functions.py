@@ -0,0 +1,134 @@
+"""Tests for functions for the partitioned corpus module."""
+
+from __future__ import annotations
+
+import collections
+import typing
+
+import pytest
+
+from email_spam_filter.common.containers import EmailData
+from email_spam_filter.data.corpus import load_corpus, write_corpus
+from email_spam_filter.data.io import serialize_email_data
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+
+def _make_email(idx: int, tag: str, source: str) -> EmailData:
+    return EmailData(
+        id=idx,
+        tag=tag,
+        source=source,
+        subject=f"Subject {idx}",
+        body="Plain text",
+        unique_html_tags=(),
+        from_addr="example@example.com",
+        from_name="Tester",
+        n_links=0,
+        n_dupe_links=0,
+        link_domains=(),
+        link_contexts=(),
+        n_rcpts=1,
+        has_attach=False,
+        auth_fail=False,
+        cluster_id=idx,
+    )
+
+
+@pytest.fixture
+def corpus_fixture(tmp_path: pathlib.Path) -> tuple[pathlib.Path, list[EmailData]]:
+    trec = [_make_email(i, "spam" if i % 4 else "ham", "trec") for i in range(1, 41)]
+    personal = [_make_email(i, "inbox" if i % 2 else "spam", "personal") for i in range(1, 11)]
+    trec_path, personal_path = tmp_path / "trec.parquet", tmp_path / "personal.parquet"
+    serialize_email_data(trec, trec_path, row_group_size=8)
+    serialize_email_data(personal, personal_path)
+
+    corpus_path = tmp_path / "corpus"
+    assert write_corpus([trec_path, personal_path], corpus_path, row_group_size=8) == 50
+    return corpus_path, trec + personal
+
+
+class TestCorpus:
+    @staticmethod
+    def test_partitioned_layout(corpus_fixture: tuple[pathlib.Path, list[EmailData]]) -> None:
+        corpus_path, _ = corpus_fixture
+
+        partitions = sorted(
+            str(p.parent.relative_to(corpus_path)) for p in corpus_path.rglob("*.parquet")
+        )
+
+        assert partitions == [
+            "source=personal/tag=inbox",
+            "source=personal/tag=spam",
+            "source=trec/tag=ham",
+            "source=trec/tag=spam",
+        ]
+        assert not corpus_path.with_name("corpus.partial").exists()
+
+    @staticmethod
+    def test_load_matching_partitions(
+        corpus_fixture: tuple[pathlib.Path, list[EmailData]],
+    ) -> None:
+        corpus_path, emails = corpus_fixture
+
+        batch = load_corpus(["trec", "personal"], ["spam"], corpus_path=corpus_path)
+
+        expected = [e for e in emails if e.tag == "spam"]
+        assert sorted(batch.to_emails(), key=lambda e: (e.source, e.id)) == sorted(
+            expected, key=lambda e: (e.source, e.id)
+        )
+        assert len(load_corpus(corpus_path=corpus_path)) == len(emails)
+        subjects = load_corpus(["personal"], columns=["subject"], corpus_path=corpus_path)
+        assert subjects.table.column_names == ["subject"]
+        assert len(subjects) == 10
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("sample", "expected"),
+        (
+            (
+                0.5,
+                {
+                    ("personal", "inbox"): 2,
+                    ("personal", "spam"): 2,
+                    ("trec", "ham"): 5,
+                    ("trec", "spam"): 15,
+                },
+            ),
+            (
+                4,
+                {
+                    ("personal", "inbox"): 4,
+                    ("personal", "spam"): 4,
+                    ("trec", "ham"): 4,
+                    ("trec", "spam"): 4,
+                },
+            ),
+        ),
+    )
+    def test_stratified_sample(
+        corpus_fixture: tuple[pathlib.Path, list[EmailData]],
+        sample: float,
+        expected: dict[tuple[str, str], int],
+    ) -> None:
+        corpus_path, _ = corpus_fixture
+
+        batch = load_corpus(sample=sample, corpus_path=corpus_path)
+        again = load_corpus(sample=sample, corpus_path=corpus_path)
+
+        counts = collections.Counter(zip(batch.column("source"), batch.column("tag"), strict=True))
+        assert counts == expected
+        assert len(set(zip(batch.column("source"), batch.column("id"), strict=True))) == len(batch)
+        assert batch.column("id") == again.column("id")
+
+    @staticmethod
+    def test_invalid_arguments(corpus_fixture: tuple[pathlib.Path, list[EmailData]]) -> None:
+        corpus_path, _ = corpus_fixture
+
+        with pytest.raises(ValueError, match="Unknown source"):
+            load_corpus(["enron"], corpus_path=corpus_path)
+        with pytest.raises(ValueError, match="sample must be"):
+            load_corpus(sample=1.5, corpus_path=corpus_path)
+        with pytest.raises(FileNotFoundError, match="Corpus not found"):
+            load_corpus(corpus_path=corpus_path / "missing")
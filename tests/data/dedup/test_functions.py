@@ -0,0 +1,134 @@
+"""Tests for functions for the deduplication module."""
+
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+from email_spam_filter.common.containers import EmailData
+from email_spam_filter.data.dedup import (
+    cluster_duplicates,
+    deduplicate_emails,
+    deduplicate_processed_datasets,
+    normalise_text,
+)
+from email_spam_filter.data.dedup import functions as dedup_functions
+from email_spam_filter.data.io import deserialize_email_data, serialize_email_data
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+    import pytest_mock
+
+_CAMPAIGN = (
+    "Congratulations you have been selected to receive an exclusive reward from our partners "
+    "claim your gift card today by visiting the secure link below before the offer expires "
+    "this weekend and enjoy free shipping on every order placed through our online store"
+)
+
+
+def _make_email(idx: int, tag: str, subject: str, body: str, html_text: str = "") -> EmailData:
+    return EmailData(
+        id=idx,
+        tag=tag,
+        source="test",
+        subject=subject,
+        body=body,
+        unique_html_tags=(),
+        from_addr="example@example.com",
+        from_name="Tester",
+        n_links=0,
+        n_dupe_links=0,
+        link_domains=(),
+        link_contexts=(),
+        n_rcpts=1,
+        has_attach=False,
+        auth_fail=False,
+        html_text=html_text,
+    )
+
+
+@pytest.fixture
+def emails_fixture() -> list[EmailData]:
+    return [
+        _make_email(1, "spam", "Your reward", _CAMPAIGN),
+        _make_email(2, "ham", "Lunch tomorrow?", "Are you free for lunch tomorrow at noon"),
+        _make_email(3, "spam", "YOUR REWARD!", _CAMPAIGN.replace("weekend", "Sunday")),
+        _make_email(4, "inbox", "Your   reward", f"  {_CAMPAIGN}\n"),
+        _make_email(5, "spam", "Meeting notes", "Notes from the quarterly planning meeting"),
+    ]
+
+
+class TestDeduplication:
+    @staticmethod
+    def test_normalise_text() -> None:
+        assert normalise_text("Re: HELLO,  World!", "How are\nyou?") == "re hello world how are you"
+
+    @staticmethod
+    def test_clusters_exact_and_near_duplicates(emails_fixture: list[EmailData]) -> None:
+        emails = deduplicate_emails(emails_fixture)
+        reversed_emails = deduplicate_emails(emails_fixture[::-1])
+
+        cluster_ids = [email.cluster_id for email in emails]
+        assert cluster_ids[0] == cluster_ids[2] == cluster_ids[3]
+        assert len(set(cluster_ids)) == 3
+        assert [email.cluster_id for email in reversed_emails[::-1]] == cluster_ids
+        assert [email.id for email in emails] == [1, 2, 3, 4, 5]
+
+    @staticmethod
+    def test_distinct_texts_stay_apart() -> None:
+        texts = [
+            normalise_text(f"Order {n}", f"Invoice number {n} for {n * 7} items") for n in range(50)
+        ]
+
+        assert cluster_duplicates(texts) == list(range(50))
+
+    @staticmethod
+    def test_html_only_emails_use_html_text() -> None:
+        emails = [
+            _make_email(1, "inbox", "Newsletter", "", _CAMPAIGN),
+            _make_email(2, "inbox", "Newsletter", "", "Notes from the quarterly planning meeting"),
+            _make_email(3, "spam", "newsletter!", "", _CAMPAIGN),
+        ]
+
+        cluster_ids = [email.cluster_id for email in deduplicate_emails(emails)]
+
+        assert cluster_ids[0] != cluster_ids[1]
+        assert cluster_ids[0] == cluster_ids[2]
+
+    @staticmethod
+    def test_short_texts_stay_apart() -> None:
+        emails = [_make_email(idx, "inbox", "Hello", "") for idx in range(3)]
+
+        cluster_ids = [email.cluster_id for email in deduplicate_emails(emails)]
+
+        assert len(set(cluster_ids)) == 3
+        assert cluster_duplicates([normalise_text("Hello", "")] * 3) == [0, 1, 2]
+
+    @staticmethod
+    def test_invalid_bands() -> None:
+        with pytest.raises(ValueError, match="must be divisible by bands"):
+            cluster_duplicates(["a"], num_perm=128, bands=30)
+
+    @staticmethod
+    def test_processed_datasets_share_clusters(
+        mocker: pytest_mock.MockerFixture, emails_fixture: list[EmailData], tmp_path: pathlib.Path
+    ) -> None:
+        personal, trec = tmp_path / "personal.parquet", tmp_path / "trec.parquet"
+        serialize_email_data(emails_fixture[:2], personal)
+        serialize_email_data(emails_fixture[2:], trec)
+
+        n_clusters = deduplicate_processed_datasets([personal, trec])
+
+        expected = [email.cluster_id for email in deduplicate_emails(emails_fixture)]
+        assert n_clusters == 3
+        assert [e.cluster_id for e in deserialize_email_data(personal)] == expected[:2]
+        assert [e.cluster_id for e in deserialize_email_data(trec)] == expected[2:]
+        assert [e.subject for e in deserialize_email_data(trec)] == [
+            e.subject for e in emails_fixture[2:]
+        ]
+
+        serialize = mocker.spy(dedup_functions, "serialize_email_data")
+        assert deduplicate_processed_datasets([trec, personal]) == 3
+        serialize.assert_not_called()
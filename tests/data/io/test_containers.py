@@ -0,0 +1,122 @@
+"""Tests for containers for the data IO module."""
+
+from __future__ import annotations
+
+import pathlib
+
+import pyarrow.parquet as pq
+import pytest
+
+from email_spam_filter.data.io import (
+    EmailDataWriter,
+    RawEmailStore,
+    create_email_data,
+    deserialize_email_data,
+)
+
+
+@pytest.fixture
+def eml_file_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    spam_dir = tmp_path / "test_spam"
+    spam_dir.mkdir()
+    eml_path = spam_dir / "7_spam.eml"
+    eml_path.write_bytes((pathlib.Path(__file__).parents[1] / "example_email.eml").read_bytes())
+    return eml_path
+
+
+class TestEmailDataWriter:
+    @staticmethod
+    def test_row_groups(eml_file_path: pathlib.Path, tmp_path: pathlib.Path) -> None:
+        email_data = create_email_data(eml_file_path)
+        out_path = tmp_path / "emails.parquet"
+
+        with EmailDataWriter(out_path, row_group_size=2) as writer:
+            n_written = writer.write_all(email_data for _ in range(5))
+
+        assert n_written == 5
+        assert not writer.partial_path.exists()
+        assert pq.ParquetFile(out_path).num_row_groups == 3
+        assert deserialize_email_data(out_path) == [email_data] * 5
+
+    @staticmethod
+    def test_interrupted_write_keeps_flushed_rows(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        email_data = create_email_data(eml_file_path)
+        out_path = tmp_path / "emails.parquet"
+
+        writer = EmailDataWriter(out_path, row_group_size=2)
+
+        def _interrupted_write() -> None:
+            with writer:
+                writer.write_all([email_data] * 3)
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            _interrupted_write()
+
+        assert not out_path.exists()
+        assert pq.ParquetFile(writer.partial_path).metadata.num_rows == 2
+
+    @staticmethod
+    def test_invalid_row_group_size(tmp_path: pathlib.Path) -> None:
+        with pytest.raises(ValueError, match="row_group_size must be positive"):
+            EmailDataWriter(tmp_path / "emails.parquet", row_group_size=0)
+
+
+class TestRawEmailStore:
+    @staticmethod
+    def test_put_get_and_stream(tmp_path: pathlib.Path) -> None:
+        emails = {f"{uid}_spam": f"Subject: {uid}\n\n".encode() + b"x" * 100 for uid in range(6)}
+
+        with RawEmailStore(tmp_path / "store", segment_size=60) as store:
+            for key, raw_bytes in emails.items():
+                store.put(key, raw_bytes)
+            assert store.get("3_spam") == emails["3_spam"]
+
+        assert RawEmailStore.is_store(tmp_path / "store")
+        assert len(list((tmp_path / "store").glob("segment-*.bin"))) > 1
+        with RawEmailStore(tmp_path / "store") as store:
+            assert len(store) == 6
+            assert "5_spam" in store
+            assert "6_spam" not in store
+            assert store.keys() == list(emails)
+            assert list(store.items()) == list(emails.items())
+            with pytest.raises(KeyError):
+                store.get("6_spam")
+
+    @staticmethod
+    def test_rewritten_key_supersedes(tmp_path: pathlib.Path) -> None:
+        with RawEmailStore(tmp_path / "store") as store:
+            store.put("1_ham", b"old")
+            store.put("2_ham", b"other")
+        with RawEmailStore(tmp_path / "store") as store:
+            store.put("1_ham", b"new")
+
+        store = RawEmailStore(tmp_path / "store")
+        assert store.get("1_ham") == b"new"
+        assert list(store.items()) == [("2_ham", b"other"), ("1_ham", b"new")]
+
+    @staticmethod
+    def test_ignores_truncated_index_record(tmp_path: pathlib.Path) -> None:
+        with RawEmailStore(tmp_path / "store") as store:
+            store.put("1_ham", b"kept")
+        with (tmp_path / "store" / RawEmailStore.INDEX_NAME).open("a") as index_file:
+            index_file.write('["2_ham", 0, ')
+
+        assert RawEmailStore(tmp_path / "store").keys() == ["1_ham"]
+
+    @staticmethod
+    def test_put_after_truncated_index_record(tmp_path: pathlib.Path) -> None:
+        with RawEmailStore(tmp_path / "store") as store:
+            store.put("1_ham", b"kept")
+        index_path = tmp_path / "store" / RawEmailStore.INDEX_NAME
+        index_path.write_bytes(index_path.read_bytes()[:-5])
+
+        with RawEmailStore(tmp_path / "store") as store:
+            store.put("2_ham", b"appended")
+
+        store = RawEmailStore(tmp_path / "store")
+        assert store.keys() == ["2_ham"]
+        assert store.get("2_ham") == b"appended"
+        assert index_path.read_text(encoding="utf-8").endswith("\n")
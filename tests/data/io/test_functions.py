@@ -2,17 +2,51 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import email.message
+import errno
 import json
 import pathlib
+import tarfile
+import typing
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import pytest
 
+from email_spam_filter.common.containers import (
+    SCHEMA_VERSION,
+    SCHEMA_VERSION_KEY,
+    EmailBatch,
+    HtmlAnalysis,
+)
 from email_spam_filter.data.io import (
+    PlacementMode,
+    RawEmailStore,
+    analyse_html,
     create_email_data,
+    create_email_header_data,
     deserialize_email_data,
+    find_tar_archives,
+    iter_email_headers,
+    iter_email_store,
+    iter_tar_members,
+    load_email_batch,
+    parse_email_directory,
+    parse_raw_messages,
+    place_file,
+    place_files,
+    read_email_dataframe,
     serialize_email_data,
+    update_processed_dataset,
+    write_raw_emails,
 )
+from email_spam_filter.data.io import functions as io_functions
+
+if typing.TYPE_CHECKING:
+    import pytest_mock
 
 
 @pytest.fixture
@@ -45,6 +79,7 @@ class TestDataIO:
 
         assert email_data.n_rcpts == 1
         assert email_data.has_attach is False
+        assert email_data.n_attach == 0
         assert email_data.auth_fail is False
 
         assert email_data.n_links == 2
@@ -70,6 +105,75 @@ class TestDataIO:
         style_values = {v.value for v in style_attr.values}  # noqa: PD011
         assert "text-decoration:none;color:#0072d1" in style_values
 
+    @staticmethod
+    def test_create_email_data_skips_attachment_decoding(
+        tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+    ) -> None:
+        message = email.message.EmailMessage()
+        message["Subject"] = "Invoice"
+        message["From"] = "Sender <sender@example.com>"
+        message.set_content("Plain body")
+        message.add_alternative("<p>Html body</p>", subtype="html")
+        message.add_attachment(b"%PDF" * 100, maintype="application", subtype="pdf")
+        message.add_attachment(b"\x89PNG" * 10, maintype="image", subtype="png")
+        eml_path = tmp_path / "test_spam" / "7_spam.eml"
+        eml_path.parent.mkdir()
+        eml_path.write_bytes(message.as_bytes())
+        get_content_spy = mocker.spy(io_functions, "_safe_get_content")
+
+        email_data = create_email_data(eml_path)
+
+        assert email_data.body == "Plain body"
+        assert email_data.unique_html_tags[0].tag == "p"
+        assert email_data.has_attach is True
+        assert email_data.n_attach == 2
+        assert email_data.attach_types == ("application/pdf", "image/png")
+        assert email_data.attach_size > 400 * 4 // 3
+        assert get_content_spy.call_count == 2
+
+    @staticmethod
+    def test_attached_message_is_one_attachment(tmp_path: pathlib.Path) -> None:
+        forwarded = email.message.EmailMessage()
+        forwarded["Subject"] = "Original"
+        forwarded.set_content("Forwarded body")
+        forwarded.add_attachment(b"%PDF" * 100, maintype="application", subtype="pdf")
+        message = email.message.EmailMessage()
+        message["Subject"] = "Fwd: Original"
+        message.make_mixed()
+        message.add_attachment(forwarded)
+        eml_path = tmp_path / "test_spam" / "8_spam.eml"
+        eml_path.parent.mkdir()
+        eml_path.write_bytes(message.as_bytes())
+
+        email_data = create_email_data(eml_path)
+
+        assert email_data.body == ""
+        assert email_data.n_attach == 1
+        assert email_data.attach_types == ("message/rfc822",)
+
+    @staticmethod
+    def test_create_email_header_data(eml_file_path: pathlib.Path) -> None:
+        header_data = create_email_header_data(eml_file_path)
+        email_data = create_email_data(eml_file_path)
+
+        shared = header_data.model_dump(exclude={"message_id"})
+        assert shared == email_data.model_dump(include=set(shared))
+        assert header_data.message_id.startswith("<")
+
+    @staticmethod
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_iter_email_headers(eml_fixture: bytes, tmp_path: pathlib.Path, workers: int) -> None:
+        header, _, _ = eml_fixture.partition(b"\n\n")
+        spam_dir = tmp_path / "test_spam"
+        spam_dir.mkdir()
+        for uid in (2, 1):
+            (spam_dir / f"{uid}_spam.eml").write_bytes(header + b"\n\n" + b"\xff" * 10_000)
+
+        headers = list(iter_email_headers(spam_dir, workers=workers))
+
+        assert [h.id for h in headers] == [1, 2]
+        assert headers[0].from_addr == "john_mcafee@examplemail.com"
+
     @staticmethod
     def test_serialize_deserialize_roundtrip(
         eml_file_path: pathlib.Path, tmp_path: pathlib.Path
@@ -88,3 +192,292 @@ class TestDataIO:
         original = json.dumps(email_data.model_dump(mode="json"), sort_keys=True)
         new = json.dumps(deserialised[0].model_dump(mode="json"), sort_keys=True)
         assert original == new
+
+    @staticmethod
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_parse_email_directory(
+        eml_fixture: bytes, tmp_path: pathlib.Path, workers: int
+    ) -> None:
+        spam_dir = tmp_path / "test_spam"
+        spam_dir.mkdir()
+        for uid in (2, 10, 1):
+            (spam_dir / f"{uid}_spam.eml").write_bytes(eml_fixture)
+
+        email_data = parse_email_directory(spam_dir, workers=workers, chunksize=1)
+
+        expected = [create_email_data(path) for path in sorted(spam_dir.glob("*.eml"))]
+        assert [e.id for e in email_data] == [10, 1, 2]
+        assert email_data == expected
+
+    @staticmethod
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_iter_email_store(eml_fixture: bytes, tmp_path: pathlib.Path, workers: int) -> None:
+        spam_dir = tmp_path / "test_spam"
+        spam_dir.mkdir()
+        with RawEmailStore(tmp_path / "packed" / "test_spam") as store:
+            for uid in (2, 10, 1):
+                (spam_dir / f"{uid}_spam.eml").write_bytes(eml_fixture)
+                store.put(f"{uid}_spam", eml_fixture)
+
+        email_data = list(iter_email_store(store, workers=workers, chunksize=1))
+
+        expected = {e.id: e for e in parse_email_directory(spam_dir, workers=1)}
+        assert [e.id for e in email_data] == [2, 10, 1]
+        assert email_data == [expected[2], expected[10], expected[1]]
+        assert parse_email_directory(store.path, workers=1) == email_data
+        assert create_email_data(store.path / "10_spam.eml", store=store) == expected[10]
+
+    @staticmethod
+    def test_analyse_html() -> None:
+        html = (
+            '<div class="a b"><p>Hello\u200b</p>'
+            '<a href="https://x.example.com/1">one</a><a name="anchor">no href</a>'
+            '<a href="https://y.example.com/2" class="a">two</a></div>'
+        )
+        analysis = analyse_html(html, include_text=True)
+
+        assert analysis.link_urls == ("https://x.example.com/1", "https://y.example.com/2")
+        assert analysis.link_contexts[0] == '<a href="https://x.example.com/1">one</a>'
+        assert analysis.text == "Hello one no href two"
+
+        a_tag_data = next(t for t in analysis.unique_html_tags if t.tag == "a")
+        assert a_tag_data.count == 3
+        class_attr = next(a for a in a_tag_data.attributes if a.attribute == "class")
+        assert class_attr.count == 1
+        div_tag_data = next(t for t in analysis.unique_html_tags if t.tag == "div")
+        div_class_values = {v.value for v in div_tag_data.attributes[0].values}  # noqa: PD011
+        assert div_class_values == {"a", "b"}
+
+        assert analyse_html(html).text == ""
+        assert analyse_html("") == HtmlAnalysis()
+
+    @staticmethod
+    def test_update_processed_dataset(
+        eml_fixture: bytes, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+    ) -> None:
+        spam_dir = tmp_path / "test_spam"
+        spam_dir.mkdir()
+        for uid in (1, 2, 3):
+            (spam_dir / f"{uid}_spam.eml").write_bytes(eml_fixture)
+        processed = tmp_path / "processed.parquet"
+
+        first = update_processed_dataset(sorted(spam_dir.glob("*.eml")), processed, workers=1)
+        assert [e.id for e in first] == [1, 2, 3]
+        assert processed.with_suffix(".manifest.json").exists()
+
+        (spam_dir / "2_spam.eml").write_bytes(
+            eml_fixture.replace(b"Subject: ACTION REQUIRED", b"Subject: CHANGED")
+        )
+        (spam_dir / "3_spam.eml").unlink()
+        (spam_dir / "4_spam.eml").write_bytes(eml_fixture)
+        spy = mocker.spy(io_functions, "parse_email_directory")
+
+        second = update_processed_dataset(sorted(spam_dir.glob("*.eml")), processed, workers=1)
+
+        assert [e.id for e in second] == [1, 2, 4]
+        assert [p.name for p in spy.call_args.args[0]] == ["2_spam.eml", "4_spam.eml"]
+        assert second[1].subject.startswith("CHANGED")
+        assert deserialize_email_data(processed) == second
+
+        spy.reset_mock()
+        assert update_processed_dataset(sorted(spam_dir.glob("*.eml")), processed) == second
+        spy.assert_not_called()
+
+    @staticmethod
+    def test_native_nested_schema(eml_file_path: pathlib.Path, tmp_path: pathlib.Path) -> None:
+        email_data = create_email_data(eml_file_path)
+        out_path = tmp_path / "emails.parquet"
+        serialize_email_data([email_data], out_path)
+
+        schema = pq.read_schema(out_path)
+        assert schema.metadata[SCHEMA_VERSION_KEY] == str(SCHEMA_VERSION).encode()
+        assert schema.field("link_domains").type == pa.list_(pa.string())
+        tag_type = schema.field("unique_html_tags").type.value_type
+        assert [f.name for f in tag_type] == ["tag", "count", "attributes"]
+
+    @staticmethod
+    def test_deserialize_legacy_json_format(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        email_data = create_email_data(eml_file_path)
+        record = email_data.model_dump()
+        record["unique_html_tags"] = json.dumps(
+            [t.model_dump() for t in email_data.unique_html_tags]
+        )
+        record["link_domains"] = json.dumps(email_data.link_domains)
+        record["link_contexts"] = json.dumps(email_data.link_contexts)
+        legacy_path = tmp_path / "legacy.parquet"
+        pd.DataFrame([record]).to_parquet(legacy_path, index=False)
+
+        assert deserialize_email_data(legacy_path) == [email_data]
+
+    @staticmethod
+    def test_deserialize_trusted_matches_validated(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        email_data = create_email_data(eml_file_path)
+        other = email_data.model_copy(
+            update={"id": 124, "unique_html_tags": (), "link_domains": ()}
+        )
+        out_path = tmp_path / "emails.parquet"
+        serialize_email_data([email_data, other], out_path, row_group_size=1)
+
+        trusted = deserialize_email_data(out_path)
+        validated = deserialize_email_data(out_path, validate=True)
+
+        assert trusted == validated == [email_data, other]
+        assert isinstance(trusted[0].unique_html_tags[0].attributes, tuple)
+        assert isinstance(trusted[0].link_contexts, tuple)
+        assert trusted[0].model_dump() == email_data.model_dump()
+
+    @staticmethod
+    def test_filter_and_column_pushdown(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        email_data = create_email_data(eml_file_path)
+        emails = [
+            email_data.model_copy(update={"id": idx, "tag": tag})
+            for idx, tag in ((1, "spam"), (2, "inbox"), (3, "inbox"), (4, "ham"))
+        ]
+        out_path = tmp_path / "emails.parquet"
+        serialize_email_data(emails, out_path, row_group_size=1)
+
+        inbox = deserialize_email_data(out_path, filters=[("tag", "==", "inbox")])
+        assert inbox == emails[1:3]
+
+        id_range = deserialize_email_data(out_path, filters=[("id", ">=", 2), ("id", "<", 4)])
+        assert [e.id for e in id_range] == [2, 3]
+
+        tags = read_email_dataframe(
+            out_path, columns=["id", "tag"], filters=pc.field("tag").isin(["spam", "ham"])
+        )
+        assert list(tags.columns) == ["id", "tag"]
+        assert tags.to_dict("records") == [{"id": 1, "tag": "spam"}, {"id": 4, "tag": "ham"}]
+
+    @staticmethod
+    def test_email_batch_parquet_roundtrip(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        email_data = create_email_data(eml_file_path)
+        emails = [email_data.model_copy(update={"id": idx}) for idx in range(3)]
+        out_path = tmp_path / "emails.parquet"
+        serialize_email_data(EmailBatch.from_emails(emails), out_path, row_group_size=2)
+
+        assert pq.ParquetFile(out_path).num_row_groups == 2
+        batch = load_email_batch(out_path, columns=["id", "subject"], filters=[("id", ">", 0)])
+        assert batch.table.column_names == ["id", "subject"]
+        assert [view.id for view in batch] == [1, 2]
+        assert load_email_batch(out_path).to_emails() == emails
+
+
+class TestPlaceFile:
+    @staticmethod
+    @pytest.mark.parametrize("placement", list(PlacementMode))
+    def test_places_file_contents(
+        eml_file_path: pathlib.Path, eml_fixture: bytes, placement: PlacementMode
+    ) -> None:
+        dest = eml_file_path.parent / "placed" / "1_ham.eml"
+        dest.parent.mkdir()
+        dest.write_bytes(b"stale")
+
+        used = place_file(eml_file_path, dest, placement)
+
+        assert dest.read_bytes() == eml_fixture
+        assert used in {placement, PlacementMode.COPY}
+        assert dest.is_symlink() == (used is PlacementMode.SYMLINK)
+        same_inode = dest.stat().st_ino == eml_file_path.stat().st_ino
+        assert same_inode == (used in {PlacementMode.HARDLINK, PlacementMode.SYMLINK})
+
+    @staticmethod
+    def test_falls_back_to_copy(
+        eml_file_path: pathlib.Path, eml_fixture: bytes, mocker: pytest_mock.MockerFixture
+    ) -> None:
+        cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+        mocker.patch.object(pathlib.Path, "hardlink_to", side_effect=cross_device)
+        dest = eml_file_path.with_name("1_ham.eml")
+
+        used = place_file(eml_file_path, dest, PlacementMode.HARDLINK)
+
+        assert used is PlacementMode.COPY
+        assert dest.read_bytes() == eml_fixture
+        assert dest.stat().st_ino != eml_file_path.stat().st_ino
+
+
+class TestPlaceFiles:
+    @staticmethod
+    def test_skips_files_already_placed(tmp_path: pathlib.Path) -> None:
+        sources = tmp_path / "sources"
+        sources.mkdir()
+        for i in range(3):
+            (sources / str(i)).write_bytes(b"x" * (i + 1))
+        placed = tmp_path / "placed"
+        placed.mkdir()
+        plan = [(sources / str(i), placed / f"{i + 1}_ham.eml") for i in range(3)]
+
+        assert place_files(plan, workers=2) == 3
+        assert place_files(plan, workers=2) == 0
+        assert sorted(p.name for p in placed.iterdir()) == ["1_ham.eml", "2_ham.eml", "3_ham.eml"]
+        manifest = (tmp_path / "placed.manifest.jsonl").read_text().splitlines()
+        assert [json.loads(line)[0] for line in manifest] == ["1_ham.eml", "2_ham.eml", "3_ham.eml"]
+
+        (placed / "1_ham.eml").unlink()
+        (placed / "2_ham.eml").write_bytes(b"")
+        (sources / "2").write_bytes(b"changed")
+        assert place_files(plan, workers=2) == 3
+        assert place_files(plan, placement=PlacementMode.HARDLINK, workers=2) == 3
+        assert (placed / "3_ham.eml").read_bytes() == b"changed"
+        assert (placed / "3_ham.eml").samefile(sources / "2")
+
+
+def test_parsing_bounds_chunks_in_flight(
+    mocker: pytest_mock.MockerFixture, eml_file_path: pathlib.Path
+) -> None:
+    for uid in range(1, 10):
+        (eml_file_path.parent / f"{uid}_spam.eml").write_bytes(eml_file_path.read_bytes())
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    submit = mocker.spy(executor, "submit")
+    mocker.patch("email_spam_filter.data.io.functions._process_pool", return_value=executor)
+
+    headers = iter_email_headers(eml_file_path.parent, workers=2, chunksize=1)
+
+    next(headers)
+    assert submit.call_count == 4
+    assert len(list(headers)) == 9
+    assert submit.call_count == 10
+
+
+class TestTarArchives:
+    @staticmethod
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_parse_members_without_extracting(
+        eml_file_path: pathlib.Path, tmp_path: pathlib.Path, workers: int
+    ) -> None:
+        archive_path = tmp_path / "emails.tar.gz"
+        with tarfile.open(archive_path, "w:gz") as archive:
+            for uid in range(1, 4):
+                archive.add(eml_file_path, f"./test_spam/{uid}_spam.eml")
+        (tmp_path / "notes.txt").write_text("not an archive")
+
+        assert find_tar_archives(tmp_path) == [archive_path]
+        names = [name for name, _ in iter_tar_members(archive_path)]
+        assert names == [f"test_spam/{uid}_spam.eml" for uid in range(1, 4)]
+        messages = (
+            (pathlib.PurePosixPath(name).stem, raw_bytes, "test_spam")
+            for name, raw_bytes in iter_tar_members(archive_path)
+        )
+        emails = list(parse_raw_messages(messages, workers=workers, chunksize=1))
+        assert [email.id for email in emails] == [1, 2, 3]
+        assert emails[0] == create_email_data(eml_file_path).model_copy(update={"id": 1})
+
+    @staticmethod
+    @pytest.mark.parametrize("packed", (False, True))
+    def test_write_raw_emails_skips_written(
+        tmp_path: pathlib.Path,
+        packed: bool,  # noqa: FBT001
+    ) -> None:
+        emails = [(tmp_path / f"{uid}_ham.eml", b"Subject: ham\n\nBody") for uid in range(1, 3)]
+
+        assert write_raw_emails(emails, packed=packed) == 2
+        assert write_raw_emails(emails, packed=packed) == 0
+        if packed:
+            assert RawEmailStore(tmp_path).keys() == ["1_ham", "2_ham"]
@@ -6,10 +6,13 @@ import typing
 
 import pytest
 
+from email_spam_filter.common.containers import EmailData
+from email_spam_filter.data.io import serialize_email_data
 from email_spam_filter.data.labelling.functions import (
     _label_single_email,
     _load_existing_labels,
     _save_labels,
+    run_labelling_session,
 )
 
 if typing.TYPE_CHECKING:
@@ -17,8 +20,6 @@ if typing.TYPE_CHECKING:
 
     import pytest_mock
 
-    from email_spam_filter.common import EmailData
-
 
 @pytest.fixture
 def mock_emaildata_fixture(mocker: pytest_mock.MockerFixture) -> EmailData:
@@ -93,3 +94,40 @@ class TestLabelling:
         assert proceed is True
         assert labels == {}
         assert not label_json_path.exists()
+
+    @staticmethod
+    def test_session_only_loads_unlabelled(
+        tmp_path: pathlib.Path,
+        label_json_path: pathlib.Path,
+        mocker: pytest_mock.MockerFixture,
+    ) -> None:
+        emails = [
+            EmailData(
+                id=idx,
+                tag="inbox",
+                source="personal",
+                subject=f"Subject {idx}",
+                body="Body",
+                unique_html_tags=(),
+                from_addr="a@example.com",
+                from_name="A",
+                n_links=0,
+                n_dupe_links=0,
+                link_domains=(),
+                link_contexts=(),
+                n_rcpts=1,
+                has_attach=False,
+                auth_fail=False,
+            )
+            for idx in (1, 2, 3)
+        ]
+        email_path = tmp_path / "emails.parquet"
+        serialize_email_data(emails, email_path)
+        _save_labels(label_json_path, {"2": 1})
+        label_single_email = mocker.patch(
+            "email_spam_filter.data.labelling.functions._label_single_email", return_value=True
+        )
+
+        run_labelling_session(email_path, label_json_path)
+
+        assert [call.args[0].id for call in label_single_email.call_args_list] == [1, 3]
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import tarfile
 import typing
 
 import pytest
 
-from email_spam_filter.data.organise.spamassassin.functions import organise_spamassassin_data
+from email_spam_filter.data.io import PlacementMode, RawEmailStore
+from email_spam_filter.data.organise.spamassassin.functions import (
+    iter_spamassassin_archives,
+    organise_spamassassin_data,
+)
 
 if typing.TYPE_CHECKING:
     import pathlib
@@ -50,6 +55,72 @@ class TestOrganiseSpamAssassinData:
         assert (raw_ham_path / "1_ham.eml").read_text().startswith("Subject: ham 1")
         assert (raw_spam_path / "3_spam.eml").read_text().startswith("Subject: spam 3")
 
+    @staticmethod
+    def test_symlink_run(
+        raw_external_spamassassin_path_fixture: pathlib.Path,
+        raw_spamassassin_path_fixture: tuple[pathlib.Path, pathlib.Path],
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_spamassassin_path_fixture
+        organise_spamassassin_data(
+            external_path=raw_external_spamassassin_path_fixture,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+            placement=PlacementMode.SYMLINK,
+        )
+        ham = raw_ham_path / "2_ham.eml"
+        source = raw_external_spamassassin_path_fixture / "easy_ham_2003" / "ham2"
+        assert ham.is_symlink()
+        assert ham.resolve() == source.resolve()
+
+    @staticmethod
+    def test_packed_run(
+        raw_external_spamassassin_path_fixture: pathlib.Path,
+        raw_spamassassin_path_fixture: tuple[pathlib.Path, pathlib.Path],
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_spamassassin_path_fixture
+
+        organise_spamassassin_data(
+            external_path=raw_external_spamassassin_path_fixture,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+            packed=True,
+        )
+
+        assert not list(raw_ham_path.glob("*.eml"))
+        ham_store = RawEmailStore(raw_ham_path)
+        spam_store = RawEmailStore(raw_spam_path)
+        assert ham_store.keys() == ["1_ham", "2_ham"]
+        assert spam_store.keys() == ["1_spam", "2_spam", "3_spam"]
+        assert ham_store.get("1_ham").startswith(b"Subject: ham 1")
+        assert spam_store.get("3_spam").startswith(b"Subject: spam 3")
+
+    @staticmethod
+    def test_archive_run(
+        raw_external_spamassassin_path_fixture: pathlib.Path,
+        raw_spamassassin_path_fixture: tuple[pathlib.Path, pathlib.Path],
+        tmp_path: pathlib.Path,
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_spamassassin_path_fixture
+        archive_dir = tmp_path / "archived"
+        archive_dir.mkdir()
+        for subdir in raw_external_spamassassin_path_fixture.iterdir():
+            with tarfile.open(archive_dir / f"{subdir.name}.tar.bz2", "w:bz2") as archive:
+                archive.add(subdir, subdir.name)
+
+        organise_spamassassin_data(
+            external_path=archive_dir,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+        )
+
+        assert sorted(p.name for p in raw_ham_path.iterdir()) == ["1_ham.eml", "2_ham.eml"]
+        spam_files = sorted(p.name for p in raw_spam_path.iterdir())
+        assert spam_files == ["1_spam.eml", "2_spam.eml", "3_spam.eml"]
+        labels = {
+            label for _, _, label in iter_spamassassin_archives(sorted(archive_dir.iterdir()))
+        }
+        assert labels == {"spamassassin_ham", "spamassassin_spam"}
+
     @staticmethod
     @pytest.mark.parametrize(
         ("external", "raw_ham", "raw_spam"),
@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import functools
+import tarfile
 import typing
 
 import pytest
 
-from email_spam_filter.data.organise.trec.functions import organise_trec_data
+from email_spam_filter.data.io import PlacementMode, RawEmailStore
+from email_spam_filter.data.io import functions as io_functions
+from email_spam_filter.data.organise.trec.functions import (
+    iter_trec_archives,
+    organise_trec_data,
+)
 
 if typing.TYPE_CHECKING:
     import pathlib
 
+    import pytest_mock
+
 
 @pytest.fixture
 def raw_external_trec_path_fixture(tmp_path: pathlib.Path) -> pathlib.Path:
@@ -62,6 +71,106 @@ class TestOrganiseTrecData:
         assert (raw_ham_path / "1_ham.eml").read_text().startswith("Subject: ham 1")
         assert (raw_spam_path / "3_spam.eml").read_text().startswith("Subject: spam 3")
 
+    @staticmethod
+    def test_hardlink_run(
+        raw_external_trec_path_fixture: pathlib.Path,
+        raw_trec_path_fixture: tuple[pathlib.Path, pathlib.Path],
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_trec_path_fixture
+
+        organise_trec_data(
+            external_path=raw_external_trec_path_fixture,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+            placement=PlacementMode.HARDLINK,
+        )
+
+        source = raw_external_trec_path_fixture / "data" / "001" / "002"
+        assert (raw_spam_path / "3_spam.eml").samefile(source)
+        assert source.stat().st_nlink == 2
+
+    @staticmethod
+    def test_rerun_skips_placed_files(
+        raw_external_trec_path_fixture: pathlib.Path,
+        raw_trec_path_fixture: tuple[pathlib.Path, pathlib.Path],
+        mocker: pytest_mock.MockerFixture,
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_trec_path_fixture
+        organise = functools.partial(
+            organise_trec_data,
+            external_path=raw_external_trec_path_fixture,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+            workers=2,
+        )
+        organise()
+        (raw_spam_path / "2_spam.eml").unlink()
+        place_file = mocker.spy(io_functions, "place_file")
+
+        organise()
+
+        assert [call.args[1] for call in place_file.call_args_list] == [
+            raw_spam_path / "2_spam.eml"
+        ]
+        assert (raw_spam_path / "2_spam.eml").read_text().startswith("Subject: spam 2")
+
+    @staticmethod
+    def test_packed_run(
+        raw_external_trec_path_fixture: pathlib.Path,
+        raw_trec_path_fixture: tuple[pathlib.Path, pathlib.Path],
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_trec_path_fixture
+
+        for _ in range(2):
+            organise_trec_data(
+                external_path=raw_external_trec_path_fixture,
+                raw_ham_path=raw_ham_path,
+                raw_spam_path=raw_spam_path,
+                packed=True,
+            )
+
+        assert not list(raw_ham_path.glob("*.eml"))
+        ham_store = RawEmailStore(raw_ham_path)
+        spam_store = RawEmailStore(raw_spam_path)
+        assert ham_store.keys() == ["1_ham", "2_ham"]
+        assert spam_store.keys() == ["1_spam", "2_spam", "3_spam"]
+        assert ham_store.get("1_ham").startswith(b"Subject: ham 1")
+        assert spam_store.get("3_spam").startswith(b"Subject: spam 3")
+
+    @staticmethod
+    @pytest.mark.parametrize("packed", (False, True))
+    def test_archive_run(
+        raw_external_trec_path_fixture: pathlib.Path,
+        raw_trec_path_fixture: tuple[pathlib.Path, pathlib.Path],
+        tmp_path: pathlib.Path,
+        packed: bool,  # noqa: FBT001
+    ) -> None:
+        raw_ham_path, raw_spam_path = raw_trec_path_fixture
+        archive_dir = tmp_path / "archived"
+        archive_dir.mkdir()
+        with tarfile.open(archive_dir / "trec07p.tgz", "w:gz") as archive:
+            archive.add(raw_external_trec_path_fixture / "data", "trec07p/data")
+            archive.add(raw_external_trec_path_fixture / "full", "trec07p/full")
+
+        organise_trec_data(
+            external_path=archive_dir,
+            raw_ham_path=raw_ham_path,
+            raw_spam_path=raw_spam_path,
+            packed=packed,
+        )
+
+        emails = {
+            uid: raw_bytes.decode()
+            for uid, raw_bytes, _ in iter_trec_archives([archive_dir / "trec07p.tgz"])
+        }
+        assert sorted(emails) == ["1_ham", "1_spam", "2_ham", "2_spam", "3_spam"]
+        assert emails["3_spam"].startswith("Subject: spam 3")
+        if packed:
+            assert RawEmailStore(raw_spam_path).get("3_spam").decode() == emails["3_spam"]
+        else:
+            assert sorted(p.name for p in raw_ham_path.iterdir()) == ["1_ham.eml", "2_ham.eml"]
+            assert (raw_spam_path / "3_spam.eml").read_text() == emails["3_spam"]
+
     @staticmethod
     @pytest.mark.parametrize(
         ("external", "raw_ham", "raw_spam"),
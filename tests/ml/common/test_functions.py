@@ -7,11 +7,17 @@ import pytest
 
 from email_spam_filter.common.containers import (
     AttributeData,
+    EmailBatch,
     EmailData,
     TagData,
     ValueData,
 )
-from email_spam_filter.ml.common import split_labelled_and_inbox, to_features
+from email_spam_filter.ml.common import (
+    TRAINING_COLUMNS,
+    select_cluster_representatives,
+    split_labelled_and_inbox,
+    to_features,
+)
 
 
 def _make_email(
@@ -76,6 +82,24 @@ def test_split_labelled_and_inbox(sample_emails_fixture: list[EmailData]) -> Non
     assert isinstance(inbox[0], EmailData)
 
 
+def test_select_cluster_representatives(sample_emails_fixture: list[EmailData]) -> None:
+    cluster_ids = [0, 0, 0, 0, 4, None]
+    emails = [
+        email.model_copy(update={"cluster_id": cluster_id})
+        for email, cluster_id in zip(sample_emails_fixture, cluster_ids, strict=True)
+    ]
+
+    representatives, weights = select_cluster_representatives(emails)
+
+    assert [(e.id, e.tag) for e in representatives] == [
+        (1, "spam"),
+        (4, "ham"),
+        (5, "ham"),
+        (6, "inbox"),
+    ]
+    assert weights == [3, 1, 1, 1]
+
+
 def test_to_features(sample_emails_fixture: list[EmailData]) -> None:
     df, labels = to_features(sample_emails_fixture)
 
@@ -99,3 +123,30 @@ def test_to_features(sample_emails_fixture: list[EmailData]) -> None:
         "unique_html_tags",
     }
     assert expected_cols.issubset(set(df.columns))
+
+
+def test_to_features_from_email_batch(sample_emails_fixture: list[EmailData]) -> None:
+    df, labels = to_features(sample_emails_fixture)
+    batch_df, batch_labels = to_features(EmailBatch.from_emails(sample_emails_fixture))
+
+    pd.testing.assert_frame_equal(df, batch_df)
+    pd.testing.assert_series_equal(labels, batch_labels)
+
+
+def test_split_and_select_from_projected_batch(sample_emails_fixture: list[EmailData]) -> None:
+    cluster_ids = [0, 0, 0, 0, 4, None]
+    emails = [
+        email.model_copy(update={"cluster_id": cluster_id})
+        for email, cluster_id in zip(sample_emails_fixture, cluster_ids, strict=True)
+    ]
+    table = EmailBatch.from_emails(emails).table.select(list(TRAINING_COLUMNS))
+
+    labelled, inbox = split_labelled_and_inbox(EmailBatch(table))
+    representatives, weights = select_cluster_representatives(labelled)
+
+    assert isinstance(labelled, EmailBatch)
+    assert labelled.column("id") == [1, 2, 3, 4, 5]
+    assert inbox.column("id") == [6]
+    assert isinstance(representatives, EmailBatch)
+    assert representatives.column("id") == [1, 4, 5]
+    assert weights == [3, 1, 1]
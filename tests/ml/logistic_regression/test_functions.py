@@ -100,6 +100,18 @@ def test_training_model(
     assert trained is fake_pipe
 
 
+def test_training_model_with_sample_weight(
+    sample_emails_fixture: list[EmailData],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    fake_pipe = mocker.MagicMock()
+    weights = [3] * len(sample_emails_fixture)
+
+    training_model(fake_pipe, sample_emails_fixture, mocker.MagicMock(), weights)
+
+    assert fake_pipe.fit.call_args.kwargs == {"classifier__sample_weight": weights}
+
+
 def test_prediction_model_returns_probs(
     sample_emails_fixture: list[EmailData],
     mocker: pytest_mock.MockerFixture,
@@ -0,0 +1,12 @@
+"""Fixtures for the scoring tests, shared with the personal data collection tests."""
+
+from __future__ import annotations
+
+from tests.data.collection.personal.conftest import (
+    async_imap_server,
+    eml_fixture,
+    imap_client,
+    imap_server,
+)
+
+__all__ = ("async_imap_server", "eml_fixture", "imap_client", "imap_server")
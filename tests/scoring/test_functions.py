@@ -0,0 +1,305 @@
+"""Tests for functions for the streaming scoring module."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import typing
+
+import pandas as pd
+import pytest
+
+from email_spam_filter.data.collection.personal import AsyncIMAPClient
+from email_spam_filter.data.io import deserialize_email_data, parse_email_bytes
+from email_spam_filter.ml.common import ModelPipeline
+from email_spam_filter.scoring import functions as scoring_functions
+from email_spam_filter.scoring import (
+    move_predicted_spam,
+    score_folders,
+    stream_predictions,
+    watch_folder,
+)
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+    import imaplib
+    import pathlib
+
+    import pytest_mock
+
+    from email_spam_filter.common.containers import EmailData
+    from tests.data.collection.personal.conftest import FakeAsyncIMAPServer, FakeIMAPServer
+
+
+@pytest.fixture
+def model_fixture(mocker: pytest_mock.MockerFixture) -> ModelPipeline:
+    def predict(emails: list[EmailData]) -> pd.DataFrame:
+        return pd.DataFrame({"id": [e.id for e in emails], "probability": [0.9] * len(emails)})
+
+    model = mocker.MagicMock(spec=ModelPipeline)
+    model.predict.side_effect = predict
+    return typing.cast("ModelPipeline", model)
+
+
+def _stage_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name.startswith("stream-predictions-")]
+
+
+class TestStreamPredictions:
+    @staticmethod
+    def test_micro_batches_and_taps(eml_fixture: bytes, model_fixture: ModelPipeline) -> None:
+        messages = [(str(uid), eml_fixture, "inbox") for uid in range(1, 6)]
+        raw_seen: list[str] = []
+        emails_seen: list[EmailData] = []
+
+        batches = list(
+            stream_predictions(
+                messages,
+                model_fixture,
+                batch_size=2,
+                raw_tap=lambda uid, *_: raw_seen.append(uid),
+                email_tap=emails_seen.append,
+            )
+        )
+
+        assert all(0 < len(batch) <= 2 for batch in batches)
+        predictions = pd.concat(batches, ignore_index=True)
+        assert predictions.columns.tolist() == ["id", "tag", "probability"]
+        assert predictions["id"].tolist() == [1, 2, 3, 4, 5]
+        assert set(predictions["tag"]) == {"inbox"}
+        assert raw_seen == ["1", "2", "3", "4", "5"]
+        assert [e.id for e in emails_seen] == [1, 2, 3, 4, 5]
+        assert not _stage_threads()
+
+    @staticmethod
+    def test_stage_error_is_raised(eml_fixture: bytes, model_fixture: ModelPipeline) -> None:
+        def messages() -> collections.abc.Iterator[tuple[str, bytes, str]]:
+            yield "1", eml_fixture, "inbox"
+            error_message = "connection lost"
+            raise ConnectionError(error_message)
+
+        with pytest.raises(ConnectionError, match="connection lost"):
+            list(stream_predictions(messages(), model_fixture))
+        assert not _stage_threads()
+
+    @staticmethod
+    def test_skips_malformed_message(
+        mocker: pytest_mock.MockerFixture, eml_fixture: bytes, model_fixture: ModelPipeline
+    ) -> None:
+        def parse_or_fail(raw_bytes: bytes, uid: str, folder: str) -> EmailData:
+            if uid == "2_inbox":
+                error_message = "Malformed email."
+                raise ValueError(error_message)
+            return parse_email_bytes(raw_bytes, uid, folder)
+
+        mocker.patch.object(scoring_functions, "parse_email_bytes", side_effect=parse_or_fail)
+        messages = [(str(uid), eml_fixture, "inbox") for uid in range(1, 4)]
+
+        batches = list(stream_predictions(messages, model_fixture, batch_size=2))
+
+        assert pd.concat(batches, ignore_index=True)["id"].tolist() == [1, 3]
+        assert not _stage_threads()
+
+    @staticmethod
+    def test_early_stop_ends_stages(eml_fixture: bytes, model_fixture: ModelPipeline) -> None:
+        messages = ((str(uid), eml_fixture, "inbox") for uid in itertools.count(1))
+        stream = stream_predictions(messages, model_fixture, batch_size=4, queue_size=8)
+
+        first = next(stream)
+        stream.close()
+
+        assert 0 < len(first) <= 4
+        assert not _stage_threads()
+
+    @staticmethod
+    def test_invalid_batch_size(model_fixture: ModelPipeline) -> None:
+        with pytest.raises(ValueError, match="batch_size must be positive"):
+            next(stream_predictions([], model_fixture, batch_size=0))
+
+
+def test_score_folders(
+    eml_fixture: bytes,
+    model_fixture: ModelPipeline,
+    mocker: pytest_mock.MockerFixture,
+    tmp_path: pathlib.Path,
+) -> None:
+    mocker.patch.object(scoring_functions, "get_imap_password", return_value="password")
+    imap = mocker.patch.object(scoring_functions, "connect_imap").return_value
+    folders = {"INBOX": [("7", "inbox"), ("8", "inbox")], "Spam": [("3", "spam")]}
+    mocker.patch.object(
+        scoring_functions,
+        "fetch_folder",
+        side_effect=lambda _imap, folder, *_, **__: [
+            (uid, eml_fixture, label) for uid, label in folders[folder]
+        ],
+    )
+
+    results = score_folders(
+        model_fixture,
+        {"INBOX": "inbox", "Spam": "spam"},
+        raw_path=tmp_path / "raw",
+        processed_path=tmp_path / "scored.parquet",
+    )
+
+    assert results[["id", "tag"]].to_records(index=False).tolist() == [
+        (7, "inbox"),
+        (8, "inbox"),
+        (3, "spam"),
+    ]
+    assert sorted(p.name for p in (tmp_path / "raw" / "inbox_personal").iterdir()) == [
+        "7_inbox.eml",
+        "8_inbox.eml",
+    ]
+    assert [e.id for e in deserialize_email_data(tmp_path / "scored.parquet")] == [7, 8, 3]
+    imap.logout.assert_called_once()
+
+
+class TestMovePredictedSpam:
+    @staticmethod
+    @pytest.fixture
+    def predictions() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "id": [1, 2, 3, 4, 5, 1],
+                "tag": ["inbox", "inbox", "inbox", "inbox", "inbox", "spam"],
+                "probability": [0.95, 0.2, 0.99, 0.91, 0.5, 0.99],
+            }
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("dry_run", (True, False))
+    def test_moves_spam_above_threshold(
+        imap_server: FakeIMAPServer,
+        imap_client: imaplib.IMAP4,
+        eml_fixture: bytes,
+        predictions: pd.DataFrame,
+        dry_run: bool,  # noqa: FBT001
+    ) -> None:
+        inbox = imap_server.add_mailbox("INBOX", dict.fromkeys(range(1, 6), eml_fixture))
+        spam = imap_server.add_mailbox("Spam", {1: eml_fixture})
+
+        moved = move_predicted_spam(
+            imap_client,
+            predictions,
+            "Spam",
+            folders={"INBOX": "inbox", "Spam": "spam"},
+            dry_run=dry_run,
+        )
+
+        assert moved == {"INBOX": [1, 3, 4]}
+        moves = [command for command in imap_server.commands if command.startswith("UID MOVE")]
+        if dry_run:
+            assert moves == []
+            assert inbox.uids() == [1, 2, 3, 4, 5]
+        else:
+            assert moves == ["UID MOVE 1,3:4 Spam"]
+            assert inbox.uids() == [2, 5]
+            assert spam.uids() == [1, 2, 3, 4]
+
+
+class TestWatchFolder:
+    @staticmethod
+    def test_scores_new_messages_across_reconnects(
+        async_imap_server: FakeAsyncIMAPServer, eml_fixture: bytes, model_fixture: ModelPipeline
+    ) -> None:
+        async_imap_server.add_mailbox("INBOX", {1: eml_fixture})
+        scored: asyncio.Queue[pd.DataFrame] = asyncio.Queue()
+
+        async def connect() -> AsyncIMAPClient:
+            client = await AsyncIMAPClient.connect("127.0.0.1", async_imap_server.port)
+            await client.login("user@example.com", "password")
+            return client
+
+        async def run() -> list[list[tuple[int, str]]]:
+            async with async_imap_server:
+                watcher = asyncio.create_task(
+                    watch_folder(
+                        connect, "INBOX", "inbox", model_fixture, on_predictions=scored.put_nowait
+                    )
+                )
+                await async_imap_server.idling.wait()
+                async_imap_server.deliver("INBOX", 2, eml_fixture)
+                first = await asyncio.wait_for(scored.get(), 5)
+                async_imap_server.drop_connections()
+                async_imap_server.deliver("INBOX", 3, eml_fixture)
+                second = await asyncio.wait_for(scored.get(), 5)
+                watcher.cancel()
+            return [
+                batch[["id", "tag"]].to_records(index=False).tolist() for batch in (first, second)
+            ]
+
+        assert asyncio.run(run()) == [[(2, "inbox")], [(3, "inbox")]]
+
+    @staticmethod
+    def test_skips_parse_and_callback_failures(
+        mocker: pytest_mock.MockerFixture,
+        async_imap_server: FakeAsyncIMAPServer,
+        eml_fixture: bytes,
+        model_fixture: ModelPipeline,
+    ) -> None:
+        def parse_or_fail(raw_bytes: bytes, uid: str, folder: str) -> EmailData:
+            if uid == "2_inbox":
+                error_message = "Malformed email."
+                raise ValueError(error_message)
+            return parse_email_bytes(raw_bytes, uid, folder)
+
+        mocker.patch.object(scoring_functions, "parse_email_bytes", side_effect=parse_or_fail)
+        async_imap_server.add_mailbox("INBOX", {1: eml_fixture})
+        scored: asyncio.Queue[pd.DataFrame] = asyncio.Queue()
+
+        def on_predictions(predictions: pd.DataFrame) -> None:
+            scored.put_nowait(predictions)
+            if scored.qsize() == 1:
+                error_message = "Callback failed."
+                raise RuntimeError(error_message)
+
+        async def connect() -> AsyncIMAPClient:
+            client = await AsyncIMAPClient.connect("127.0.0.1", async_imap_server.port)
+            await client.login("user@example.com", "password")
+            return client
+
+        async def run() -> list[list[int]]:
+            async with async_imap_server:
+                watcher = asyncio.create_task(
+                    watch_folder(
+                        connect, "INBOX", "inbox", model_fixture, on_predictions=on_predictions
+                    )
+                )
+                await async_imap_server.idling.wait()
+                async_imap_server.idling.clear()
+                async_imap_server.deliver("INBOX", 2, eml_fixture)
+                async_imap_server.deliver("INBOX", 3, eml_fixture)
+                first = await asyncio.wait_for(scored.get(), 5)
+                await asyncio.wait_for(async_imap_server.idling.wait(), 5)
+                async_imap_server.deliver("INBOX", 4, eml_fixture)
+                second = await asyncio.wait_for(scored.get(), 5)
+                watcher.cancel()
+            return [batch["id"].tolist() for batch in (first, second)]
+
+        assert asyncio.run(run()) == [[3], [4]]
+
+    @staticmethod
+    def test_reconnects_with_backoff(
+        mocker: pytest_mock.MockerFixture, model_fixture: ModelPipeline
+    ) -> None:
+        client = mocker.AsyncMock(spec=AsyncIMAPClient)
+        client.__aenter__.return_value = client
+        client.select.return_value = None
+        connect = mocker.AsyncMock(side_effect=[OSError, OSError, OSError, client])
+        sleep = mocker.patch("asyncio.sleep")
+
+        asyncio.run(
+            watch_folder(
+                connect,
+                "Missing",
+                "inbox",
+                model_fixture,
+                on_predictions=print,
+                backoff=1,
+                max_backoff=3,
+            )
+        )
+
+        assert [call.args[0] for call in sleep.await_args_list] == [1, 2, 3]
+        client.idle.assert_not_called()